@@ -1,10 +1,17 @@
-from flask import Flask, session
-from app.models.user import User
+from flask import Flask
 from app.config import get_config
 from .routes import init_routes
+from .cli import register_commands
+from .instrumentation import init_instrumentation
 from app.database.db import db, init_db
-from app.database.seed import insert_db_samples
+from app.database.bootstrap import init_schema
 from app.database.manager import DatabaseManager
+from app.database.cache import Cache, MemoryBackend, build_cache
+from app.database.suggest import init_suggest_index
+from app.utils.conditional import init_conditional_responses
+from app.utils.fragments import init_fragment_cache
+from app.utils.images import image_src, init_image_pipeline
+from app.utils.passwords import init_password_hasher
 from flask_login import LoginManager, current_user
 
 
@@ -17,33 +24,57 @@ def create_app():
     # Initialize extensions
     init_db(app)
 
-    app.db = DatabaseManager()
+    app.db = DatabaseManager(
+        cache=build_cache(app.config),
+        principal_cache=Cache(
+            MemoryBackend(app.config["PRINCIPAL_CACHE_MAX_ENTRIES"]),
+            ttl=app.config["PRINCIPAL_CACHE_TTL"],
+        ),
+    )
 
     login_manager = LoginManager()
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return app.db.load_principal(int(user_id))
 
     @app.context_processor
     def inject_user():
+        # Read from the stored cart counter rather than the session, so that
+        # changes made elsewhere (e.g. a seller deleting a product) show up
+        total_cart_items = 0
+        if current_user.is_authenticated:
+            total_cart_items = app.db.get_total_cart_items(current_user.id)
         return {
             "user": current_user,
-            "total_cart_items": session.get("total_cart_items", 0),
+            "total_cart_items": total_cart_items,
         }
 
+    app.add_template_filter(image_src)
+    init_fragment_cache(app)
+    init_conditional_responses(app)
+    init_image_pipeline(app)
+    init_password_hasher(app)
+
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
     login_manager.login_message = "You need to log in to access this page."
     login_manager.login_message_category = "warning"
 
     with app.app_context():
-        db.create_all()
+        init_instrumentation(app, db.engine)
+        # Creates tables and seeds samples only with AUTO_BOOTSTRAP; deployed
+        # workers just check the schema version (see `flask bootstrap`)
+        init_schema(app)
+
+    init_suggest_index(app)
+    if app.config.get("CATALOG_SNAPSHOT", False):
+        # Imported on demand: it loads numpy, which slows every cold start
+        from app.database.snapshot import init_catalog_snapshot
 
-        # Check if the database is empty and insert sample data
-        if db.session.query(db.exists().where(User.id == 1)).scalar() == False:
-            insert_db_samples()
+        init_catalog_snapshot(app)
 
     init_routes(app)
+    register_commands(app)
 
     return app
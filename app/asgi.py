@@ -0,0 +1,163 @@
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from flask import request_started
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from app.database.async_manager import AsyncDatabaseManager
+from app.instrumentation import instrument_engine
+from app.routes.async_views import ASYNC_VIEWS
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref is only needed for ASGI serving
+    WsgiToAsgi = None
+
+ASYNC_METHODS = ("GET", "HEAD")
+
+
+def _environ(scope):
+    """A WSGI environ for an ASGI HTTP request without a body."""
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode().decode("latin-1"),
+        "PATH_INFO": path.encode().decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1")
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """
+    ASGI entry point for a Flask app. GET and HEAD requests to the endpoints
+    in ASYNC_VIEWS run their async view on the event loop, so a request
+    waiting on SQLite does not hold a thread. Every other request goes to the
+    regular WSGI app through asgiref's adapter, which runs it on a thread.
+    """
+
+    def __init__(self, flask_app, views=ASYNC_VIEWS):
+        if WsgiToAsgi is None:
+            raise RuntimeError("ASGI serving needs asgiref: pip install asgiref")
+        self.flask_app = flask_app
+        self.views = views
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.threads = flask_app.config.get("ASGI_THREADS", 32)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http" and scope["method"] in ASYNC_METHODS:
+            environ = _environ(scope)
+            match = self._match(environ)
+            if match is not None:
+                return await self._respond(environ, *match, send)
+        return await self.wsgi(scope, receive, send)
+
+    def _match(self, environ):
+        """(async view, view args) for the request, or None."""
+        adapter = self.flask_app.url_map.bind_to_environ(
+            environ, server_name=self.flask_app.config["SERVER_NAME"]
+        )
+        try:
+            endpoint, view_args = adapter.match()
+        except HTTPException:  # Includes redirects, e.g. a missing slash
+            return None
+        view = self.views.get(endpoint)
+        return None if view is None else (view, view_args)
+
+    def _preprocess(self):
+        app = self.flask_app
+        request_started.send(app, _async_wrapper=app.ensure_sync)
+        return app.preprocess_request()
+
+    async def _dispatch(self, view, view_args):
+        """Flask's full_dispatch_request, awaiting the view."""
+        app = self.flask_app
+        try:
+            rv = await asyncio.to_thread(self._preprocess)
+            if rv is None:
+                rv = await view(**view_args)
+        except Exception as e:
+            rv = await asyncio.to_thread(app.handle_user_exception, e)
+        return await asyncio.to_thread(app.finalize_request, rv)
+
+    async def _respond(self, environ, view, view_args, send):
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        error = None
+        ctx.push()
+        try:
+            try:
+                response = await self._dispatch(view, view_args)
+            except Exception as e:
+                error = e
+                response = await asyncio.to_thread(app.handle_exception, e)
+            body = b"" if environ["REQUEST_METHOD"] == "HEAD" else response.get_data()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in response.headers.items()
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            response.close()
+        finally:
+            ctx.pop(error)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # asyncio.to_thread uses the loop's default executor
+                asyncio.get_running_loop().set_default_executor(
+                    ThreadPoolExecutor(self.threads, thread_name_prefix="asgi")
+                )
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.flask_app.async_db.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app():
+    """
+    Create the Flask app with an AsyncDatabaseManager (app.async_db) on an
+    aiosqlite engine, wrapped for an ASGI server such as uvicorn.
+    """
+    app = create_app()
+    app.async_db = AsyncDatabaseManager(app.db, app)
+    if "metrics" in app.extensions:
+        instrument_engine(app, app.async_db.engine.sync_engine)
+    return AsgiApp(app)
@@ -0,0 +1,100 @@
+import os
+import time
+import click
+from flask import current_app
+from app.database.bootstrap import bootstrap as bootstrap_database, schema_version
+from app.database.seed import rebuild_derived, seed_synthetic
+from app.utils.helpers import upload_folder
+from app.utils.images import collect_garbage
+
+
+def register_commands(app):
+    """Register the maintenance commands available through `flask <command>`."""
+
+    @app.cli.command("bootstrap")
+    @click.option(
+        "--samples/--no-samples",
+        default=None,
+        help="Insert the sample data into an empty database "
+        "(default: SEED_SAMPLE_DATA).",
+    )
+    def bootstrap(samples):
+        """Create or upgrade the schema and derived indexes. Run once per deploy."""
+        if samples is None:
+            samples = current_app.config.get("SEED_SAMPLE_DATA", True)
+        before = schema_version()
+        version = bootstrap_database(current_app.db, seed_samples=samples)
+        click.echo(f"schema version {before} -> {version}")
+
+    @app.cli.command("reconcile-cart-counters")
+    def reconcile_cart_counters():
+        """Repair stored cart item counts that drifted from the carts table."""
+        fixed = current_app.db.reconcile_cart_counters()
+        for user_id, item_count in sorted(fixed.items()):
+            click.echo(f"user {user_id}: cart counter set to {item_count}")
+        click.echo(f"{len(fixed)} cart counter(s) repaired")
+
+    @app.cli.command("gc-images")
+    @click.option("--dry-run", is_flag=True, help="Only list what would be removed.")
+    @click.option(
+        "--grace",
+        default=3600,
+        show_default=True,
+        help="Keep files modified within this many seconds.",
+    )
+    def gc_images(dry_run, grace):
+        """Remove uploaded images that no product references."""
+        referenced = {
+            os.path.basename(url) for url in current_app.db.referenced_image_urls()
+        }
+        removed = collect_garbage(upload_folder(), referenced, grace, dry_run)
+        for name in removed:
+            click.echo(name)
+        action = "would be removed" if dry_run else "removed"
+        click.echo(f"{len(removed)} image(s) {action}")
+
+    @app.cli.command("seed")
+    @click.option("--users", default=0, show_default=True, help="Synthetic users.")
+    @click.option(
+        "--products", default=0, show_default=True, help="Synthetic products."
+    )
+    @click.option("--batch-size", default=10_000, show_default=True)
+    @click.option("--seed", default=0, show_default=True, help="Random seed.")
+    @click.option(
+        "--password",
+        default="password",
+        show_default=True,
+        help="Password shared by the synthetic users.",
+    )
+    @click.option(
+        "--rebuild/--no-rebuild",
+        default=True,
+        show_default=True,
+        help="Rebuild the search index and recommendations afterwards.",
+    )
+    def seed(users, products, batch_size, seed, password, rebuild):
+        """Bulk-load a synthetic catalog for load testing. Safe to re-run."""
+        started = time.perf_counter()
+
+        def progress(kind, done, total):
+            click.echo(f"{kind}: {done}/{total}")
+
+        try:
+            inserted = seed_synthetic(
+                users=users,
+                products=products,
+                batch_size=batch_size,
+                seed=seed,
+                password=password,
+                image_url=current_app.config["DEFAULT_IMAGE_URL"],
+                progress=progress,
+            )
+        except ValueError as e:
+            raise click.UsageError(str(e)) from e
+        if rebuild:
+            click.echo("rebuilding search index and recommendations")
+            rebuild_derived(current_app.db)
+        click.echo(
+            f"{inserted['users']} user(s) and {inserted['products']} product(s) "
+            f"inserted in {time.perf_counter() - started:.1f}s"
+        )
@@ -13,6 +13,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = (
         "sqlite:///default.db"  # Default DB, can be overridden by environment
     )
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    # Create tables, seed sample data and build derived indexes inside
+    # create_app. Deployments turn this off and run `flask bootstrap` once.
+    AUTO_BOOTSTRAP = os.getenv("AUTO_BOOTSTRAP", "1") == "1"
+    SEED_SAMPLE_DATA = True
+
+    # PRAGMA name -> value, applied to every new SQLite connection
+    SQLITE_PRAGMAS = {}
 
     # Session cookie settings
     SESSION_COOKIE_SECURE = True
@@ -23,3 +32,75 @@ class Config:
     ROOT_DIR = "app"
     DEFAULT_IMAGE_URL = "/static/images/no_image.jpg"
     IMAGE_UPLOAD_FOLDER = "static/images/uploads"
+    # Uploads are content addressed and served from here with immutable caching
+    MEDIA_URL = "/media"
+    MEDIA_MAX_AGE = 365 * 24 * 60 * 60  # seconds
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # whole request body, rejected with 413
+    IMAGE_MAX_BYTES = 10 * 1024 * 1024  # a single uploaded image
+    IMAGE_MAX_PIXELS = 40_000_000  # refuse to decode larger images
+
+    # Threads resizing uploads into thumb/medium/full WebP variants (needs
+    # Pillow); 0 processes them inline in the request
+    IMAGE_PIPELINE_WORKERS = int(os.getenv("IMAGE_PIPELINE_WORKERS", 2))
+
+    # Catalog imports: rows added per transaction, and rejected rows listed
+    IMPORT_BATCH_SIZE = 500
+    IMPORT_MAX_REPORTED_ERRORS = 100
+
+    # Password hashing (werkzeug method string, e.g. "scrypt:32768:8:1"). Stored
+    # hashes made with other parameters are replaced at the next login.
+    # PASSWORD_HASH_WORKERS processes do the hashing (0: on the request
+    # thread); at most PASSWORD_HASH_MAX_PENDING hashes (default 4 per worker)
+    # wait or run at once, and a login that cannot get a slot within
+    # PASSWORD_HASH_QUEUE_TIMEOUT seconds is answered with 503
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = None
+    PASSWORD_HASH_QUEUE_TIMEOUT = 5
+
+    # Number of similar products precomputed and shown per product
+    RECOMMENDATIONS_PER_PRODUCT = 8
+
+    # Typeahead (/product/suggest): an in-memory index of product title terms
+    # per worker, of at most SUGGEST_MAX_TERMS distinct terms (about 70 bytes
+    # each, so ~20 MB at the default). Built on a background thread at
+    # startup and rebuilt every SUGGEST_REFRESH_SECONDS (0: never) to pick up
+    # other workers' writes; a worker's own writes update it immediately.
+    SUGGEST_MAX_TERMS = int(os.getenv("SUGGEST_MAX_TERMS", 300_000))
+    SUGGEST_BUILD_IN_BACKGROUND = True
+    SUGGEST_REFRESH_SECONDS = int(os.getenv("SUGGEST_REFRESH_SECONDS", 300))
+
+    # Catalog snapshot: product ids, prices, categories, sellers and creation
+    # times in per-worker arrays (~32 bytes per product), answering listings
+    # and facets without search text by scanning them (with numpy when it is
+    # installed). Loaded like the suggestion index; off by default
+    CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "0") == "1"
+    CATALOG_SNAPSHOT_BUILD_IN_BACKGROUND = True
+    CATALOG_SNAPSHOT_REFRESH_SECONDS = int(
+        os.getenv("CATALOG_SNAPSHOT_REFRESH_SECONDS", 300)
+    )
+
+    # Read-through cache for DatabaseManager reads: "memory" (per process),
+    # "sqlite" (a local file shared by all workers) or "none"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES = 2048
+    CACHE_DEFAULT_TTL = 300  # seconds
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "instance/cache.sqlite")
+
+    # Request instrumentation: Server-Timing headers, Prometheus /metrics and
+    # a log ("loopify.sql.slow") of statements slower than the threshold
+    SERVER_TIMING_ENABLED = True
+    METRICS_ENABLED = True
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+
+    # Seconds a shared cache (e.g. a reverse proxy) may serve anonymous
+    # product and listing pages before revalidating them with the ETag
+    PUBLIC_PAGE_MAX_AGE = int(os.getenv("PUBLIC_PAGE_MAX_AGE", 30))
+
+    # ASGI serving (`uvicorn asgi:app`): threads for the sync work of async
+    # views (templates, session principal) and for requests without an async view
+    ASGI_THREADS = int(os.getenv("ASGI_THREADS", 32))
+
+    # Per-process cache of logged-in users' session principals (id, username)
+    PRINCIPAL_CACHE_MAX_ENTRIES = 4096
+    PRINCIPAL_CACHE_TTL = 60  # seconds
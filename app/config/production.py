@@ -1,3 +1,4 @@
+import os
 from .config import Config
 
 
@@ -9,7 +10,35 @@ class ProductionConfig(Config):
         "sqlite:///production.db"  # Change to your production DB URI
     )
 
+    # SQLite tuned for several concurrent gunicorn workers: WAL lets readers
+    # run alongside the single writer, and busy_timeout makes a blocked writer
+    # wait for the lock instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # Durable at WAL checkpoints, no fsync per commit
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # Negative means KiB: 64 MiB page cache
+        "temp_store": "MEMORY",
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+    }
+
     # Disable debug mode in production
     DEBUG = False
     TESTING = False
     SESSION_COOKIE_SECURE = True  # Cookies must be sent over HTTPS in production
+
+    # Workers only check the schema version; run `flask bootstrap` on deploy
+    AUTO_BOOTSTRAP = os.getenv("AUTO_BOOTSTRAP", "0") == "1"
+    SEED_SAMPLE_DATA = False
+
+    # scrypt with twice the default cost (64 MiB per hash)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:65536:8:1")
+
+    # Workers must see each other's invalidations, so share the cache
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
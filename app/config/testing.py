@@ -15,3 +15,14 @@ class TestingConfig(Config):
 
     # Disable modification tracking for SQLAlchemy in testing
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Cheap inline hashing keeps the auth tests fast
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    PASSWORD_HASH_WORKERS = 0
+
+    # Build image variants inline so tests can assert on them
+    IMAGE_PIPELINE_WORKERS = 0
+
+    # Build the suggestion index inline, once per app
+    SUGGEST_BUILD_IN_BACKGROUND = False
+    SUGGEST_REFRESH_SECONDS = 0
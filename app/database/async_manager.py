@@ -0,0 +1,277 @@
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.database.db import _pragma_setter, db
+from app.database.pagination import paginate_async
+
+
+class AsyncDatabaseManager:
+    """
+    Non-blocking versions of the DatabaseManager reads behind the busiest
+    pages, for the ASGI entry point. Statements run on an aiosqlite engine
+    bound to the same database file. The read-through cache, count cache and
+    search index are shared with the DatabaseManager, under the same keys and
+    with the same value shapes, so sync writes invalidate these reads too.
+    """
+
+    def __init__(self, manager, app):
+        with app.app_context():
+            url = db.engine.url.set(drivername="sqlite+aiosqlite")
+        self.manager = manager
+        self.cache = manager.cache
+        self.count_cache = manager.count_cache
+        self.search_index = manager.search_index
+        self.engine = create_async_engine(
+            url,
+            poolclass=AsyncAdaptedQueuePool,
+            **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+        )
+        pragmas = app.config.get("SQLITE_PRAGMAS")
+        if pragmas:
+            event.listen(self.engine.sync_engine, "connect", _pragma_setter(pragmas))
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+    async def get_product_by_id(self, product_id):
+        """Get product by ID, with its category loaded (the result is detached)."""
+        from app.models import Product
+
+        async def load():
+            async with self.session() as session:
+                return await session.get(
+                    Product, product_id, options=[joinedload(Product.category)]
+                )
+
+        return await self.cache.get_or_load_async(
+            f"product:{product_id}", "row+category", load
+        )
+
+    async def get_recommended_products(self, product_id):
+        """Get the precomputed most similar products, best match first."""
+        from app.models import Product, Recommendation
+
+        async def load():
+            async with self.session() as session:
+                result = await session.scalars(
+                    select(Product)
+                    .join(Recommendation, Recommendation.recommended_id == Product.id)
+                    .where(Recommendation.product_id == product_id)
+                    .order_by(Recommendation.score.desc())
+                    .limit(self.manager.recommendations.limit)
+                )
+                return result.all()
+
+        return await self.cache.get_or_load_async("recommendations", product_id, load)
+
+    async def get_all_categories(self):
+        """Get all categories."""
+        from app.models import Category
+
+        async def load():
+            async with self.session() as session:
+                return (await session.scalars(select(Category))).all()
+
+        return await self.cache.get_or_load_async("categories", "all", load)
+
+    async def cart_item_exists(self, user_id, product_id):
+        """Check if a specific product is in a user's cart."""
+        from app.models import Cart
+
+        async def load():
+            async with self.session() as session:
+                found = await session.scalar(
+                    select(Cart.product_id).where(
+                        Cart.user_id == user_id, Cart.product_id == product_id
+                    )
+                )
+                return found is not None
+
+        return await self.cache.get_or_load_async(
+            f"cart:{user_id}", ("exists", product_id), load
+        )
+
+    async def get_total_cart_items(self, user_id):
+        """Get the total number of items in a user's cart (from its counter)."""
+        from app.models import Cart, CartCounter
+
+        async def load():
+            async with self.session() as session:
+                item_count = await session.scalar(
+                    select(CartCounter.item_count).where(CartCounter.user_id == user_id)
+                )
+                if item_count is None:
+                    item_count = await session.scalar(
+                        select(func.count())
+                        .select_from(Cart)
+                        .where(Cart.user_id == user_id)
+                    )
+                return item_count
+
+        return await self.cache.get_or_load_async(f"cart:{user_id}", "count", load)
+
+    async def get_cart_items(self, user_id):
+        """Retrieve all items in a user's cart."""
+        from app.models import Cart, Product
+
+        async def load():
+            async with self.session() as session:
+                rows = await session.execute(
+                    select(
+                        Product.title,
+                        Product.price,
+                        Product.image_url,
+                        Product.image_variants,
+                        Product.id.label("product_id"),
+                    )
+                    .join(Cart, Cart.product_id == Product.id)
+                    .where(Cart.user_id == user_id)
+                )
+                return [dict(row._mapping) for row in rows]
+
+        return await self.cache.get_or_load_async(f"cart:{user_id}", "items", load)
+
+    async def get_all_products(
+        self, page=1, per_page=5, cursor=None, with_total=True, sort="relevance"
+    ):
+        """Retrieve all products with pagination, as DatabaseManager does."""
+        from app.models import Product
+
+        async def load():
+            statement = self._product_list_statement()
+            async with self.session() as session:
+                products, current_page, next_cursor, prev_cursor = await paginate_async(
+                    session,
+                    statement,
+                    self.manager._sort_keys(sort),
+                    page=page,
+                    per_page=per_page,
+                    cursor=cursor,
+                )
+                total_products = None
+                if with_total:
+                    total_products = await self.count_cache.get_async(
+                        ("all",),
+                        lambda: session.scalar(
+                            select(func.count()).select_from(Product)
+                        ),
+                    )
+            return {
+                "products": self.manager._as_dicts(statement, products),
+                "pagination": self.manager._pagination(
+                    current_page, per_page, total_products, next_cursor, prev_cursor
+                ),
+            }
+
+        return await self.cache.get_or_load_async(
+            "listings", ("all", page, per_page, cursor, with_total, sort), load
+        )
+
+    async def search_products(
+        self,
+        search_text,
+        selected_categories,
+        page=1,
+        per_page=8,
+        cursor=None,
+        with_total=True,
+        min_price=None,
+        max_price=None,
+        with_facets=False,
+        sort="relevance",
+    ):
+        """Search products with pagination (and facets), as DatabaseManager does."""
+
+        async def load():
+            statement = self.manager._filter_products(
+                self._product_list_statement(),
+                search_text,
+                selected_categories,
+                min_price,
+                max_price,
+            )
+            sort_keys = self.manager._sort_keys(sort, search_text)
+            async with self.session() as session:
+                products, current_page, next_cursor, prev_cursor = await paginate_async(
+                    session,
+                    statement,
+                    sort_keys,
+                    page=page,
+                    per_page=per_page,
+                    cursor=cursor,
+                )
+                total_products = None
+                if with_total:
+                    total_products = await self.count_cache.get_async(
+                        (
+                            "search",
+                            search_text,
+                            tuple(sorted(selected_categories or ())),
+                            min_price,
+                            max_price,
+                        ),
+                        lambda: session.scalar(
+                            select(func.count()).select_from(
+                                statement.order_by(None).subquery()
+                            )
+                        ),
+                    )
+            return {
+                "products": self.manager._as_dicts(statement, products),
+                "pagination": self.manager._pagination(
+                    current_page, per_page, total_products, next_cursor, prev_cursor
+                ),
+            }
+
+        result = await self.cache.get_or_load_async(
+            "listings",
+            (
+                "search",
+                search_text,
+                tuple(selected_categories or ()),
+                page,
+                per_page,
+                cursor,
+                with_total,
+                min_price,
+                max_price,
+                sort,
+            ),
+            load,
+        )
+        if with_facets:
+            result = dict(
+                result,
+                facets=await self.get_search_facets(
+                    search_text, selected_categories, min_price, max_price
+                ),
+            )
+        return result
+
+    async def get_search_facets(
+        self, search_text, selected_categories, min_price=None, max_price=None
+    ):
+        """DatabaseManager.get_search_facets, sharing its cached rows."""
+
+        async def load():
+            async with self.session() as session:
+                result = await session.execute(
+                    self.manager._facet_statement(search_text, min_price, max_price)
+                )
+                return result.all()
+
+        rows = await self.cache.get_or_load_async(
+            "listings", ("facets", search_text, min_price, max_price), load
+        )
+        return self.manager._facets(rows, selected_categories)
+
+    def _product_list_statement(self):
+        """select() counterpart of DatabaseManager._product_list_query."""
+        from app.models import Category, Product
+
+        columns = self.manager._product_list_columns()
+        return select(*columns.values()).join(
+            Category, Category.id == Product.category_id
+        )
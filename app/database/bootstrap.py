@@ -0,0 +1,94 @@
+import logging
+from sqlalchemy import text
+from app.database.db import db
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever bootstrap() has new work to do on existing databases (a new
+# table, an ADDED_COLUMNS entry, a derived index to rebuild, ...)
+SCHEMA_VERSION = 4
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database has not been bootstrapped."""
+
+
+def schema_version():
+    """The version stored in the database (PRAGMA user_version), 0 if unset."""
+    if db.engine.dialect.name != "sqlite":
+        return SCHEMA_VERSION  # The marker is SQLite-specific
+    return db.session.execute(text("PRAGMA user_version")).scalar()
+
+
+def _set_schema_version(version):
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(text(f"PRAGMA user_version = {int(version)}"))
+        db.session.commit()
+
+
+def bootstrap(manager, seed_samples=True):
+    """
+    Bring the database up to SCHEMA_VERSION: create missing tables and
+    columns, insert the sample data into an empty database, build the
+    search index and recommendations, then record the version. Idempotent;
+    meant to run once per deployment (`flask bootstrap`), not per worker.
+    """
+    from app.database.migrations import upgrade_schema
+    from app.database.seed import insert_db_samples
+    from app.models import User
+
+    db.create_all()
+    upgrade_schema()
+
+    # Check if the database is empty and insert sample data
+    if seed_samples and not db.session.query(db.exists().where(User.id == 1)).scalar():
+        insert_db_samples()
+
+    manager.search_index.setup()
+    manager.recommendations.setup()
+    _set_schema_version(SCHEMA_VERSION)
+    return SCHEMA_VERSION
+
+
+def check_schema():
+    """Fast startup path: one PRAGMA read, no DDL and no writes."""
+    version = schema_version()
+    if version < SCHEMA_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, expected {SCHEMA_VERSION}. "
+            "Run `flask bootstrap` before starting the workers."
+        )
+    return version
+
+
+def init_schema(app):
+    """
+    Startup hook for create_app (inside an app context). With AUTO_BOOTSTRAP
+    the database is bootstrapped in-process, which suits development and
+    tests. Otherwise the worker only reads the version marker; while it is
+    behind, requests get a 503 until `flask bootstrap` has been run, so the
+    CLI itself can still start against an empty database.
+    """
+    if app.config.get("AUTO_BOOTSTRAP", True):
+        bootstrap(app.db, seed_samples=app.config.get("SEED_SAMPLE_DATA", True))
+        return
+
+    try:
+        check_schema()
+        return
+    except SchemaOutOfDate as e:
+        logger.warning("%s", e)
+
+    ready = False
+
+    @app.before_request
+    def require_bootstrapped_schema():
+        nonlocal ready
+        if ready:
+            return None
+        try:
+            check_schema()
+        except SchemaOutOfDate as e:
+            return str(e), 503
+        ready = True
+        return None
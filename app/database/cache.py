@@ -0,0 +1,233 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """In-process LRU store with per-entry expiry."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class SQLiteBackend:
+    """
+    Key-value store in a local SQLite file, shared by every worker process
+    on the host. Stands in for an external cache server.
+    """
+
+    PURGE_EVERY = 500  # writes between purges of expired entries
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_generations ("
+                "namespace TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else _MISSING
+
+    def set(self, key, value, ttl):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._purge(conn)
+
+    def _purge(self, conn):
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def generation(self, namespace):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache_generations WHERE namespace = ?", (namespace,)
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump_generation(self, namespace):
+        self._connection().execute(
+            "INSERT INTO cache_generations (namespace, value) VALUES (?, 1) "
+            "ON CONFLICT(namespace) DO UPDATE SET value = value + 1",
+            (namespace,),
+        )
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_generations")
+
+
+class Cache:
+    """
+    Read-through cache for DatabaseManager reads.
+
+    Entries live in a namespace (e.g. "product:5" or "listings"). Every
+    namespace has a generation number that is part of each entry's key, so
+    invalidating a namespace is a single counter bump: older entries become
+    unreachable and age out of the backend. Values are pickled, so callers
+    always get their own copy. Pass backend=None to disable caching.
+    """
+
+    def __init__(self, backend=None, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = Counter()
+        self.misses = Counter()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """Return the cached value for (namespace, key), calling loader() on a miss."""
+        if self.backend is None:
+            return loader()
+
+        full_key, value = self._lookup(namespace, key)
+        if value is _MISSING:
+            value = loader()
+            self._store(full_key, value, ttl)
+        return value
+
+    async def get_or_load_async(self, namespace, key, loader, ttl=None):
+        """get_or_load for a coroutine function loader, awaited on a miss."""
+        if self.backend is None:
+            return await loader()
+
+        full_key, value = self._lookup(namespace, key)
+        if value is _MISSING:
+            value = await loader()
+            self._store(full_key, value, ttl)
+        return value
+
+    def _lookup(self, namespace, key):
+        family = namespace.split(":", 1)[0]
+        full_key = f"{namespace}:{self.backend.generation(namespace)}:{key!r}"
+        cached = self.backend.get(full_key)
+        if cached is _MISSING:
+            self.misses[family] += 1
+            return full_key, _MISSING
+        self.hits[family] += 1
+        return full_key, pickle.loads(cached)
+
+    def _store(self, full_key, value, ttl):
+        self.backend.set(
+            full_key,
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            self.ttl if ttl is None else ttl,
+        )
+
+    def invalidate(self, *namespaces):
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.bump_generation(namespace)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters, overall and per namespace family."""
+        families = sorted(set(self.hits) | set(self.misses))
+        return {
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "namespaces": {
+                family: {"hits": self.hits[family], "misses": self.misses[family]}
+                for family in families
+            },
+        }
+
+
+def build_cache(config):
+    """Create the cache described by the CACHE_* settings of a Flask config."""
+    kind = config.get("CACHE_BACKEND", "memory")
+    max_entries = config.get("CACHE_MAX_ENTRIES", 2048)
+    if kind == "memory":
+        backend = MemoryBackend(max_entries)
+    elif kind == "sqlite":
+        backend = SQLiteBackend(config["CACHE_SQLITE_PATH"], max_entries)
+    elif kind in (None, "none", "null"):
+        backend = None
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+    return Cache(backend, ttl=config.get("CACHE_DEFAULT_TTL", 300))
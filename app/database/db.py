@@ -1,8 +1,66 @@
+import logging
+import threading
+import time
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
 
+logger = logging.getLogger(__name__)
+
 
 def init_db(app: Flask):
     db.init_app(app)
+
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if pragmas:
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _pragma_setter(pragmas))
+
+
+def _pragma_setter(pragmas):
+    """Build a connect-event listener that applies the given PRAGMAs."""
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return set_pragmas
+
+
+def schedule_build(app, build, name, background=True, interval=0):
+    """
+    Run build(), the load of a per-worker in-memory index, in an app
+    context: inline, or on a daemon thread so the worker starts serving at
+    once. With an interval it runs again every `interval` seconds, which
+    picks up writes made by other worker processes. Failures are logged
+    (e.g. the database is not bootstrapped yet), not raised.
+    """
+
+    def run():
+        with app.app_context():
+            try:
+                build()
+            except Exception as e:
+                logger.warning("Could not build the %s: %s", name, e)
+            finally:
+                db.session.remove()
+
+    def refresh():
+        while True:
+            time.sleep(interval)
+            run()
+
+    if background:
+        threading.Thread(target=run, name=f"{name} build", daemon=True).start()
+    else:
+        run()
+    if interval:
+        threading.Thread(target=refresh, name=f"{name} refresh", daemon=True).start()
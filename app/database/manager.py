@@ -1,11 +1,54 @@
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database.cache import Cache, MemoryBackend
 from app.database.db import db
+from app.database.pagination import CountCache, SortKey, paginate
+from app.database.recommendations import RecommendationIndex
+from app.database.search import (
+    SearchIndex,
+    build_match_expression,
+    register_schema_events,
+    relevance,
+)
+from app.database.suggest import SuggestIndex
+
+# Characters of the description loaded for list views (cards show 100)
+LIST_DESCRIPTION_LENGTH = 200
+
+# Upper bounds of the price facet's buckets; the last bucket is open-ended
+PRICE_BUCKET_BOUNDS = (25, 50, 100, 250, 500, 1000)
+
+# Sort orders of the product listings. "relevance" ranks text searches by
+# BM25 and leaves other listings in catalog (id) order.
+SORT_ORDERS = ("relevance", "newest", "price_asc", "price_desc")
 
 
 class DatabaseManager:
     """A class to manage SQLAlchemy database operations."""
 
-    def __init__(self):
+    def __init__(self, cache=None, principal_cache=None):
+        from app.models import Product
+
         self.db = db.session
+        self.cache = cache or Cache()
+        self.principal_cache = principal_cache or Cache(MemoryBackend(), ttl=60)
+        self.search_index = SearchIndex()
+        self.recommendations = RecommendationIndex()
+        self.suggestions = SuggestIndex()
+        self.snapshot = None  # Optional CatalogSnapshot (CATALOG_SNAPSHOT)
+        self.count_cache = CountCache()
+        register_schema_events(Product.__table__)
 
     def create_user(self, username, password):
         """Create a new user with a hashed password."""
@@ -15,17 +58,49 @@ class DatabaseManager:
         user.set_password(password)
         db.session.add(user)
         db.session.commit()
+        self.invalidate_principal(user.id)
         return user
 
     def get_user(self, username, password):
-        """Retrieve a user by username and verify the password."""
+        """
+        Retrieve a user by username and verify the password. A hash made
+        with outdated parameters is replaced while the password is at hand.
+        """
         from app.models import User
 
-        user = User.query.filter_by(username=username).first()
+        user = (
+            User.query.options(db.undefer(User.password))
+            .filter_by(username=username)
+            .first()
+        )
         if user and user.check_password(password):
+            if user.password_needs_rehash():
+                user.set_password(password)
+                db.session.commit()
             return user
         return None
 
+    def load_principal(self, user_id):
+        """
+        Get the slim session principal (id, username) of a user, served from
+        a small per-process cache. Returns None for unknown users.
+        """
+        from app.models import User, UserPrincipal
+
+        def load():
+            row = (
+                db.session.query(User.id, User.username)
+                .filter(User.id == user_id)
+                .first()
+            )
+            return UserPrincipal(row.id, row.username) if row else None
+
+        return self.principal_cache.get_or_load(f"user:{user_id}", "principal", load)
+
+    def invalidate_principal(self, user_id):
+        """Forget the cached principal of a user after it changed."""
+        self.principal_cache.invalidate(f"user:{user_id}")
+
     def get_user_by_username(self, username):
         """Retrieve a user by username"""
         from app.models import User
@@ -47,9 +122,46 @@ class DatabaseManager:
             image_url=image_url,
         )
         db.session.add(product)
+        db.session.flush()  # Assigns product.id for the derived indexes
+        self.search_index.index_product(product)
+        self.recommendations.add_product(product)
         db.session.commit()
+        self.suggestions.add_product(product.title)
+        self._product_changed(product.id)
         return product
 
+    def add_products(self, rows):
+        """
+        Insert a batch of new products (dicts of Product columns) in one
+        transaction with one executemany, index them for search and
+        recommendations, and return their ids in the order of rows.
+        """
+        from app.models import Product
+
+        try:
+            ids = db.session.scalars(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+            added = [dict(row, id=product_id) for row, product_id in zip(rows, ids)]
+            self.search_index.index_products(added)
+            self.recommendations.add_products(added)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.suggestions.add_products(row["title"] for row in rows)
+        if self.snapshot is not None:
+            self.snapshot.changed(ids)
+        self.count_cache.clear()
+        # Ids can be reused after deletes, so drop any cached misses for them
+        self.cache.invalidate(
+            "listings",
+            "recommendations",
+            *(f"product:{product_id}" for product_id in ids),
+        )
+        return ids
+
     def update_product(
         self,
         product_id,
@@ -64,6 +176,9 @@ class DatabaseManager:
 
         product = Product.query.get(product_id)
         if product:
+            old_category_id = product.category_id
+            old_title = product.title
+            cart_user_ids = self._cart_user_ids(product_id)
             # Update attributes if new values are provided (not None)
             if title:
                 product.title = title
@@ -73,59 +188,375 @@ class DatabaseManager:
                 product.description = description
             if category_id is not None:
                 product.category_id = category_id
-            if image_url:
+            if image_url and image_url != product.image_url:
                 product.image_url = image_url
+                product.image_variants = None  # Rebuilt by the image pipeline
+            self.search_index.index_product(product)
+            self.recommendations.update_product(product, old_category_id)
             db.session.commit()
+            self.suggestions.update_product(old_title, product.title)
+            self._product_changed(product_id, cart_user_ids)
             return product
         else:
             return None
 
     def delete_product(self, product_id):
-        from app.models import Product, Cart
+        from app.models import Product, Cart, CartCounter
 
         try:
             product = Product.query.get(product_id)
             if product:
-                Cart.query.filter_by(product_id=product_id).delete()
+                # Remove the product from every cart and keep counters in step
+                cart_user_ids = db.session.scalars(
+                    delete(Cart)
+                    .where(Cart.product_id == product_id)
+                    .returning(Cart.user_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                if cart_user_ids:
+                    db.session.execute(
+                        update(CartCounter)
+                        .where(CartCounter.user_id.in_(cart_user_ids))
+                        .values(item_count=CartCounter.item_count - 1)
+                        .execution_options(synchronize_session=False)
+                    )
+                self.search_index.remove_product(product_id)
+                self.recommendations.remove_product(product_id, product.category_id)
+                title = product.title
                 db.session.delete(product)
                 db.session.commit()
+                self.suggestions.remove_product(title)
+                self._product_changed(product_id, cart_user_ids)
                 return True
             return False
         except Exception as e:
             db.session.rollback()  # Rollback in case of an error
             raise e
 
+    def record_image_variants(self, image_url, variants):
+        """Store the resized variants of an upload on the products using it."""
+        from app.models import Product
+
+        product_ids = db.session.scalars(
+            update(Product)
+            .where(Product.image_url == image_url)
+            .values(image_variants=variants)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        for product_id in product_ids:
+            self._product_changed(product_id, self._cart_user_ids(product_id))
+        return product_ids
+
+    def referenced_image_urls(self):
+        """Every image URL (original or variant) that a product points to."""
+        from app.models import Product
+
+        urls = set()
+        for image_url, variants in db.session.execute(
+            select(Product.image_url, Product.image_variants)
+        ):
+            if image_url:
+                urls.add(image_url)
+            urls.update((variants or {}).values())
+        return urls
+
+    def _cart_user_ids(self, product_id):
+        """Ids of the users who have a product in their cart."""
+        from app.models import Cart
+
+        return [
+            user_id
+            for (user_id,) in db.session.query(Cart.user_id).filter(
+                Cart.product_id == product_id
+            )
+        ]
+
+    def _product_changed(self, product_id, cart_user_ids=()):
+        """Invalidate every cached read that a product write can affect."""
+        if self.snapshot is not None:
+            self.snapshot.changed([product_id])
+        self.count_cache.clear()
+        self.cache.invalidate(
+            f"product:{product_id}",
+            "listings",
+            "recommendations",
+            *(f"cart:{user_id}" for user_id in cart_user_ids),
+        )
+
+    def _attach(self, instance):
+        """Attach a cached (detached) ORM instance to the current session."""
+        if instance is None or inspect(instance).session is not None:
+            return instance
+        return db.session.merge(instance, load=False)
+
     def get_product_by_id(self, product_id):
         """Get product by ID."""
         from app.models import Product
 
-        return Product.query.get(product_id)
+        product = self.cache.get_or_load(
+            f"product:{product_id}", "row", lambda: Product.query.get(product_id)
+        )
+        return self._attach(product)
+
+    def get_recommended_products(self, product_id):
+        """Get the precomputed most similar products, best match first."""
+        from app.models import Product, Recommendation
+
+        products = self.cache.get_or_load(
+            "recommendations",
+            product_id,
+            lambda: Product.query.join(
+                Recommendation, Recommendation.recommended_id == Product.id
+            )
+            .filter(Recommendation.product_id == product_id)
+            .order_by(Recommendation.score.desc())
+            .limit(self.recommendations.limit)
+            .all(),
+        )
+        return [self._attach(product) for product in products]
 
     def get_products_by_seller_id(self, seller_id):
         """
-        Get all products by a specific seller ID.
+        Get all products by a specific seller ID, as read-only rows.
         """
         from app.models import Product
 
-        return Product.query.filter_by(seller_id=seller_id).all()
+        return (
+            self._product_list_query()
+            .filter(Product.seller_id == seller_id)
+            .order_by(Product.id)
+            .all()
+        )
+
+    def get_seller_products_page(self, seller_id, per_page=50, cursor=None):
+        """One page of a seller's products in id order, for my-products."""
+        from app.models import Product
+
+        query = self._product_list_query().filter(Product.seller_id == seller_id)
+        products, page, next_cursor, prev_cursor = paginate(
+            query, [SortKey(Product.id)], per_page=per_page, cursor=cursor
+        )
+        return {
+            "products": self._as_dicts(query, products),
+            "pagination": self._pagination(
+                page, per_page, None, next_cursor, prev_cursor
+            ),
+        }
+
+    def iter_seller_products(self, seller_id, batch_size=1000):
+        """
+        Yield a seller's products in id order as row mappings with the
+        columns of a catalog import, fetching batch_size rows at a time.
+        """
+        from app.models import Category, Product
+
+        statement = (
+            select(
+                Product.id,
+                Product.title,
+                Product.price,
+                Product.currency,
+                Product.description,
+                Category.name.label("category"),
+                Product.image_url,
+            )
+            .join(Category, Category.id == Product.category_id)
+            .where(Product.seller_id == seller_id)
+            .order_by(Product.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in db.session.execute(statement):
+            yield row._mapping
+
+    @staticmethod
+    def _product_list_columns():
+        """Column expressions of the product list views, by field name."""
+        from app.models import Category, Product
+
+        return {
+            "id": Product.id,
+            "title": Product.title,
+            "price": Product.price,
+            "currency": Product.currency,
+            "description": func.substr(
+                Product.description, 1, LIST_DESCRIPTION_LENGTH
+            ).label("description"),
+            "category": Category.name.label("category"),
+            "category_id": Product.category_id,
+            "seller_id": Product.seller_id,
+            "image_url": Product.image_url,
+            "image_variants": Product.image_variants,
+            "version": Product.version,
+            "created_at": Product.created_at,
+            "updated_at": Product.updated_at,
+        }
+
+    def _product_list_query(self, fields=None):
+        """
+        Query for product list views. Selects only the columns the listings
+        show (or the given subset of _product_list_columns), with the category
+        name joined in, so a page of results is one SELECT returning plain
+        rows instead of session-tracked Products.
+        """
+        from app.models import Category, Product
+
+        columns = self._product_list_columns()
+        selected = [columns[field] for field in fields or columns]
+        return db.session.query(*selected).join(
+            Category, Category.id == Product.category_id
+        )
+
+    @staticmethod
+    def _as_dicts(query, rows):
+        fields = [column["name"] for column in query.column_descriptions]
+        return [dict(zip(fields, row)) for row in rows]
 
     def get_all_categories(self):
         """Get all categories."""
         from app.models import Category
 
-        return Category.query.all()
+        categories = self.cache.get_or_load(
+            "categories", "all", lambda: Category.query.all()
+        )
+        return [self._attach(category) for category in categories]
 
     def add_to_cart(self, user_id, product_id):
         """Add a product to a user's cart."""
-        from app.models import Cart
+        self.update_cart(user_id, add=[product_id])
+
+    def update_cart(self, user_id, add=(), remove=()):
+        """
+        Apply a batch of cart changes in one transaction: one DELETE ...
+        RETURNING for the removals, then one INSERT ... SELECT ... ON CONFLICT
+        DO NOTHING RETURNING for the additions (skipping unknown products and
+        the user's own listings), then the user's cart counter is adjusted.
+        Returns the product ids actually added and removed, and the new
+        number of items in the cart.
+        """
+        from app.models import Cart, Product
+
+        try:
+            removed = []
+            if remove:
+                removed = db.session.scalars(
+                    delete(Cart)
+                    .where(Cart.user_id == user_id, Cart.product_id.in_(remove))
+                    .returning(Cart.product_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+
+            added = []
+            if add:
+                added = db.session.scalars(
+                    sqlite_insert(Cart)
+                    .from_select(
+                        ["user_id", "product_id"],
+                        select(literal(user_id), Product.id).where(
+                            Product.id.in_(add), Product.seller_id != user_id
+                        ),
+                    )
+                    .on_conflict_do_nothing()
+                    .returning(Cart.product_id)
+                ).all()
+
+            total_cart_items = self._adjust_cart_counter(
+                user_id, len(added) - len(removed)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if added or removed:
+            self.cache.invalidate(f"cart:{user_id}")
+        return {
+            "added": sorted(added),
+            "removed": sorted(removed),
+            "total_cart_items": total_cart_items,
+        }
+
+    def _adjust_cart_counter(self, user_id, delta):
+        """
+        Add delta to a user's stored cart item count and return the new
+        value. A missing counter is created from an actual COUNT.
+        """
+        from app.models import Cart, CartCounter
+
+        item_count = None
+        if delta:
+            item_count = db.session.scalar(
+                update(CartCounter)
+                .where(CartCounter.user_id == user_id)
+                .values(item_count=CartCounter.item_count + delta)
+                .returning(CartCounter.item_count)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            item_count = db.session.scalar(
+                select(CartCounter.item_count).where(CartCounter.user_id == user_id)
+            )
+        if item_count is None:
+            item_count = db.session.scalar(
+                select(func.count()).select_from(Cart).where(Cart.user_id == user_id)
+            )
+            db.session.execute(
+                sqlite_insert(CartCounter)
+                .values(user_id=user_id, item_count=item_count)
+                .on_conflict_do_update(
+                    index_elements=[CartCounter.user_id],
+                    set_={"item_count": item_count},
+                )
+            )
+        return item_count
+
+    def reconcile_cart_counters(self):
+        """
+        Repair cart counters that drifted from the carts table.
+        Returns {user_id: corrected count} for every counter that was fixed.
+        """
+        from app.models import Cart, CartCounter
 
-        cart_item = Cart(user_id=user_id, product_id=product_id)
-        db.session.add(cart_item)
+        actual = dict(
+            db.session.execute(
+                select(Cart.user_id, func.count()).group_by(Cart.user_id)
+            ).all()
+        )
+        stored = dict(
+            db.session.execute(
+                select(CartCounter.user_id, CartCounter.item_count)
+            ).all()
+        )
+        drifted = {
+            user_id: actual.get(user_id, 0)
+            for user_id in set(actual) | set(stored)
+            if actual.get(user_id, 0) != stored.get(user_id)
+        }
+        if drifted:
+            insert = sqlite_insert(CartCounter)
+            db.session.execute(
+                insert.on_conflict_do_update(
+                    index_elements=[CartCounter.user_id],
+                    set_={"item_count": insert.excluded.item_count},
+                ),
+                [
+                    {"user_id": user_id, "item_count": count}
+                    for user_id, count in drifted.items()
+                ],
+            )
         db.session.commit()
+        self.cache.invalidate(*(f"cart:{user_id}" for user_id in drifted))
+        return drifted
 
     def get_cart_items(self, user_id):
         """Retrieve all items in a user's cart using SQLAlchemy ORM."""
 
+        return self.cache.get_or_load(
+            f"cart:{user_id}", "items", lambda: self._load_cart_items(user_id)
+        )
+
+    def _load_cart_items(self, user_id):
         from app.models import Cart, Product
 
         cart_items = (
@@ -140,6 +571,7 @@ class DatabaseManager:
                 "title": cart_item.Product.title,
                 "price": cart_item.Product.price,
                 "image_url": cart_item.Product.image_url,
+                "image_variants": cart_item.Product.image_variants,
                 "product_id": cart_item.Product.id,
             }
             for cart_item in cart_items
@@ -147,122 +579,416 @@ class DatabaseManager:
 
     def remove_from_cart(self, user_id, product_id):
         """Remove a product from the user's cart."""
-        from app.models import Cart
+        self.update_cart(user_id, remove=[product_id])
 
-        cart_item = Cart.query.filter_by(user_id=user_id, product_id=product_id).first()
-        if cart_item:
-            db.session.delete(cart_item)
-            db.session.commit()
+    def get_all_products(
+        self, page=1, per_page=5, cursor=None, with_total=True, sort="relevance"
+    ):
+        """
+        Retrieve all products with pagination, in one of the SORT_ORDERS.
+        Pass the next_cursor/prev_cursor of a previous result as `cursor` to
+        seek to the adjacent page instead of using OFFSET. The total is
+        counted (and cached briefly) only when with_total is set.
+        """
+        return self.cache.get_or_load(
+            "listings",
+            ("all", page, per_page, cursor, with_total, sort),
+            lambda: self._load_all_products(page, per_page, cursor, with_total, sort),
+        )
 
-    def get_all_products(self, page=1, per_page=5):
-        """Retrieve all products with pagination."""
+    def _sort_keys(self, sort, search_text=""):
+        """
+        The keyset of a sort order. Every order ends on the id, in the
+        direction of the first key, so it can be read off the products
+        indexes backwards or forwards without sorting.
+        """
         from app.models import Product
 
-        products_query = Product.query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )  # Fetch products with pagination
+        if sort == "newest":
+            return [SortKey(Product.created_at, True), SortKey(Product.id, True)]
+        if sort == "price_asc":
+            return [SortKey(Product.price), SortKey(Product.id)]
+        if sort == "price_desc":
+            return [SortKey(Product.price, True), SortKey(Product.id, True)]
+        if sort != "relevance":
+            raise ValueError(f"Unknown sort order {sort!r}")
+        keys = [SortKey(Product.id)]
+        if (
+            search_text
+            and self.search_index.available
+            and build_match_expression(search_text)
+        ):
+            keys.insert(0, SortKey(relevance))
+        return keys
+
+    def _load_all_products(self, page, per_page, cursor, with_total, sort):
+        from app.models import Product
 
-        products = products_query.items
-        total_products = products_query.total
+        if self._use_snapshot():
+            return self._snapshot_products(
+                (), page, per_page, cursor, with_total, None, None, sort
+            )
+        query = self._product_list_query()
+        products, page, next_cursor, prev_cursor = paginate(
+            query,
+            self._sort_keys(sort),
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+        )
+        total_products = None
+        if with_total:
+            total_products = self.count_cache.get(
+                ("all",), lambda: Product.query.order_by(None).count()
+            )
+
+        return {
+            "products": self._as_dicts(query, products),
+            "pagination": self._pagination(
+                page, per_page, total_products, next_cursor, prev_cursor
+            ),
+        }
+
+    def search_products(
+        self,
+        search_text,
+        selected_categories,
+        page=1,
+        per_page=8,
+        cursor=None,
+        with_total=True,
+        min_price=None,
+        max_price=None,
+        with_facets=False,
+        sort="relevance",
+    ):
+        """
+        Search for products by title, description, and category with pagination.
+        Uses the FTS5 index (BM25-ranked, prefix matching) when available and
+        falls back to LIKE filtering otherwise. `cursor`, `with_total` and
+        `sort` behave as in get_all_products. min_price (inclusive) and
+        max_price (exclusive) restrict the price range; with_facets adds the
+        get_search_facets counts as "facets".
+        """
+        result = self.cache.get_or_load(
+            "listings",
+            (
+                "search",
+                search_text,
+                tuple(selected_categories or ()),
+                page,
+                per_page,
+                cursor,
+                with_total,
+                min_price,
+                max_price,
+                sort,
+            ),
+            lambda: self._search_products(
+                search_text,
+                selected_categories,
+                page,
+                per_page,
+                cursor,
+                with_total,
+                min_price,
+                max_price,
+                sort,
+            ),
+        )
+        if with_facets:
+            result = dict(
+                result,
+                facets=self.get_search_facets(
+                    search_text, selected_categories, min_price, max_price
+                ),
+            )
+        return result
 
+    def get_search_facets(
+        self, search_text, selected_categories, min_price=None, max_price=None
+    ):
+        """
+        Match counts for the search filters: {"categories": {category id:
+        count}, "price_buckets": [{"min", "max", "count"}]}. Category counts
+        honour the price range and bucket counts the selected categories, but
+        neither its own filter, so they show what choosing it would give.
+
+        One GROUP BY pass over the text matches yields both; its rows are
+        cached per (search_text, price range), so changing the categories
+        or paging through the results reuses them.
+        """
+
+        def load():
+            if self._use_snapshot(search_text):
+                return self.snapshot.facet_rows(
+                    PRICE_BUCKET_BOUNDS, min_price, max_price
+                )
+            return self.db.execute(
+                self._facet_statement(search_text, min_price, max_price)
+            ).all()
+
+        rows = self.cache.get_or_load(
+            "listings", ("facets", search_text, min_price, max_price), load
+        )
+        return self._facets(rows, selected_categories)
+
+    def _facet_statement(self, search_text, min_price, max_price):
+        """(category_id, price bucket, in price range, count) of the text matches."""
+        from app.models import Product
+
+        bucket = case(
+            *(
+                (Product.price < bound, i)
+                for i, bound in enumerate(PRICE_BUCKET_BOUNDS)
+            ),
+            else_=len(PRICE_BUCKET_BOUNDS),
+        ).label("bucket")
+        in_range = and_(true(), *self._price_conditions(min_price, max_price))
+        statement = self._filter_products(
+            select(
+                Product.category_id, bucket, in_range.label("in_range"), func.count()
+            ),
+            search_text,
+            (),
+        )
+        return statement.group_by(Product.category_id, "bucket", "in_range")
+
+    @staticmethod
+    def _facets(rows, selected_categories):
+        selected = set(selected_categories or ())
+        categories = {}
+        buckets = [0] * (len(PRICE_BUCKET_BOUNDS) + 1)
+        for category_id, bucket, in_range, count in rows:
+            if in_range:
+                categories[category_id] = categories.get(category_id, 0) + count
+            if not selected or category_id in selected:
+                buckets[bucket] += count
+        bounds = (0, *PRICE_BUCKET_BOUNDS, None)
         return {
-            "products": [
-                {
-                    "id": product.id,
-                    "title": product.title,
-                    "price": product.price,
-                    "description": product.description,
-                    "image_url": product.image_url,
-                    "category_id": product.category_id,
-                    "seller_id": product.seller_id,
-                }
-                for product in products
+            "categories": categories,
+            "price_buckets": [
+                {"min": bounds[i], "max": bounds[i + 1], "count": count}
+                for i, count in enumerate(buckets)
             ],
-            "pagination": {
-                "current_page": page,
-                "per_page": per_page,
-                "total_products": total_products,
-                "total_pages": (total_products + per_page - 1) // per_page,
-            },
         }
 
-    def search_products(self, search_text, selected_categories, page=1, per_page=8):
-        """Search for products by title, description, and category with pagination."""
+    @staticmethod
+    def _price_conditions(min_price, max_price):
         from app.models import Product
-        from sqlalchemy import or_
 
-        # Build the base query
-        query = Product.query
+        conditions = []
+        if min_price is not None:
+            conditions.append(Product.price >= min_price)
+        if max_price is not None:
+            conditions.append(Product.price < max_price)
+        return conditions
 
-        # Apply search filters for title and description using 'like'
-        query = query.filter(
-            or_(
-                Product.title.like(f"%{search_text}%"),
-                Product.description.like(f"%{search_text}%"),
+    def _filter_products(
+        self, query, search_text, selected_categories, min_price=None, max_price=None
+    ):
+        """
+        Restrict a product query to search_text, the selected categories and
+        the price range.
+        """
+        from app.models import Product
+        from sqlalchemy import or_
+
+        if search_text and self.search_index.available:
+            query = self.search_index.match_query(query, Product, search_text)
+        elif search_text:
+            # Apply search filters for title and description using 'like'
+            query = query.filter(
+                or_(
+                    Product.title.like(f"%{search_text}%"),
+                    Product.description.like(f"%{search_text}%"),
+                )
             )
-        )
 
         # Apply category filter if selected_categories are provided
         if selected_categories:
             query = query.filter(Product.category_id.in_(selected_categories))
+        for condition in self._price_conditions(min_price, max_price):
+            query = query.filter(condition)
+        return query
+
+    def iter_products(
+        self, fields=None, search_text="", selected_categories=(), batch_size=1000
+    ):
+        """
+        Yield every product matching search_text and selected_categories as
+        a dict of the given list fields, in id order. Rows are fetched
+        batch_size at a time, so the result set is never held in memory.
+        """
+        from app.models import Product
+
+        query = self._filter_products(
+            self._product_list_query(fields), search_text, selected_categories
+        )
+        names = [column["name"] for column in query.column_descriptions]
+        for row in query.order_by(Product.id).yield_per(batch_size):
+            yield dict(zip(names, row))
 
-        # Paginate the results
-        products_query = query.paginate(page=page, per_page=per_page, error_out=False)
-        products = products_query.items
-        total_products = products_query.total
+    def _search_products(
+        self,
+        search_text,
+        selected_categories,
+        page,
+        per_page,
+        cursor,
+        with_total,
+        min_price,
+        max_price,
+        sort,
+    ):
+        if self._use_snapshot(search_text):
+            return self._snapshot_products(
+                selected_categories,
+                page,
+                per_page,
+                cursor,
+                with_total,
+                min_price,
+                max_price,
+                sort,
+            )
+
+        # Build the base query
+        query = self._filter_products(
+            self._product_list_query(),
+            search_text,
+            selected_categories,
+            min_price,
+            max_price,
+        )
+        products, page, next_cursor, prev_cursor = paginate(
+            query,
+            self._sort_keys(sort, search_text),
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+        )
+        total_products = None
+        if with_total:
+            total_products = self.count_cache.get(
+                (
+                    "search",
+                    search_text,
+                    tuple(sorted(selected_categories or ())),
+                    min_price,
+                    max_price,
+                ),
+                query.order_by(None).count,
+            )
 
         # Returning the result with pagination details
         return {
-            "products": [
-                {
-                    "id": product.id,
-                    "title": product.title,
-                    "price": product.price,
-                    "description": product.description,
-                    "category": product.category.name,  # Assuming category is a relationship
-                    "seller_id": product.seller_id,
-                    "image_url": product.image_url,
-                    "category_id": product.category_id,
-                }
-                for product in products
-            ],
-            "pagination": {
-                "current_page": page,
-                "per_page": per_page,
-                "total_products": total_products,
-                "total_pages": (total_products + per_page - 1) // per_page,
-            },
+            "products": self._as_dicts(query, products),
+            "pagination": self._pagination(
+                page, per_page, total_products, next_cursor, prev_cursor
+            ),
+        }
+
+    def _use_snapshot(self, search_text=""):
+        """Whether a listing without search text can come from the snapshot."""
+        return not search_text and self.snapshot is not None and self.snapshot.ready
+
+    def _snapshot_products(
+        self,
+        selected_categories,
+        page,
+        per_page,
+        cursor,
+        with_total,
+        min_price,
+        max_price,
+        sort,
+    ):
+        """
+        A listing page as _search_products returns it, with the page's ids
+        and the total taken from the catalog snapshot; only the rows of the
+        page are read from the database, by primary key.
+        """
+        from app.models import Product
+
+        ids, page, next_cursor, prev_cursor, total_products = self.snapshot.page(
+            selected_categories,
+            min_price,
+            max_price,
+            sort,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            with_total=with_total,
+        )
+        query = self._product_list_query()
+        rows = {}
+        if ids:
+            rows = {row.id: row for row in query.filter(Product.id.in_(ids))}
+        return {
+            "products": self._as_dicts(query, [rows[i] for i in ids if i in rows]),
+            "pagination": self._pagination(
+                page, per_page, total_products, next_cursor, prev_cursor
+            ),
+        }
+
+    @staticmethod
+    def _pagination(page, per_page, total_products, next_cursor, prev_cursor):
+        """Pagination details shared by the paginated product listings."""
+        total_pages = None
+        if total_products is not None:
+            total_pages = (total_products + per_page - 1) // per_page
+        return {
+            "current_page": page,
+            "per_page": per_page,
+            "total_products": total_products,
+            "total_pages": total_pages,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
         }
 
     def cart_item_exists(self, user_id, product_id):
         """Check if a specific product is in a user's cart."""
         from app.models import Cart
 
-        # Using SQLAlchemy query to check if a product is in the user's cart
-        cart_item = (
-            db.session.query(Cart)
-            .filter(Cart.user_id == user_id, Cart.product_id == product_id)
-            .first()
-        )
+        def load():
+            # Using SQLAlchemy query to check if a product is in the user's cart
+            cart_item = (
+                db.session.query(Cart)
+                .filter(Cart.user_id == user_id, Cart.product_id == product_id)
+                .first()
+            )
+
+            # If cart_item is None, it means the product is not in the cart
+            return cart_item is not None
 
-        # If cart_item is None, it means the product is not in the cart
-        return cart_item is not None
+        return self.cache.get_or_load(f"cart:{user_id}", ("exists", product_id), load)
 
     def get_total_cart_items(self, user_id):
-        """Get the total number of items in a user's cart."""
-        from app.models import Cart
+        """Get the total number of items in a user's cart (from its counter)."""
+        from app.models import Cart, CartCounter
 
-        # Using SQLAlchemy to count the number of cart items for the given user
-        total_items = db.session.query(Cart).filter(Cart.user_id == user_id).count()
+        def load():
+            item_count = db.session.scalar(
+                select(CartCounter.item_count).where(CartCounter.user_id == user_id)
+            )
+            if item_count is None:
+                # No counter yet: count the cart itself
+                item_count = (
+                    db.session.query(Cart).filter(Cart.user_id == user_id).count()
+                )
+            return item_count
 
-        return total_items
+        return self.cache.get_or_load(f"cart:{user_id}", "count", load)
 
     def get_products_by_category(self, category_id):
         """Retrieve all products that belong to a specific category."""
         from app.models import Product
 
         # Using SQLAlchemy to query products by category
-        products = (
-            db.session.query(Product).filter(Product.category_id == category_id).all()
+        return (
+            self._product_list_query()
+            .filter(Product.category_id == category_id)
+            .order_by(Product.id)
+            .all()
         )
-        return products
@@ -0,0 +1,69 @@
+from sqlalchemy import inspect, text
+from app.database.db import db
+
+# (table, column, column DDL) for columns added after the first release.
+# db.create_all() only creates missing tables, so databases created before a
+# column existed get it added here. Additive, nullable changes only.
+ADDED_COLUMNS = [
+    ("products", "image_variants", "JSON"),
+    ("products", "updated_at", "DATETIME"),
+    ("products", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("categories", "updated_at", "DATETIME"),
+    ("categories", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("products", "created_at", "DATETIME"),
+]
+
+# (table, column) -> SQL expression filling a freshly added column on
+# existing rows, for values ALTER TABLE cannot use as a default
+BACKFILLS = {
+    ("products", "updated_at"): "CURRENT_TIMESTAMP",
+    ("categories", "updated_at"): "CURRENT_TIMESTAMP",
+    ("products", "created_at"): "COALESCE(updated_at, CURRENT_TIMESTAMP)",
+}
+
+# Indexes replaced by the composite ones declared on the models
+DROPPED_INDEXES = [
+    "ix_products_category_id",  # prefix of ix_products_category_id_id
+    "ix_carts_user_id",  # prefix of the primary key
+    "ix_carts_product_id",  # prefix of ix_carts_product_id_user_id
+]
+
+
+def upgrade_schema():
+    """
+    Add any ADDED_COLUMNS that the current database is missing (filling
+    them from BACKFILLS), create the indexes declared on the models, drop
+    DROPPED_INDEXES, and refresh the planner statistics when the indexes
+    changed.
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    existing = {}
+    with db.engine.begin() as conn:
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in tables:
+                continue
+            if table not in existing:
+                existing[table] = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing[table]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                backfill = BACKFILLS.get((table, column))
+                if backfill is not None:
+                    conn.execute(text(f"UPDATE {table} SET {column} = {backfill}"))
+                existing[table].add(column)
+
+        indexes_changed = False
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            present = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in present:
+                    index.create(conn)
+                    indexes_changed = True
+            for name in DROPPED_INDEXES:
+                if name in present:
+                    conn.execute(text(f"DROP INDEX {name}"))
+                    indexes_changed = True
+        if indexes_changed and db.engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from sqlalchemy import and_, or_, tuple_
+
+
+class SortKey:
+    """One ORDER BY term of a keyset: a SQL expression and its direction."""
+
+    __slots__ = ("expression", "descending")
+
+    def __init__(self, expression, descending=False):
+        self.expression = expression
+        self.descending = descending
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    if value is not None and not isinstance(value, (str, int, float)):
+        raise ValueError("Invalid pagination cursor")
+    return value
+
+
+def encode_cursor(values, page, direction):
+    """Pack the sort values of a boundary row into an opaque, URL-safe token."""
+    payload = json.dumps(
+        {"v": list(values), "p": page, "d": direction}, default=_encode_value
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises ValueError for malformed tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, page, direction = payload["v"], int(payload["p"]), payload["d"]
+        if direction not in ("next", "prev") or not isinstance(values, list):
+            raise ValueError("Invalid pagination cursor")
+        values = [_decode_value(value) for value in values]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    return values, page, direction
+
+
+def _seek_condition(keys, values):
+    """Rows strictly after `values` in the order described by `keys`."""
+    if all(key.descending == keys[0].descending for key in keys):
+        # Row-value comparison, which SQLite can satisfy with an index seek
+        columns = tuple_(*(key.expression for key in keys))
+        bound = tuple_(*values)
+        return columns < bound if keys[0].descending else columns > bound
+
+    clauses = []
+    for i, key in enumerate(keys):
+        ties = [keys[j].expression == values[j] for j in range(i)]
+        step = (
+            key.expression < values[i] if key.descending else key.expression > values[i]
+        )
+        clauses.append(and_(*ties, step))
+    return or_(*clauses)
+
+
+def _order(keys, reverse=False):
+    return [
+        key.expression.desc() if key.descending != reverse else key.expression.asc()
+        for key in keys
+    ]
+
+
+def paginate(query, keys, page=1, per_page=10, cursor=None):
+    """
+    Fetch one page of an ORM query ordered by `keys` (the last key must be
+    unique, e.g. the primary key). Items are the query's entity, or plain
+    tuples for queries that select several columns.
+
+    Without a cursor the page is addressed by number (OFFSET); with a cursor
+    from a previous page the query seeks past the boundary row instead, so
+    deep pages cost the same as the first one. Neither mode runs a COUNT.
+
+    Returns (items, current_page, next_cursor, prev_cursor).
+    """
+    page_query, page, direction, width = _page_query(
+        query, keys, page, per_page, cursor
+    )
+    return _page_result(page_query.all(), page, per_page, direction, width)
+
+
+async def paginate_async(session, statement, keys, page=1, per_page=10, cursor=None):
+    """paginate for a select() statement, executed on an AsyncSession."""
+    page_query, page, direction, width = _page_query(
+        statement, keys, page, per_page, cursor
+    )
+    rows = (await session.execute(page_query)).all()
+    return _page_result(rows, page, per_page, direction, width)
+
+
+def _page_query(query, keys, page, per_page, cursor):
+    """
+    The query for one page (a Query or a select(), which share the methods
+    used here), plus the resolved page number, direction and the number of
+    selected columns before the sort keys.
+    """
+    width = len(query.column_descriptions)
+    labelled = [key.expression.label(f"sort_key_{i}") for i, key in enumerate(keys)]
+    query = query.add_columns(*labelled).order_by(None)
+
+    if cursor:
+        values, page, direction = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise ValueError("Invalid pagination cursor")
+        query = query.filter(
+            _seek_condition(
+                [
+                    SortKey(k.expression, k.descending != (direction == "prev"))
+                    for k in keys
+                ],
+                values,
+            )
+        )
+        query = query.order_by(*_order(keys, direction == "prev")).limit(per_page + 1)
+        return query, page, direction, width
+
+    page = max(page, 1)
+    query = (
+        query.order_by(*_order(keys)).offset((page - 1) * per_page).limit(per_page + 1)
+    )
+    return query, page, "next", width
+
+
+def _page_result(rows, page, per_page, direction, width):
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == "prev":
+        rows.reverse()
+
+    if width == 1:
+        items = [row[0] for row in rows]
+    else:
+        items = [tuple(row[:width]) for row in rows]
+    sort_values = [tuple(row[width:]) for row in rows]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or direction == "prev":
+            next_cursor = encode_cursor(sort_values[-1], page + 1, "next")
+        if page > 1 and (has_more or direction == "next"):
+            prev_cursor = encode_cursor(sort_values[0], page - 1, "prev")
+    return items, page, next_cursor, prev_cursor
+
+
+class CountCache:
+    """
+    Remembers COUNT(*) results for a short time so that paging through a
+    result set does not recount it on every page.
+    """
+
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._counts = {}
+
+    def get(self, key, count):
+        """Return the cached count for key, calling count() on a miss."""
+        value = self._lookup(key)
+        if value is None:
+            value = count()
+            self._store(key, value)
+        return value
+
+    async def get_async(self, key, count):
+        """get for a coroutine function count, awaited on a miss."""
+        value = self._lookup(key)
+        if value is None:
+            value = await count()
+            self._store(key, value)
+        return value
+
+    def _lookup(self, key):
+        cached = self._counts.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def _store(self, key, value):
+        if len(self._counts) >= self.max_entries:
+            self._counts.clear()
+        self._counts[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        self._counts.clear()
@@ -0,0 +1,378 @@
+import bisect
+import heapq
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import delete, func, select
+from app.database.db import db
+from app.database.search import tokenize
+
+DEFAULT_LIMIT = 8
+
+# Relative weight of each signal in the similarity score
+TITLE_WEIGHT = 0.5
+DESCRIPTION_WEIGHT = 0.3
+PRICE_WEIGHT = 0.2
+
+# During a full rebuild, candidates come from the rarest shared title terms
+# first; terms shared by more products than MAX_POSTING_SIZE are too common
+# to be useful, and collection stops after MAX_CANDIDATES products.
+MAX_POSTING_SIZE = 200
+MAX_CANDIDATES = 100
+REBUILD_BATCH_SIZE = 5000
+# Product ids per IN (...) list when reading or deleting many lists at once
+CHUNK_SIZE = 500
+
+STOPWORDS = frozenset(
+    "and are but for from has have its it's not the this that with you your "
+    "used pre owned all any can our out was were will".split()
+)
+
+
+def terms(text):
+    """Distinct, meaningful terms of a piece of text."""
+    return frozenset(
+        token for token in tokenize(text) if len(token) > 2 and token not in STOPWORDS
+    )
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class ProductFeatures:
+    """The parts of a product that similarity is computed from."""
+
+    __slots__ = ("id", "title_terms", "price", "_description", "_description_terms")
+
+    def __init__(self, id, title, description, price):
+        self.id = id
+        self.title_terms = terms(title)
+        self.price = price or 0.0
+        self._description = description
+        self._description_terms = None
+
+    @property
+    def description_terms(self):
+        # Descriptions are long; tokenize them only for products that get scored
+        if self._description_terms is None:
+            self._description_terms = terms(self._description)
+            self._description = None
+        return self._description_terms
+
+    def similarity(self, other):
+        """Score in [0, 1]: shared title/description terms and price closeness."""
+        price = 0.0
+        if self.price > 0 and other.price > 0:
+            price = min(self.price, other.price) / max(self.price, other.price)
+        return (
+            TITLE_WEIGHT * _jaccard(self.title_terms, other.title_terms)
+            + DESCRIPTION_WEIGHT
+            * _jaccard(self.description_terms, other.description_terms)
+            + PRICE_WEIGHT * price
+        )
+
+
+class CandidateIndex:
+    """
+    Bounded candidate sets for the approximate top-K lists of a category:
+    the products sharing a product's rarest title terms plus its closest
+    neighbours by price.
+    """
+
+    def __init__(self, products, limit):
+        self.limit = limit
+        self.postings = defaultdict(list)
+        for features in products:
+            for term in features.title_terms:
+                self.postings[term].append(features)
+        self.by_price = sorted(products, key=lambda features: features.price)
+        self.prices = [features.price for features in self.by_price]
+
+    def candidates(self, features):
+        candidates = {}
+        for posting in sorted(
+            (self.postings[term] for term in features.title_terms), key=len
+        ):
+            if len(posting) > MAX_POSTING_SIZE or len(candidates) >= MAX_CANDIDATES:
+                break
+            candidates.update((other.id, other) for other in posting)
+        position = bisect.bisect_left(self.prices, features.price)
+        window = self.by_price[
+            max(0, position - self.limit) : position + self.limit + 1
+        ]
+        candidates.update((other.id, other) for other in window)
+        return candidates.values()
+
+
+class RecommendationIndex:
+    """
+    Keeps the product_recommendations table filled with the top-K most
+    similar products (same category) of every product.
+
+    Writes are incremental and run inside the caller's transaction: adding a
+    product scores it against its category once and slots it into the lists
+    of neighbours it beats; removing one recomputes only the lists that
+    referenced it.
+    """
+
+    @property
+    def limit(self):
+        return current_app.config.get("RECOMMENDATIONS_PER_PRODUCT", DEFAULT_LIMIT)
+
+    def _category_features(self, category_id, exclude_id=None):
+        from app.models import Product
+
+        query = select(
+            Product.id, Product.title, Product.description, Product.price
+        ).where(Product.category_id == category_id)
+        if exclude_id is not None:
+            query = query.where(Product.id != exclude_id)
+        return [ProductFeatures(*row) for row in db.session.execute(query)]
+
+    def _write_list(self, product_id, scored):
+        self._write_rows(self._rows(product_id, scored))
+
+    @staticmethod
+    def _rows(product_id, scored):
+        return [
+            {"product_id": product_id, "recommended_id": other, "score": score}
+            for score, other in scored
+        ]
+
+    @staticmethod
+    def _write_rows(rows):
+        from app.models import Recommendation
+
+        if rows:
+            db.session.execute(Recommendation.__table__.insert(), rows)
+
+    def _top(self, features, candidates):
+        return heapq.nlargest(
+            self.limit,
+            (
+                (features.similarity(other), other.id)
+                for other in candidates
+                if other.id != features.id
+            ),
+        )
+
+    def add_product(self, product):
+        """Compute a product's list and insert it into its neighbours' lists."""
+        from app.models import Product, Recommendation
+
+        limit = self.limit
+        features = ProductFeatures(
+            product.id, product.title, product.description, product.price
+        )
+        candidates = self._category_features(product.category_id, product.id)
+        scores = [(features.similarity(other), other.id) for other in candidates]
+        self._write_list(product.id, heapq.nlargest(limit, scores))
+
+        # Current list size and weakest score of every product in the category
+        stats = {
+            row.product_id: (row.size, row.weakest)
+            for row in db.session.execute(
+                select(
+                    Recommendation.product_id,
+                    func.count().label("size"),
+                    func.min(Recommendation.score).label("weakest"),
+                )
+                .where(
+                    Recommendation.product_id.in_(
+                        select(Product.id).where(
+                            Product.category_id == product.category_id
+                        )
+                    )
+                )
+                .group_by(Recommendation.product_id)
+            )
+        }
+        for score, other_id in scores:
+            size, weakest = stats.get(other_id, (0, 0.0))
+            if size < limit:
+                self._write_list(other_id, [(score, product.id)])
+            elif score > weakest:
+                weakest_id = (
+                    select(Recommendation.recommended_id)
+                    .where(Recommendation.product_id == other_id)
+                    .order_by(Recommendation.score, Recommendation.recommended_id)
+                    .limit(1)
+                    .scalar_subquery()
+                )
+                db.session.execute(
+                    delete(Recommendation).where(
+                        Recommendation.product_id == other_id,
+                        Recommendation.recommended_id == weakest_id,
+                    )
+                )
+                self._write_list(other_id, [(score, product.id)])
+
+    def add_products(self, products):
+        """
+        add_product for a batch of new products (dicts with id, title,
+        description, price and category_id, already inserted). Each category
+        is read once per batch. In categories larger than MAX_CANDIDATES a
+        new product is only scored against its CandidateIndex candidates, as
+        in rebuild(), so a batch costs O(batch size) rather than
+        O(batch size x category size).
+        """
+        from app.models import Product, Recommendation
+
+        limit = self.limit
+        by_category = defaultdict(list)
+        for product in products:
+            by_category[product["category_id"]].append(
+                ProductFeatures(
+                    product["id"],
+                    product["title"],
+                    product["description"],
+                    product["price"],
+                )
+            )
+
+        for category_id, new in by_category.items():
+            new_ids = {features.id for features in new}
+            products = self._category_features(category_id)
+            index = None
+            if len(products) > MAX_CANDIDATES:
+                index = CandidateIndex(products, limit)
+
+            rows = []
+            gains = defaultdict(list)  # existing product id -> [(score, new id)]
+            for features in new:
+                candidates = products if index is None else index.candidates(features)
+                scores = [
+                    (features.similarity(other), other)
+                    for other in candidates
+                    if other.id != features.id
+                ]
+                top = heapq.nlargest(limit, ((score, o.id) for score, o in scores))
+                rows.extend(self._rows(features.id, top))
+                for score, other in scores:
+                    if other.id not in new_ids:
+                        gains[other.id].append((score, features.id))
+
+            # Size and weakest score of the neighbours' lists; only the lists
+            # a new product gets into are read and rewritten
+            stats = {
+                row.product_id: (row.size, row.weakest)
+                for row in db.session.execute(
+                    select(
+                        Recommendation.product_id,
+                        func.count().label("size"),
+                        func.min(Recommendation.score).label("weakest"),
+                    )
+                    .where(
+                        Recommendation.product_id.in_(
+                            select(Product.id).where(Product.category_id == category_id)
+                        )
+                    )
+                    .group_by(Recommendation.product_id)
+                )
+            }
+            changed = [
+                other_id
+                for other_id, scored in gains.items()
+                if stats.get(other_id, (0, 0.0))[0] < limit
+                # New ids are the largest, so they win ties like in nlargest
+                or max(scored)[0] >= stats[other_id][1]
+            ]
+            current = defaultdict(list)
+            for start in range(0, len(changed), CHUNK_SIZE):
+                chunk = Recommendation.product_id.in_(
+                    changed[start : start + CHUNK_SIZE]
+                )
+                for row in db.session.execute(
+                    select(
+                        Recommendation.product_id,
+                        Recommendation.recommended_id,
+                        Recommendation.score,
+                    ).where(chunk)
+                ):
+                    current[row.product_id].append((row.score, row.recommended_id))
+                db.session.execute(delete(Recommendation).where(chunk))
+            for other_id in changed:
+                merged = heapq.nlargest(limit, current[other_id] + gains[other_id])
+                rows.extend(self._rows(other_id, merged))
+            self._write_rows(rows)
+
+    def remove_product(self, product_id, category_id):
+        """Drop a product everywhere and refill the lists that referenced it."""
+        from app.models import Recommendation
+
+        referrers = db.session.scalars(
+            select(Recommendation.product_id).where(
+                Recommendation.recommended_id == product_id
+            )
+        ).all()
+        db.session.execute(
+            delete(Recommendation).where(
+                (Recommendation.product_id == product_id)
+                | (Recommendation.recommended_id == product_id)
+            )
+        )
+        if not referrers:
+            return
+
+        db.session.execute(
+            delete(Recommendation).where(Recommendation.product_id.in_(referrers))
+        )
+        candidates = self._category_features(category_id, product_id)
+        by_id = {features.id: features for features in candidates}
+        for referrer in referrers:
+            if referrer in by_id:
+                self._write_list(referrer, self._top(by_id[referrer], candidates))
+
+    def update_product(self, product, old_category_id):
+        """Re-score a product whose title, description, price or category changed."""
+        self.remove_product(product.id, old_category_id)
+        self.add_product(product)
+
+    def recommended_ids(self, product_id):
+        from app.models import Recommendation
+
+        return db.session.scalars(
+            select(Recommendation.recommended_id)
+            .where(Recommendation.product_id == product_id)
+            .order_by(Recommendation.score.desc())
+            .limit(self.limit)
+        ).all()
+
+    def setup(self):
+        """Build the index once when it is empty but products exist."""
+        from app.models import Product, Recommendation
+
+        has_rows = db.session.query(db.exists().where(Recommendation.product_id > 0))
+        has_products = db.session.query(db.exists().where(Product.id > 0))
+        if not has_rows.scalar() and has_products.scalar():
+            self.rebuild()
+            db.session.commit()
+
+    def rebuild(self):
+        """
+        Recompute every list from scratch.
+        Candidates for a product are a bounded number of products sharing its
+        rarest title terms plus its closest neighbours by price, so the
+        rebuild stays linear in catalog size.
+        """
+        from app.models import Product, Recommendation
+
+        db.session.execute(delete(Recommendation))
+        rows = []
+        category_ids = db.session.scalars(select(Product.category_id).distinct()).all()
+        for category_id in category_ids:
+            products = self._category_features(category_id)
+            index = CandidateIndex(products, self.limit)
+            for features in products:
+                rows.extend(
+                    self._rows(
+                        features.id, self._top(features, index.candidates(features))
+                    )
+                )
+                if len(rows) >= REBUILD_BATCH_SIZE:
+                    self._write_rows(rows)
+                    rows = []
+        self._write_rows(rows)
@@ -0,0 +1,174 @@
+import re
+from sqlalchemy import column, event, false, literal_column, table, text
+from sqlalchemy.exc import OperationalError
+from app.database.db import db
+
+FTS_TABLE = "products_fts"
+
+# Weights passed to bm25(): a hit in the title counts ten times as much as a
+# hit in the description.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+fts_table = table(FTS_TABLE, column("rowid"))
+
+# BM25 score of the current match; lower is more relevant
+relevance = literal_column(f"bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(search_text):
+    """Split free text into lower-cased word tokens."""
+    return _TOKEN_RE.findall((search_text or "").lower())
+
+
+def build_match_expression(search_text):
+    """
+    Turn user input into an FTS5 MATCH expression.
+    Every token is quoted (so FTS5 operators typed by users are taken
+    literally) and marked as a prefix, and tokens are implicitly AND-ed:
+    "dell lap" becomes '"dell"* "lap"*'.
+    """
+    return " ".join(f'"{token}"*' for token in tokenize(search_text))
+
+
+class SearchIndex:
+    """
+    Full-text index over products.title and products.description backed by
+    an SQLite FTS5 virtual table whose rowid is the product id.
+
+    The table is maintained by DatabaseManager writes. When FTS5 is not
+    compiled into SQLite (or the database is not SQLite) the index reports
+    itself unavailable and searches fall back to LIKE filtering.
+    """
+
+    def __init__(self):
+        self._available = None
+
+    @property
+    def available(self):
+        """Whether the FTS table exists in the current database."""
+        if self._available is None:
+            self._available = self._table_exists()
+        return self._available
+
+    def _table_exists(self):
+        if db.engine.dialect.name != "sqlite":
+            return False
+        row = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        return row is not None
+
+    def setup(self):
+        """
+        Create the FTS table if needed and rebuild it when it is out of step
+        with the products table. Returns True when full-text search is usable.
+        """
+        if db.engine.dialect.name != "sqlite":
+            self._available = False
+            return False
+
+        try:
+            db.session.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    "title, description, "
+                    "tokenize = 'unicode61 remove_diacritics 2', "
+                    "prefix = '2 3')"
+                )
+            )
+        except OperationalError:
+            # SQLite was built without FTS5
+            db.session.rollback()
+            self._available = False
+            return False
+
+        indexed = db.session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+        products = db.session.execute(text("SELECT count(*) FROM products")).scalar()
+        if indexed != products:
+            self.rebuild()
+        db.session.commit()
+        self._available = True
+        return True
+
+    def rebuild(self):
+        """Repopulate the index from the products table."""
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        db.session.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "SELECT id, title, coalesce(description, '') FROM products"
+            )
+        )
+
+    def index_product(self, product):
+        """Add or replace a product in the index (within the caller's transaction)."""
+        if not self.available:
+            return
+        self.remove_product(product.id)
+        db.session.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            {
+                "id": product.id,
+                "title": product.title,
+                "description": product.description or "",
+            },
+        )
+
+    def index_products(self, products):
+        """
+        Add a batch of new products (dicts with id, title and description)
+        in one executemany, within the caller's transaction.
+        """
+        if not self.available or not products:
+            return
+        db.session.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            [
+                {
+                    "id": product["id"],
+                    "title": product["title"],
+                    "description": product["description"] or "",
+                }
+                for product in products
+            ],
+        )
+
+    def remove_product(self, product_id):
+        """Drop a product from the index (within the caller's transaction)."""
+        if not self.available:
+            return
+        db.session.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": product_id}
+        )
+
+    def match_query(self, query, product_model, search_text):
+        """
+        Restrict an ORM query on Product to rows matching search_text. Text
+        without any word (e.g. "!!!") matches nothing.
+        """
+        match = build_match_expression(search_text)
+        if not match:
+            return query.filter(false()) if search_text.strip() else query
+        return query.join(fts_table, fts_table.c.rowid == product_model.id).filter(
+            text(f"{FTS_TABLE} MATCH :fts_match").bindparams(fts_match=match)
+        )
+
+
+def _drop_fts_table(target, connection, **kw):
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def register_schema_events(products_table):
+    """Drop the FTS table together with the products table (db.drop_all)."""
+    if not event.contains(products_table, "after_drop", _drop_fts_table):
+        event.listen(products_table, "after_drop", _drop_fts_table)
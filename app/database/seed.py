@@ -1,4 +1,19 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.database.db import db
+from app.database.synthetic import batch_rng, product_rows
+from app.utils.passwords import password_hasher
+
+# Synthetic users and products get ids from here upwards, clear of the samples
+SYNTHETIC_ID_BASE = 1_000_000
+
+
+def _insert_ignoring_conflicts(model, rows):
+    """Insert rows in one executemany, skipping those whose keys already exist."""
+    if rows:
+        db.session.execute(
+            sqlite_insert(model.__table__).on_conflict_do_nothing(), rows
+        )
 
 
 def insert_test_users():
@@ -11,14 +26,13 @@ def insert_test_users():
         ("testuser3", "password3"),
     ]
 
-    for username, password in test_users:
-        # Check if user already exists
-        existing_user = User.query.filter_by(username=username).first()
-        if not existing_user:
-            new_user = User(username=username)
-            new_user.set_password(password)
-            db.session.add(new_user)
-
+    _insert_ignoring_conflicts(
+        User,
+        [
+            {"username": username, "password": password_hasher().hash(password)}
+            for username, password in test_users
+        ],
+    )
     db.session.commit()
 
 
@@ -37,12 +51,7 @@ def insert_categories():
         "Beauty & Personal Care",
     ]
 
-    for category_name in categories:
-        existing_category = Category.query.filter_by(name=category_name).first()
-        if not existing_category:
-            new_category = Category(name=category_name)
-            db.session.add(new_category)
-
+    _insert_ignoring_conflicts(Category, [{"name": name} for name in categories])
     db.session.commit()
 
 
@@ -170,28 +179,31 @@ def insert_sample_products():
         ),
     ]
 
-    for (
-        title,
-        price,
-        currency,
-        description,
-        category_id,
-        seller_id,
-        image_url,
-    ) in sample_products:
-        existing_product = Product.query.filter_by(title=title).first()
-        if not existing_product:
-            new_product = Product(
-                title=title,
-                price=price,
-                currency=currency,
-                description=description,
-                category_id=category_id,
-                seller_id=seller_id,
-                image_url=image_url,
-            )
-            db.session.add(new_product)
-
+    # Fixed ids make re-running the seed a no-op
+    _insert_ignoring_conflicts(
+        Product,
+        [
+            {
+                "id": product_id,
+                "title": title,
+                "price": price,
+                "currency": currency,
+                "description": description,
+                "category_id": category_id,
+                "seller_id": seller_id,
+                "image_url": image_url,
+            }
+            for product_id, (
+                title,
+                price,
+                currency,
+                description,
+                category_id,
+                seller_id,
+                image_url,
+            ) in enumerate(sample_products, start=1)
+        ],
+    )
     db.session.commit()
 
 
@@ -205,5 +217,95 @@ def insert_db_samples():
         print(f"An unexpected error occurred: {e}")
 
 
+def seed_synthetic(
+    users=0,
+    products=0,
+    batch_size=10_000,
+    seed=0,
+    password="password",
+    image_url="/static/images/no_image.jpg",
+    progress=None,
+):
+    """
+    Bulk-insert `users` synthetic users (seed_user_<n>) and `products`
+    synthetic products, in batches of batch_size rows with one commit each.
+
+    Row n always gets id SYNTHETIC_ID_BASE + n and the same generated content
+    for the same seed and batch size, and existing ids are skipped, so the
+    command can be re-run or resumed after an interruption. The password is
+    hashed once and shared by every synthetic user. Products are sold by the
+    synthetic users (or by the existing users when none are requested);
+    ValueError is raised when there is nobody to sell them. Derived tables
+    (search index, recommendations) are not updated; see rebuild_derived.
+
+    Returns {"users": inserted, "products": inserted}.
+    """
+    from app.models import Category, Product, User
+
+    def count(model):
+        return db.session.scalar(select(func.count()).select_from(model))
+
+    def report(kind, done, total):
+        if progress is not None:
+            progress(kind, done, total)
+
+    if products and not users and not count(User):
+        raise ValueError("No sellers: pass --users to create some")
+
+    insert_categories()
+    categories = dict(db.session.execute(select(Category.id, Category.name)).all())
+    users_before, products_before = count(User), count(Product)
+
+    if users:
+        password_hash = password_hasher().hash(password)
+        for start in range(0, users, batch_size):
+            stop = min(users, start + batch_size)
+            _insert_ignoring_conflicts(
+                User,
+                [
+                    {
+                        "id": SYNTHETIC_ID_BASE + n,
+                        "username": f"seed_user_{n}",
+                        "password": password_hash,
+                    }
+                    for n in range(start, stop)
+                ],
+            )
+            db.session.commit()
+            report("users", stop, users)
+        seller_ids = list(range(SYNTHETIC_ID_BASE, SYNTHETIC_ID_BASE + users))
+    else:
+        seller_ids = db.session.scalars(select(User.id)).all()
+
+    for batch, start in enumerate(range(0, products, batch_size)):
+        stop = min(products, start + batch_size)
+        rows = product_rows(
+            batch_rng(seed, batch),
+            stop - start,
+            SYNTHETIC_ID_BASE + start,
+            categories,
+            seller_ids,
+            image_url,
+        )
+        _insert_ignoring_conflicts(Product, list(rows))
+        db.session.commit()
+        report("products", stop, products)
+
+    return {
+        "users": count(User) - users_before,
+        "products": count(Product) - products_before,
+    }
+
+
+def rebuild_derived(manager):
+    """Rebuild the search index and recommendations after a bulk load."""
+    manager.search_index.rebuild()
+    db.session.commit()
+    manager.recommendations.rebuild()
+    db.session.commit()
+    manager.cache.clear()
+    manager.count_cache.clear()
+
+
 if __name__ == "__main__":
     insert_db_samples()
@@ -0,0 +1,447 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.database.db import db, schedule_build
+from app.database.pagination import _page_result, decode_cursor
+
+try:
+    import numpy
+except ImportError:  # numpy is optional; without it the columns are scanned in Python
+    numpy = None
+
+EPOCH = datetime(1970, 1, 1)
+LOAD_BATCH_SIZE = 10_000
+# Product ids per IN (...) list when reading back changed products
+CHUNK_SIZE = 500
+# Changes applied to the cached sort orders one by one; larger batches
+# drop the orders instead, to be sorted again by the next query needing one
+MAX_ORDER_UPDATES = 32
+# Filters matching fewer than 1/SELECTIVE_RATIO of the products are ranked
+# directly instead of walking a sort order
+SELECTIVE_RATIO = 16
+
+# Sort order -> (column of its first key, None for id order; descending).
+# The orders and cursors are those of DatabaseManager._sort_keys.
+SORTS = {
+    "relevance": (None, False),
+    "newest": ("created", True),
+    "price_asc": ("prices", False),
+    "price_desc": ("prices", True),
+}
+
+# Column -> (array typecode, numpy dtype)
+COLUMNS = {
+    "ids": ("q", "int64"),
+    "prices": ("d", "float64"),
+    "category_ids": ("i", "int32"),
+    "seller_ids": ("i", "int32"),
+    "created": ("q", "int64"),  # created_at in microseconds since the epoch
+}
+
+
+def _microseconds(moment):
+    return 0 if moment is None else (moment - EPOCH) // timedelta(microseconds=1)
+
+
+class CatalogSnapshot:
+    """
+    The numeric columns of the products table (id, price, category, seller,
+    creation time) held per worker in parallel arrays ordered by id, for
+    answering listing queries without SQL: which products are on a page of
+    a category and price range in a sort order, how many match in all, and
+    the search facet counts. The page's rows are then read by primary key.
+
+    With numpy the columns are filtered and ranked as vectors (zero-copy
+    views of the arrays); without it the same work is a Python loop.
+    DatabaseManager writes feed the ids of changed products to changed(),
+    and they are read back from the database before the next query.
+    """
+
+    def __init__(self):
+        self.built_at = None
+        self._columns = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        self._orders = {}  # sort column -> positions in (column, id) order
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.built_at is not None
+
+    @staticmethod
+    def _statement():
+        from app.models import Product
+
+        return select(
+            Product.id,
+            Product.price,
+            Product.category_id,
+            Product.seller_id,
+            Product.created_at,
+        )
+
+    @staticmethod
+    def _values(row):
+        product_id, price, category_id, seller_id, created_at = row
+        return (
+            product_id,
+            price or 0.0,
+            category_id,
+            seller_id,
+            _microseconds(created_at),
+        )
+
+    def build(self):
+        """(Re)load every column from the products table."""
+        from app.models import Product
+
+        columns = {name: array(code) for name, (code, _) in COLUMNS.items()}
+        appends = [column.append for column in columns.values()]
+        rows = db.session.execute(
+            self._statement()
+            .order_by(Product.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        for row in rows:
+            for append, value in zip(appends, self._values(row)):
+                append(value)
+        db.session.commit()
+        with self._lock:
+            self._columns = columns
+            self._orders = {}
+            self.built_at = time.time()
+
+    def changed(self, product_ids):
+        """Change feed: these products were added, updated or deleted."""
+        with self._lock:
+            self._pending.update(product_ids)
+
+    def _apply_changes(self):
+        """Read back the products in the change feed (with the lock held)."""
+        from app.models import Product
+
+        if not self._pending:
+            return
+        changed = sorted(self._pending)
+        rows = {}
+        for start in range(0, len(changed), CHUNK_SIZE):
+            chunk = changed[start : start + CHUNK_SIZE]
+            for row in db.session.execute(
+                self._statement().where(Product.id.in_(chunk))
+            ):
+                rows[row.id] = self._values(row)
+        self._pending.clear()
+
+        if len(changed) > MAX_ORDER_UPDATES:
+            self._orders = {}  # Cheaper to sort again when next needed
+        columns = list(self._columns.values())
+        ids = self._columns["ids"]
+        for product_id in changed:
+            i = bisect_left(ids, product_id)
+            found = i < len(ids) and ids[i] == product_id
+            values = rows.get(product_id)
+            if values is None:
+                if found:
+                    for column in columns:
+                        del column[i]
+                    self._update_orders(i, removed=True)
+            elif found:
+                for column, value in zip(columns, values):
+                    column[i] = value
+                self._update_orders(i)
+            else:
+                for column, value in zip(columns, values):
+                    column.insert(i, value)
+                self._update_orders(i, inserted=True)
+
+    def page(
+        self,
+        categories=(),
+        min_price=None,
+        max_price=None,
+        sort="relevance",
+        page=1,
+        per_page=10,
+        cursor=None,
+        with_total=True,
+    ):
+        """
+        paginate() over the snapshot for products in the given categories
+        and price range (min inclusive, max exclusive): returns (ids,
+        current_page, next_cursor, prev_cursor, total). Cursors are
+        interchangeable with those of the SQL listings; total is None
+        unless with_total is set.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort order {sort!r}")
+        column, descending = SORTS[sort]
+        values = None
+        if cursor:
+            values, page, direction = decode_cursor(cursor)
+            if len(values) != (1 if column is None else 2):
+                raise ValueError("Invalid pagination cursor")
+            if column == "created":
+                values = [_microseconds(values[0]), values[1]]
+        else:
+            page, direction = max(page, 1), "next"
+        offset = 0 if cursor else (page - 1) * per_page
+        select_rows = self._select_numpy if numpy is not None else self._select_python
+
+        with self._lock:
+            self._apply_changes()
+            positions, total = select_rows(
+                set(categories or ()),
+                min_price,
+                max_price,
+                column,
+                descending != (direction == "prev"),
+                values,
+                offset + per_page + 1,
+            )
+            rows = [self._sort_row(i, column) for i in positions[offset:]]
+
+        ids, page, next_cursor, prev_cursor = _page_result(
+            rows, page, per_page, direction, 1
+        )
+        return ids, page, next_cursor, prev_cursor, total if with_total else None
+
+    def _sort_row(self, i, column):
+        """(id, *sort key values) of the product at position i."""
+        product_id = self._columns["ids"][i]
+        if column is None:
+            return (product_id, product_id)
+        value = self._columns[column][i]
+        if column == "created":
+            value = EPOCH + timedelta(microseconds=value)
+        return (product_id, value, product_id)
+
+    def _vector(self, name):
+        return numpy.frombuffer(self._columns[name], dtype=COLUMNS[name][1])
+
+    def _mask_numpy(self, categories, min_price, max_price):
+        """Boolean vector of the products in the filters, or None for all."""
+        mask = None
+        category_ids = self._vector("category_ids")
+        for category_id in categories:
+            match = category_ids == category_id
+            mask = match if mask is None else mask | match
+        prices = self._vector("prices")
+        for condition in (
+            None if min_price is None else prices >= min_price,
+            None if max_price is None else prices < max_price,
+        ):
+            if condition is not None:
+                mask = condition if mask is None else mask & condition
+        return mask
+
+    def _order(self, column):
+        """Positions sorted by (column, id), computed once and then maintained."""
+        order = self._orders.get(column)
+        if order is None:
+            # Positions are in id order, so a stable sort breaks ties by id
+            order = self._orders[column] = numpy.argsort(
+                self._vector(column), kind="stable"
+            )
+        return order
+
+    def _rank(self, column, order, key, right=False):
+        """Where (key value, id) goes in the (column, id) order."""
+        keys, ids = self._columns[column], self._columns["ids"]
+        find = bisect_right if right else bisect_left
+        return find(
+            range(len(order)), key, key=lambda j: (keys[order[j]], ids[order[j]])
+        )
+
+    def _select_numpy(
+        self, categories, min_price, max_price, column, reverse, values, limit
+    ):
+        """
+        Positions of the first `limit` products in the filters and after the
+        cursor values, in sort order (reversed when `reverse`), and how many
+        products are in the filters. Walks the sort order from the cursor in
+        growing chunks, so a page costs the filter mask plus a few chunks;
+        selective filters sort their matches instead.
+        """
+        ids = self._vector("ids")
+        mask = self._mask_numpy(categories, min_price, max_price)
+        total = len(ids) if mask is None else int(numpy.count_nonzero(mask))
+        if mask is not None and total * SELECTIVE_RATIO < len(ids):
+            return self._rank_matches(mask, column, reverse, values, limit), total
+
+        # The walk covers order[start:end], forwards or from the end backwards
+        order = None if column is None else self._order(column)
+        start, end = 0, len(ids)
+        if values is not None:
+            if order is None:
+                bound = numpy.searchsorted(
+                    ids, values[0], "left" if reverse else "right"
+                )
+            else:
+                bound = self._rank(column, order, tuple(values), right=not reverse)
+            start, end = (start, int(bound)) if reverse else (int(bound), end)
+
+        found, count, step = [], 0, max(limit * 4, 64)
+        while count < limit and start < end:
+            if reverse:
+                chunk = slice(max(start, end - step), end)
+                end = chunk.start
+            else:
+                chunk = slice(start, min(end, start + step))
+                start = chunk.stop
+            positions = (
+                numpy.arange(chunk.start, chunk.stop) if order is None else order[chunk]
+            )
+            if reverse:
+                positions = positions[::-1]
+            if mask is not None:
+                positions = positions[mask[positions]]
+            found.append(positions[: limit - count])
+            count += len(found[-1])
+            step *= 2
+        return [int(i) for part in found for i in part], total
+
+    def _rank_matches(self, mask, column, reverse, values, limit):
+        """The _select_numpy positions, by sorting the products in the mask."""
+        positions = numpy.flatnonzero(mask)
+        ids = self._vector("ids")[positions]
+        keys = None if column is None else self._vector(column)[positions]
+        if values is not None:
+            after = numpy.greater if not reverse else numpy.less
+            keep = after(ids, values[-1])
+            if keys is not None:
+                keep = after(keys, values[0]) | ((keys == values[0]) & keep)
+            positions, ids = positions[keep], ids[keep]
+            keys = None if keys is None else keys[keep]
+        # Positions are in id order already; otherwise sort by (key, id)
+        if keys is not None:
+            positions = positions[numpy.lexsort((ids, keys))]
+        if reverse:
+            positions = positions[::-1]
+        return positions[:limit].tolist()
+
+    def _update_orders(self, i, inserted=False, removed=False):
+        """Keep the cached sort orders in step with a change at position i."""
+        for column, order in self._orders.items():
+            if not inserted:
+                order = numpy.delete(order, numpy.flatnonzero(order == i))
+            if inserted:
+                order = numpy.where(order >= i, order + 1, order)
+            elif removed:
+                order = numpy.where(order > i, order - 1, order)
+            if not removed:
+                key = (self._columns[column][i], self._columns["ids"][i])
+                order = numpy.insert(order, self._rank(column, order, key), i)
+            self._orders[column] = order
+
+    def _select_python(
+        self, categories, min_price, max_price, column, reverse, values, limit
+    ):
+        """_select_numpy, one product at a time."""
+        ids = self._columns["ids"]
+        category_ids = self._columns["category_ids"]
+        prices = self._columns["prices"]
+        positions = [
+            i
+            for i in range(len(ids))
+            if (not categories or category_ids[i] in categories)
+            and (min_price is None or prices[i] >= min_price)
+            and (max_price is None or prices[i] < max_price)
+        ]
+        total = len(positions)
+
+        sign = -1 if reverse else 1
+        if column is None:
+            if values is not None:
+                positions = [i for i in positions if sign * ids[i] > sign * values[0]]
+            return (positions[::-1] if reverse else positions)[:limit], total
+
+        keys = self._columns[column]
+
+        def rank(i):
+            return (sign * keys[i], sign * ids[i])
+
+        if values is not None:
+            bound = (sign * values[0], sign * values[1])
+            positions = [i for i in positions if rank(i) > bound]
+        return heapq.nsmallest(limit, positions, key=rank), total
+
+    def facet_rows(self, bounds, min_price=None, max_price=None):
+        """
+        The rows of DatabaseManager._facet_statement without search text:
+        (category_id, price bucket, in price range, count), where bucket i
+        holds prices below bounds[i] (and the last one the rest).
+        """
+        with self._lock:
+            self._apply_changes()
+            if numpy is None:
+                counts = Counter(
+                    (
+                        category_id,
+                        bisect_right(bounds, price),
+                        (min_price is None or price >= min_price)
+                        and (max_price is None or price < max_price),
+                    )
+                    for category_id, price in zip(
+                        self._columns["category_ids"], self._columns["prices"]
+                    )
+                )
+                return [(*key, count) for key, count in sorted(counts.items())]
+
+            prices = self._vector("prices")
+            buckets = numpy.searchsorted(
+                numpy.asarray(bounds, dtype="float64"), prices, side="right"
+            )
+            in_range = self._mask_numpy((), min_price, max_price)
+            if in_range is None:
+                in_range = numpy.ones(len(prices), dtype=bool)
+            width = len(bounds) + 1
+            keys = (
+                self._vector("category_ids").astype("int64") * width + buckets
+            ) * 2 + in_range
+            counts = numpy.bincount(keys)
+            unique = numpy.flatnonzero(counts)
+            counts = counts[unique]
+        return [
+            (key // 2 // width, key // 2 % width, bool(key % 2), count)
+            for key, count in zip(unique.tolist(), counts.tolist())
+        ]
+
+    def stats(self):
+        """Number of products and the bytes their columns occupy."""
+        with self._lock:
+            size = sum(
+                column.buffer_info()[1] * column.itemsize
+                for column in self._columns.values()
+            ) + sum(order.nbytes for order in self._orders.values())
+            return {
+                "products": len(self._columns["ids"]),
+                "bytes": size,
+                "pending": len(self._pending),
+                "numpy": numpy is not None,
+                "built_at": self.built_at,
+            }
+
+
+def init_catalog_snapshot(app):
+    """
+    With CATALOG_SNAPSHOT set, give the manager a CatalogSnapshot and load
+    it (in the background unless CATALOG_SNAPSHOT_BUILD_IN_BACKGROUND is
+    off, and again every CATALOG_SNAPSHOT_REFRESH_SECONDS). Listings use it
+    once it is loaded.
+    """
+    if not app.config.get("CATALOG_SNAPSHOT", False):
+        return None
+    snapshot = app.db.snapshot = CatalogSnapshot()
+    schedule_build(
+        app,
+        snapshot.build,
+        "catalog snapshot",
+        background=app.config.get("CATALOG_SNAPSHOT_BUILD_IN_BACKGROUND", True),
+        interval=app.config.get("CATALOG_SNAPSHOT_REFRESH_SECONDS", 0),
+    )
+    return snapshot
@@ -0,0 +1,263 @@
+import heapq
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from sqlalchemy import select
+from app.database.db import db, schedule_build
+from app.database.search import tokenize
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 10
+# Categories listed ahead of the term completions
+CATEGORY_LIMIT = 3
+
+# Title tokens outside these lengths are not worth suggesting
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 24
+
+# Completions of a prefix matching at most SCAN_LIMIT terms are ranked by
+# scanning them; the top MAX_LIMIT of wider prefixes (the first letter or
+# two) are kept and updated in place instead.
+SCAN_LIMIT = 2000
+BUILD_BATCH_SIZE = 5000
+
+
+def normalize(text):
+    """Lower-case text and strip accents, as the FTS5 tokenizer does."""
+    text = (text or "").lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def title_terms(title):
+    """The distinct suggestible terms of a product title."""
+    return {
+        token
+        for token in tokenize(normalize(title))
+        if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH
+    }
+
+
+class SuggestIndex:
+    """
+    In-process prefix index for typeahead: the distinct terms of all product
+    titles in one sorted list, with the number of products using each term
+    in a parallel array, plus the category names.
+
+    A prefix is a bisect into the sorted terms; its completions are ranked by
+    product count. Every worker builds its own index at startup (build())
+    and DatabaseManager writes keep it in step. At most max_terms terms are
+    kept: a build keeps the most used ones, and new terms are not added
+    once the index is full (they are counted in `dropped`) until the next
+    build makes room.
+    """
+
+    def __init__(self, max_terms=300_000):
+        self.max_terms = max_terms
+        self.dropped = 0
+        self.built_at = None
+        self._terms = []
+        self._counts = array("I")
+        self._top = {}  # wide prefix -> its top MAX_LIMIT terms
+        self._categories = []  # (normalized name, name, id)
+        self._pending = None  # changes made while a build is running
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.built_at is not None
+
+    def build(self):
+        """(Re)build the index from the products and categories tables."""
+        from app.models import Category, Product
+
+        with self._lock:
+            self._pending = []
+        try:
+            counts = Counter()
+            titles = db.session.scalars(
+                select(Product.title).execution_options(yield_per=BUILD_BATCH_SIZE)
+            )
+            for title in titles:
+                counts.update(title_terms(title))
+            categories = [
+                (normalize(name), name, category_id)
+                for category_id, name in db.session.execute(
+                    select(Category.id, Category.name).order_by(Category.name)
+                )
+            ]
+            db.session.commit()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        dropped = max(len(counts) - self.max_terms, 0)
+        items = sorted(
+            counts.most_common(self.max_terms) if dropped else counts.items()
+        )
+        with self._lock:
+            self._terms = [term for term, _ in items]
+            self._counts = array("I", (count for _, count in items))
+            self._top = {}
+            self._categories = categories
+            self.dropped = dropped
+            pending, self._pending = self._pending, None
+            for terms, delta in pending:
+                self._change(terms, delta)
+            self.built_at = time.time()
+
+    def add_product(self, title):
+        self.add_products([title])
+
+    def add_products(self, titles):
+        with self._lock:
+            for title in titles:
+                self._record(title_terms(title), 1)
+
+    def remove_product(self, title):
+        with self._lock:
+            self._record(title_terms(title), -1)
+
+    def update_product(self, old_title, new_title):
+        old, new = title_terms(old_title), title_terms(new_title)
+        with self._lock:
+            self._record(old - new, -1)
+            self._record(new - old, 1)
+
+    def _record(self, terms, delta):
+        if self._pending is not None:
+            self._pending.append((terms, delta))
+        self._change(terms, delta)
+
+    def _find(self, term):
+        i = bisect_left(self._terms, term)
+        found = i < len(self._terms) and self._terms[i] == term
+        return i, found
+
+    def _count(self, term):
+        i, found = self._find(term)
+        return self._counts[i] if found else 0
+
+    def _change(self, terms, delta):
+        for term in terms:
+            i, found = self._find(term)
+            if found:
+                count = self._counts[i] + delta
+                if count > 0:
+                    self._counts[i] = count
+                else:
+                    del self._terms[i]
+                    del self._counts[i]
+            elif delta > 0:
+                if len(self._terms) >= self.max_terms:
+                    self.dropped += 1
+                    continue
+                self._terms.insert(i, term)
+                self._counts.insert(i, delta)
+            else:
+                continue
+            self._update_top(term, delta)
+
+    def _update_top(self, term, delta):
+        """Keep the cached top terms of the term's wide prefixes in order."""
+        for length in range(1, len(term) + 1):
+            prefix = term[:length]
+            top = self._top.get(prefix)
+            if top is None:
+                continue
+            if delta < 0:
+                if term in top:
+                    del self._top[prefix]  # A lower term may move up; rescan
+                continue
+            if term not in top:
+                top.append(term)
+            top.sort(key=lambda t: (-self._count(t), t))
+            del top[MAX_LIMIT:]
+
+    def _completions(self, prefix, limit):
+        lo = bisect_left(self._terms, prefix)
+        hi = bisect_left(self._terms, prefix + "\U0010ffff", lo)
+        if hi - lo <= SCAN_LIMIT:
+            best = heapq.nlargest(limit, range(lo, hi), key=self._counts.__getitem__)
+            return [(self._terms[i], self._counts[i]) for i in best]
+        top = self._top.get(prefix)
+        if top is None:
+            best = heapq.nlargest(
+                MAX_LIMIT, range(lo, hi), key=self._counts.__getitem__
+            )
+            top = self._top[prefix] = [self._terms[i] for i in best]
+        return [(term, self._count(term)) for term in top[:limit]]
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """
+        Suggestions for a partially typed query: the categories whose name
+        starts with it (or, for a single word, has a word starting with it),
+        then completions of its last word, most used first.
+        """
+        tokens = tokenize(normalize(query))
+        if not tokens:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+        *head, prefix = tokens
+        phrase = " ".join(tokens)
+
+        with self._lock:
+            categories = [
+                {"type": "category", "text": name, "category_id": category_id}
+                for normalized, name, category_id in self._categories
+                if normalized.startswith(phrase)
+                or (
+                    not head
+                    and any(word.startswith(prefix) for word in tokenize(normalized))
+                )
+            ][: min(CATEGORY_LIMIT, limit)]
+            completions = self._completions(prefix, limit - len(categories))
+
+        return categories + [
+            {"type": "term", "text": " ".join([*head, term]), "count": count}
+            for term, count in completions
+        ]
+
+    def stats(self):
+        """Size of the index; bytes are what the lists and strings occupy."""
+        with self._lock:
+            size = (
+                sys.getsizeof(self._terms)
+                + sum(sys.getsizeof(term) for term in self._terms)
+                + self._counts.buffer_info()[1] * self._counts.itemsize
+            )
+            return {
+                "terms": len(self._terms),
+                "max_terms": self.max_terms,
+                "dropped": self.dropped,
+                "categories": len(self._categories),
+                "bytes": size,
+                "built_at": self.built_at,
+            }
+
+
+def init_suggest_index(app):
+    """
+    Size the manager's SuggestIndex from the config and build it: inline,
+    or on a background thread so workers start answering at once (until it
+    is ready, suggestions only cover categories it has loaded, i.e. none).
+    With SUGGEST_REFRESH_SECONDS the index is rebuilt on that period, which
+    picks up writes made by other worker processes.
+    """
+    index = app.db.suggestions
+    index.max_terms = app.config.get("SUGGEST_MAX_TERMS", index.max_terms)
+    schedule_build(
+        app,
+        index.build,
+        "suggestion index",
+        background=app.config.get("SUGGEST_BUILD_IN_BACKGROUND", True),
+        interval=app.config.get("SUGGEST_REFRESH_SECONDS", 0),
+    )
+    return index
@@ -0,0 +1,116 @@
+"""Generators for realistic-looking synthetic users and products."""
+
+import random
+
+CONDITIONS = [
+    "Like New",
+    "Very Good Condition",
+    "Good Condition",
+    "Used",
+    "Refurbished",
+]
+
+# Category name -> (brands, items, adjectives, price range in EUR)
+CATALOG = {
+    "Electronics": (
+        ["Dell", "Apple", "Samsung", "Lenovo", "Sony", "HP", "Asus", "Canon"],
+        ["Laptop", "Smartphone", "Tablet", "Monitor", "Camera", "Smartwatch"],
+        ["15-inch", "Unlocked", "128GB", "Wireless", "4K", "Touchscreen"],
+        (40, 1500),
+    ),
+    "Accessories": (
+        ["Bose", "Logitech", "Anker", "JBL", "Fossil", "Ray-Ban", "Herschel"],
+        ["Headphones", "Charger", "Mouse", "Keyboard", "Backpack", "Sunglasses"],
+        ["Noise-Canceling", "Bluetooth", "Leather", "Compact", "Ergonomic"],
+        (5, 250),
+    ),
+    "Clothing": (
+        ["Levi's", "Nike", "Adidas", "Zara", "H&M", "Patagonia", "Uniqlo"],
+        ["Jacket", "Jeans", "Sneakers", "Dress", "Sweater", "Coat", "Shirt"],
+        ["Denim", "Wool", "Cotton", "Waterproof", "Slim Fit", "Vintage"],
+        (5, 200),
+    ),
+    "Home & Kitchen": (
+        ["IKEA", "Philips", "KitchenAid", "Tefal", "Nespresso", "Dyson"],
+        ["Blender", "Coffee Machine", "Lamp", "Chair", "Kettle", "Pan Set"],
+        ["Stainless Steel", "Ceramic", "Oak", "Cordless", "Non-Stick"],
+        (8, 400),
+    ),
+    "Books": (
+        ["Penguin", "Vintage", "O'Reilly", "HarperCollins", "Bloomsbury"],
+        ["Novel", "Cookbook", "Guide", "Biography", "Textbook", "Box Set"],
+        ["Hardcover", "Paperback", "First Edition", "Illustrated", "Annotated"],
+        (2, 60),
+    ),
+    "Toys": (
+        ["LEGO", "Hasbro", "Mattel", "Playmobil", "Ravensburger", "Nintendo"],
+        ["Building Set", "Board Game", "Puzzle", "Doll House", "Console"],
+        ["Complete", "Collector's", "Family", "Educational", "Retro"],
+        (3, 300),
+    ),
+    "Sports": (
+        ["Decathlon", "Wilson", "Trek", "Garmin", "Salomon", "Head"],
+        ["Bike", "Tennis Racket", "Running Shoes", "Yoga Mat", "Helmet"],
+        ["Carbon", "Lightweight", "Trail", "Adjustable", "Pro"],
+        (5, 900),
+    ),
+    "Beauty & Personal Care": (
+        ["Philips", "Braun", "Dyson", "Remington", "Oral-B", "Foreo"],
+        ["Hair Dryer", "Shaver", "Straightener", "Electric Toothbrush"],
+        ["Cordless", "Travel", "Ionic", "Rechargeable", "Professional"],
+        (5, 350),
+    ),
+}
+
+_SENTENCES = [
+    "This pre-owned {item} from {brand} is listed as {condition} and works well.",
+    "It has been well looked after and shows only minor signs of use.",
+    "A {adjective} option that costs a fraction of the price of a new one.",
+    "Comes from a smoke-free home and has been cleaned and tested.",
+    "Ideal for anyone looking for a reliable {item} on a budget.",
+    "Pick-up or shipping can be arranged after purchase.",
+    "Original packaging is not included, but all essential parts are.",
+    "Buying second-hand keeps this {item} out of landfill for years to come.",
+]
+
+
+def product_rows(rng, count, first_id, categories, seller_ids, image_url):
+    """
+    Yield `count` product row dicts with ids from first_id upwards.
+    `categories` maps category id -> name; names missing from CATALOG fall
+    back to a generic template.
+    """
+    category_items = list(categories.items())
+    for offset in range(count):
+        category_id, name = rng.choice(category_items)
+        brands, items, adjectives, (low, high) = CATALOG.get(
+            name, CATALOG["Home & Kitchen"]
+        )
+        brand = rng.choice(brands)
+        item = rng.choice(items)
+        adjective = rng.choice(adjectives)
+        condition = rng.choice(CONDITIONS)
+        fields = {
+            "brand": brand,
+            "item": item.lower(),
+            "adjective": adjective.lower(),
+            "condition": condition.lower(),
+        }
+        description = " ".join(
+            sentence.format(**fields) for sentence in rng.sample(_SENTENCES, 4)
+        )
+        yield {
+            "id": first_id + offset,
+            "title": f"{brand} {adjective} {item} - {condition}",
+            "price": round(rng.uniform(low, high), 2),
+            "currency": "EUR",
+            "description": description[:500],
+            "image_url": image_url,
+            "category_id": category_id,
+            "seller_id": rng.choice(seller_ids),
+        }
+
+
+def batch_rng(seed, batch):
+    """Random generator for one batch, so reruns regenerate identical rows."""
+    return random.Random(f"{seed}:{batch}")
@@ -0,0 +1,270 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from flask import Response, current_app, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+
+slow_query_logger = logging.getLogger("loopify.sql.slow")
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_MANAGER_FILE = os.path.join("app", "database", "manager.py")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """
+    Reduce a statement to its shape so that slow queries group together:
+    literals become ?, IN lists collapse to (?...) and whitespace is folded.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def manager_call_site():
+    """The innermost DatabaseManager frame on the stack, as "manager.py:123 in fn"."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(_MANAGER_FILE):
+            return f"manager.py:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class RequestStats:
+    """SQL and template timings collected while serving one request."""
+
+    __slots__ = ("started", "queries", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+class Metrics:
+    """
+    Per-process request metrics, rendered in the Prometheus text format.
+    With several worker processes each one reports its own numbers.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+        self.durations = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self.duration_sums = defaultdict(float)
+        self.queries = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.template_seconds = defaultdict(float)
+        self.slow_queries = 0
+
+    def observe(self, endpoint, method, status, seconds, stats):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            counts = self.durations[endpoint]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.duration_sums[endpoint] += seconds
+            self.queries[endpoint] += stats.queries
+            self.db_seconds[endpoint] += stats.db_seconds
+            self.template_seconds[endpoint] += stats.template_seconds
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self, cache_stats=None):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        with self._lock:
+            metric(
+                "loopify_http_requests_total",
+                "counter",
+                "Requests served.",
+                [
+                    ((("endpoint", e), ("method", m), ("status", s)), count)
+                    for (e, m, s), count in sorted(self.requests.items())
+                ],
+            )
+            name = "loopify_http_request_duration_seconds"
+            metric(name, "histogram", "Request duration.", [])
+            for endpoint, counts in sorted(self.durations.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    labels = (("endpoint", endpoint), ("le", bound))
+                    lines.append(f"{name}_bucket{_labels(labels)} {cumulative}")
+                labels = (("endpoint", endpoint),)
+                lines.append(
+                    f"{name}_sum{_labels(labels)} {self.duration_sums[endpoint]}"
+                )
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+            for name, kind, help_text, values in (
+                (
+                    "loopify_db_queries_total",
+                    "counter",
+                    "SQL statements executed while serving requests.",
+                    self.queries,
+                ),
+                (
+                    "loopify_db_query_seconds_total",
+                    "counter",
+                    "Time spent executing SQL while serving requests.",
+                    self.db_seconds,
+                ),
+                (
+                    "loopify_template_render_seconds_total",
+                    "counter",
+                    "Time spent rendering templates.",
+                    self.template_seconds,
+                ),
+            ):
+                metric(
+                    name,
+                    kind,
+                    help_text,
+                    [((("endpoint", e),), v) for e, v in sorted(values.items())],
+                )
+            metric(
+                "loopify_db_slow_queries_total",
+                "counter",
+                "SQL statements slower than SLOW_QUERY_THRESHOLD_MS.",
+                [((), self.slow_queries)],
+            )
+
+        if cache_stats is not None:
+            metric(
+                "loopify_cache_requests_total",
+                "counter",
+                "Read-through cache lookups.",
+                [
+                    ((("namespace", family), ("result", result)), counts[key])
+                    for family, counts in sorted(cache_stats["namespaces"].items())
+                    for key, result in (("hits", "hit"), ("misses", "miss"))
+                ],
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels) + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _request_stats():
+    if has_request_context():
+        return g.get("_request_stats")
+    return None
+
+
+def instrument_engine(app, engine):
+    """
+    Count and time the statements of an engine towards the current
+    request's stats and the slow query log of init_instrumentation.
+    """
+    metrics = app.extensions["metrics"]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _request_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        threshold_ms = app.config.get("SLOW_QUERY_THRESHOLD_MS")
+        if threshold_ms is not None and elapsed * 1000 >= threshold_ms:
+            metrics.record_slow_query()
+            slow_query_logger.warning(
+                "%.1f ms at %s: %s",
+                elapsed * 1000,
+                manager_call_site() or "outside DatabaseManager",
+                normalize_sql(statement),
+            )
+
+
+def init_instrumentation(app, engine):
+    """
+    Hook SQL and template timing into the engine and the request cycle:
+    per-request Server-Timing headers, a /metrics endpoint and a slow query
+    log. Call once per app with its engine.
+    """
+    metrics = Metrics()
+    app.extensions["metrics"] = metrics
+    instrument_engine(app, engine)
+
+    def template_started(sender, template, context, **extra):
+        if has_request_context():
+            g._template_started = time.perf_counter()
+
+    def template_finished(sender, template, context, **extra):
+        stats = _request_stats()
+        started = g.pop("_template_started", None) if stats is not None else None
+        if started is not None:
+            stats.template_seconds += time.perf_counter() - started
+
+    before_render_template.connect(template_started, app)
+    template_rendered.connect(template_finished, app)
+
+    @app.before_request
+    def start_request_stats():
+        g._request_stats = RequestStats()
+
+    @app.after_request
+    def finish_request_stats(response):
+        stats = g.pop("_request_stats", None)
+        if stats is None:
+            return response
+        seconds = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "unmatched"
+        metrics.observe(endpoint, request.method, response.status_code, seconds, stats)
+        if current_app.config.get("SERVER_TIMING_ENABLED", True):
+            response.headers["Server-Timing"] = ", ".join(
+                (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries"',
+                    f"tpl;dur={stats.template_seconds * 1000:.2f}",
+                    f"app;dur={seconds * 1000:.2f}",
+                )
+            )
+        return response
+
+    if app.config.get("METRICS_ENABLED", True):
+
+        @app.route("/metrics")
+        def metrics_endpoint():
+            cache = getattr(app.db, "cache", None)
+            body = metrics.render(cache.stats() if cache is not None else None)
+            return Response(body, mimetype="text/plain; version=0.0.4")
+
+    return metrics
@@ -1,4 +1,5 @@
-from .user import User
+from .user import User, UserPrincipal
 from .product import Product
 from .category import Category
-from .cart import Cart
+from .cart import Cart, CartCounter
+from .recommendation import Recommendation
@@ -3,13 +3,23 @@ from app.database.db import db
 
 class Cart(db.Model):
     __tablename__ = "carts"
-
-    user_id = db.Column(
-        db.Integer, db.ForeignKey("users.id"), primary_key=True, index=True
-    )
-    product_id = db.Column(
-        db.Integer, db.ForeignKey("products.id"), primary_key=True, index=True
+    __table_args__ = (
+        # The primary key serves lookups by user; this one serves lookups by
+        # product (delete_product) and covers the user_id they return
+        db.Index("ix_carts_product_id_user_id", "product_id", "user_id"),
     )
 
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+
     user = db.relationship("User", backref=db.backref("cart", lazy=True))
     product = db.relationship("Product", backref=db.backref("cart", lazy=True))
+
+
+class CartCounter(db.Model):
+    """Denormalized number of items in each user's cart."""
+
+    __tablename__ = "cart_counters"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
@@ -1,7 +1,8 @@
 from app.database.db import db
+from app.models.versioned import Versioned
 
 
-class Category(db.Model):
+class Category(Versioned, db.Model):
     __tablename__ = "categories"
 
     id = db.Column(db.Integer, primary_key=True)
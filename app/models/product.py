@@ -1,8 +1,23 @@
 from app.database.db import db
+from app.models.versioned import Versioned, utcnow
 
 
-class Product(db.Model):
+class Product(Versioned, db.Model):
     __tablename__ = "products"
+    __table_args__ = (
+        # Category listings and the recommendation candidates of a category
+        db.Index("ix_products_category_id_id", "category_id", "id"),
+        # Category listings sorted by price
+        db.Index("ix_products_category_id_price_id", "category_id", "price", "id"),
+        # A seller's products (my-products)
+        db.Index("ix_products_seller_id_id", "seller_id", "id"),
+        # Listings and search sorted by price or newest first
+        db.Index("ix_products_price_id", "price", "id"),
+        db.Index("ix_products_created_at_id", "created_at", "id"),
+        db.Index(
+            "ix_products_category_id_created_at_id", "category_id", "created_at", "id"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False, index=True)
@@ -10,10 +25,12 @@ class Product(db.Model):
     currency = db.Column(db.String(3), default="EUR")
     description = db.Column(db.String(500))
     image_url = db.Column(db.String(200))
-    category_id = db.Column(
-        db.Integer, db.ForeignKey("categories.id"), nullable=False, index=True
-    )
+    # Resized copies of image_url by size name ("thumb", "medium", "full"),
+    # filled in by the background image pipeline
+    image_variants = db.Column(db.JSON)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
     seller_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    created_at = db.Column(db.DateTime, default=utcnow)
 
     category = db.relationship("Category", backref="products")
     seller = db.relationship("User", backref="products")
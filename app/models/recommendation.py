@@ -0,0 +1,19 @@
+from app.database.db import db
+
+
+class Recommendation(db.Model):
+    """Precomputed top-K similar products for a product."""
+
+    __tablename__ = "product_recommendations"
+    __table_args__ = (
+        # Finds the lists a product appears in when it changes or is deleted
+        db.Index(
+            "ix_product_recommendations_recommended_id", "recommended_id", "product_id"
+        ),
+    )
+
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+    recommended_id = db.Column(
+        db.Integer, db.ForeignKey("products.id"), primary_key=True
+    )
+    score = db.Column(db.Float, nullable=False)
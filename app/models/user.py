@@ -1,5 +1,5 @@
 from app.database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.passwords import password_hasher
 
 
 class User(db.Model):
@@ -7,13 +7,18 @@ class User(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
-    password = db.Column(db.String(120), nullable=False)
+    # Deferred: only loaded when a password is actually checked
+    password = db.deferred(db.Column(db.String(120), nullable=False))
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = password_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return password_hasher().verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash predates the configured hash parameters."""
+        return password_hasher().needs_rehash(self.password)
 
     def set_id(self, id):
         self.id = id
@@ -32,3 +37,38 @@ class User(db.Model):
 
     def get_id(self):
         return str(self.id)
+
+
+class UserPrincipal:
+    """
+    Slim stand-in for a logged-in User (id and username only) that
+    Flask-Login keeps as current_user, so that authenticated requests do
+    not need to load the full users row.
+    """
+
+    __slots__ = ("id", "username")
+
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_active(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def get_id(self):
+        return str(self.id)
+
+    def __getstate__(self):
+        return (self.id, self.username)
+
+    def __setstate__(self, state):
+        self.id, self.username = state
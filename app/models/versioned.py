@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from sqlalchemy import literal_column
+from app.database.db import db
+
+
+def utcnow():
+    """The current time as a naive UTC datetime, as stored in DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Versioned:
+    """
+    Model mixin tracking when and how often a row changed. Both columns are
+    bumped by every UPDATE, from ORM flushes and Core update() statements
+    alike, and feed the ETag and Last-Modified headers of the pages.
+    """
+
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
+    version = db.Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
@@ -0,0 +1,215 @@
+import json
+from datetime import datetime
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
+
+api_bp = Blueprint("api", __name__)
+
+# Fields of a product in API responses; the default when ?fields= is absent.
+# List responses carry the first LIST_DESCRIPTION_LENGTH characters of the
+# description, single products the whole text.
+PRODUCT_FIELDS = (
+    "id",
+    "title",
+    "price",
+    "currency",
+    "description",
+    "category",
+    "category_id",
+    "seller_id",
+    "image_url",
+    "image_variants",
+    "version",
+    "created_at",
+    "updated_at",
+)
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Rows fetched per round trip and bytes buffered per chunk of an NDJSON export
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+class BadRequest(ValueError):
+    """An invalid query parameter, answered with 400 and its message."""
+
+
+@api_bp.errorhandler(BadRequest)
+def bad_request(error):
+    return jsonify(error=str(error)), 400
+
+
+def _fields():
+    """The product fields requested with ?fields=a,b,c (all by default)."""
+    raw = request.args.get("fields")
+    if not raw:
+        return PRODUCT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [field for field in fields if field not in PRODUCT_FIELDS]
+    if unknown or not fields:
+        raise BadRequest(
+            f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields given"
+        )
+    return fields
+
+
+def _limit():
+    raw = request.args.get("limit", DEFAULT_LIMIT)
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequest("'limit' must be an integer") from None
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"'limit' must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def _categories():
+    values = request.args.getlist("category")
+    if not all(value.isdigit() for value in values):
+        raise BadRequest("'category' must be a category id")
+    return [int(value) for value in values]
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat() + "Z"  # Stored as naive UTC
+    return value
+
+
+def _select(item, fields):
+    """The requested fields of a product dict, JSON-ready."""
+    return {field: _json_value(item[field]) for field in fields}
+
+
+def _product_dict(product):
+    """An ORM Product as a dict of PRODUCT_FIELDS."""
+    item = {
+        field: getattr(product, field)
+        for field in PRODUCT_FIELDS
+        if field != "category"
+    }
+    item["category"] = product.category.name
+    return item
+
+
+def _page(result, fields):
+    pagination = result["pagination"]
+    return jsonify(
+        data=[_select(product, fields) for product in result["products"]],
+        next_cursor=pagination["next_cursor"],
+        prev_cursor=pagination["prev_cursor"],
+    )
+
+
+def _export(fields, search_text="", selected_categories=()):
+    """
+    Every matching product as newline-delimited JSON, streamed as the rows
+    are read, so neither the rows nor the body are held in memory.
+    """
+    rows = current_app.db.iter_products(
+        fields, search_text, selected_categories, batch_size=EXPORT_BATCH_SIZE
+    )
+
+    def generate():
+        chunk = []
+        size = 0
+        for row in rows:
+            line = json.dumps(
+                {field: _json_value(value) for field, value in row.items()},
+                separators=(",", ":"),
+            )
+            chunk.append(line)
+            size += len(line) + 1
+            if size >= EXPORT_CHUNK_BYTES:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+                size = 0
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _products_response(search_text=""):
+    fields = _fields()
+    selected_categories = _categories()
+    if request.args.get("format") == "ndjson":
+        return _export(fields, search_text, selected_categories)
+
+    db = current_app.db
+    limit = _limit()
+    cursor = request.args.get("cursor")
+    try:
+        if search_text or selected_categories:
+            result = db.search_products(
+                search_text,
+                selected_categories,
+                per_page=limit,
+                cursor=cursor,
+                with_total=False,
+            )
+        else:
+            result = db.get_all_products(
+                per_page=limit, cursor=cursor, with_total=False
+            )
+    except ValueError:
+        raise BadRequest("Invalid cursor") from None
+    return _page(result, fields)
+
+
+@api_bp.route("/products")
+def products():
+    """
+    Products in id order, `limit` per page. Follow `next_cursor` with
+    ?cursor= for the next page; ?format=ndjson streams all of them instead.
+    Filter with ?category=<id> (repeatable), choose fields with ?fields=.
+    """
+    return _products_response()
+
+
+@api_bp.route("/search")
+def search():
+    """Products matching ?q=, best match first; parameters as for /products."""
+    return _products_response(request.args.get("q", "").strip())
+
+
+@api_bp.route("/products/<int:product_id>")
+def product(product_id):
+    """A single product with its full description."""
+    product = current_app.db.get_product_by_id(product_id)
+    if product is None:
+        return jsonify(error="Product not found"), 404
+    return jsonify(_select(_product_dict(product), _fields()))
+
+
+@api_bp.route("/products/<int:product_id>/recommendations")
+def recommendations(product_id):
+    """The most similar products, best match first."""
+    db = current_app.db
+    fields = _fields()
+    if db.get_product_by_id(product_id) is None:
+        return jsonify(error="Product not found"), 404
+    return jsonify(
+        data=[
+            _select(_product_dict(product), fields)
+            for product in db.get_recommended_products(product_id)
+        ]
+    )
+
+
+@api_bp.route("/categories")
+def categories():
+    """All categories."""
+    return jsonify(
+        data=[
+            {"id": category.id, "name": category.name}
+            for category in current_app.db.get_all_categories()
+        ]
+    )
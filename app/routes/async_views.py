@@ -0,0 +1,174 @@
+import asyncio
+from flask import current_app, render_template, request
+from flask_login import current_user
+from app.database.manager import SORT_ORDERS
+from app.utils.conditional import (
+    conditional_render,
+    data_version,
+    last_updated,
+    page_etag,
+)
+from app.utils.helpers import price_range, render_error_page
+
+# Async counterparts of the busiest GET views, served by the ASGI entry point
+# (app/asgi.py). Reads go through current_app.async_db without blocking the
+# event loop; work that stays synchronous (loading the session principal,
+# template rendering) runs on the loop's thread pool. Responses are the same
+# as the sync views'.
+
+
+async def _viewer():
+    """The current user, with their cart count cached for the page header."""
+    user = await asyncio.to_thread(current_user._get_current_object)
+    if user.is_authenticated:
+        await current_app.async_db.get_total_cart_items(user.id)
+    return user
+
+
+def _render(etag_parts, last_modified, template, context):
+    return conditional_render(
+        page_etag(*etag_parts),
+        last_modified,
+        lambda: render_template(template, **context),
+    )
+
+
+async def _conditional_render(etag_parts, last_modified, template, **context):
+    """conditional_render with page_etag(*etag_parts), off the event loop."""
+    return await asyncio.to_thread(
+        _render, etag_parts, last_modified, template, context
+    )
+
+
+async def _error_page(error_message, errorcode=500):
+    return await asyncio.to_thread(render_error_page, error_message, errorcode)
+
+
+async def home():
+    """Async general.home."""
+    try:
+        db = current_app.async_db
+        await _viewer()
+        products = (await db.get_all_products(page=1, per_page=4, sort="newest"))[
+            "products"
+        ]
+        return await _conditional_render(
+            ("home", [data_version(product) for product in products]),
+            None,
+            "index.html",
+            products=products,
+        )
+    except Exception as e:
+        return await _error_page(e)
+
+
+async def view_product(product_id):
+    """Async product.view_product."""
+    try:
+        db = current_app.async_db
+        user = await _viewer()
+        product = await db.get_product_by_id(product_id)
+        if not product:
+            return await _error_page("Product not found", 404)
+
+        if user.is_authenticated:
+            added_to_cart = await db.cart_item_exists(user.id, product_id)
+        else:
+            added_to_cart = False
+
+        recommended_products = await db.get_recommended_products(product_id)
+        return await _conditional_render(
+            (
+                "product",
+                data_version(product),
+                data_version(product.category),
+                added_to_cart,
+                [data_version(item) for item in recommended_products],
+            ),
+            last_updated([product, *recommended_products]),
+            "view_product.html",
+            product=product,
+            recommended_products=recommended_products,
+            added_to_cart=added_to_cart,
+        )
+    except Exception as e:
+        return await _error_page(e)
+
+
+async def search_results():
+    """Async product.search_results."""
+    try:
+        db = current_app.async_db
+        await _viewer()
+        search_text = request.args.get("q", "").strip()
+        selected_categories = request.args.getlist("category[]")
+        selected_categories = [int(cat) for cat in selected_categories if cat.isdigit()]
+        min_price, max_price = price_range(request.args)
+        sort = request.args.get("sort", "relevance")
+        if sort not in SORT_ORDERS:
+            sort = "relevance"
+        page = int(request.args.get("page", 1))
+        cursor = request.args.get("cursor")
+
+        try:
+            result = await db.search_products(
+                search_text,
+                selected_categories,
+                page,
+                per_page=9,
+                cursor=cursor,
+                min_price=min_price,
+                max_price=max_price,
+                with_facets=True,
+                sort=sort,
+            )
+        except ValueError:
+            return await _error_page("Invalid page", 400)
+
+        products = result["products"]
+        categories = await db.get_all_categories()
+        return await _conditional_render(
+            (
+                "search",
+                sort,
+                [data_version(product) for product in products],
+                result["pagination"],
+                result["facets"],
+                [data_version(category) for category in categories],
+            ),
+            None,
+            "search_results.html",
+            products=products,
+            pagination=result["pagination"],
+            facets=result["facets"],
+            search_text=search_text,
+            selected_categories=selected_categories,
+            min_price=min_price,
+            max_price=max_price,
+            sort=sort,
+        )
+    except Exception as e:
+        return await _error_page(e)
+
+
+async def cart():
+    """Async cart.cart; anonymous users get login_required's redirect."""
+    try:
+        user = await _viewer()
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        cart_items = await current_app.async_db.get_cart_items(user.id)
+        return await asyncio.to_thread(
+            render_template, "cart.html", cart_items=cart_items
+        )
+    except Exception as e:
+        return await _error_page(e)
+
+
+# Endpoint -> async view, for the GET and HEAD requests the ASGI app serves
+ASYNC_VIEWS = {
+    "general.home": home,
+    "product.view_product": view_product,
+    "product.search_results": search_results,
+    "cart.cart": cart,
+}
@@ -9,10 +9,13 @@ from flask import (
     current_app,
 )
 from app.utils.helpers import render_error_page, load_next_page
+from app.utils.passwords import HashingBusy
 from flask_login import login_user, logout_user, login_required
 
 auth_bp = Blueprint("auth", __name__)
 
+BUSY_MESSAGE = "Too many sign-ins right now. Please try again in a moment."
+
 
 @auth_bp.route("/login", methods=["GET", "POST"])
 def login():
@@ -27,11 +30,12 @@ def login():
             password = request.form["password"]
             user = db.get_user(username, password)
             if user:
-                session["total_cart_items"] = db.get_total_cart_items(user.id)
                 login_user(user)
                 return load_next_page(request)
             else:
                 flash("Invalid username or password", "danger")
+        except HashingBusy:
+            return render_error_page(BUSY_MESSAGE, 503)
         except Exception as e:
             return render_error_page(e)
     return render_template("auth.html", is_login=True)
@@ -62,6 +66,8 @@ def register():
             flash("Registration successful! Please log in.", "success")
             return redirect(url_for("auth.login"))
 
+        except HashingBusy:
+            return render_error_page(BUSY_MESSAGE, 503)
         except Exception as e:
             return render_error_page(e)
 
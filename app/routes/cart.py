@@ -2,16 +2,18 @@ from flask import (
     Blueprint,
     redirect,
     url_for,
-    session,
     current_app,
     render_template,
     request,
+    jsonify,
 )
 from app.utils import render_error_page
 from flask_login import login_required, current_user
 
 cart_bp = Blueprint("cart", __name__)
 
+MAX_BATCH_SIZE = 100
+
 
 @cart_bp.route("/")
 @login_required
@@ -35,18 +37,11 @@ def add_to_cart(product_id):
     """
     try:
         db = current_app.db
-        added_to_cart = db.cart_item_exists(current_user.id, product_id)
-        if added_to_cart:
-            return redirect(url_for("product.view_product", product_id=product_id))
-
-        product = db.get_product_by_id(product_id)
-        if not product:
+        result = db.update_cart(current_user.id, add=[product_id])
+        # Nothing added: already in the cart, the user's own product, or unknown
+        if not result["added"] and not db.get_product_by_id(product_id):
             return render_error_page("Product not found", 404)
 
-        if product.seller_id != current_user.id:
-            db.add_to_cart(current_user.id, product_id)
-            session["total_cart_items"] = db.get_total_cart_items(current_user.id)
-
         return redirect(url_for("product.view_product", product_id=product_id))
     except Exception as e:
         return render_error_page(e)
@@ -60,14 +55,46 @@ def remove_from_cart(product_id):
     """
     try:
         db = current_app.db
-        if not db.cart_item_exists(current_user.id, product_id):
+        result = db.update_cart(current_user.id, remove=[product_id])
+        if not result["removed"]:
             return render_error_page("Cart item not found or unauthorized access", 404)
 
-        db.remove_from_cart(current_user.id, product_id)
-        session["total_cart_items"] = db.get_total_cart_items(current_user.id)
         if request.method == "POST":
             return redirect(url_for("cart.cart"))
         else:
             return redirect(url_for("product.view_product", product_id=product_id))
     except Exception as e:
         return render_error_page(e)
+
+
+@cart_bp.route("/api/batch", methods=["POST"])
+def batch_update():
+    """
+    JSON endpoint applying several cart changes at once.
+    Expects {"add": [product ids], "remove": [product ids]} and returns the
+    ids actually added and removed with the new cart item count.
+    """
+    if not current_user.is_authenticated:
+        return jsonify(error="Authentication required"), 401
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON object"), 400
+
+    operations = {}
+    for key in ("add", "remove"):
+        ids = payload.get(key, [])
+        if not isinstance(ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in ids
+        ):
+            return jsonify(error=f"'{key}' must be a list of product ids"), 400
+        operations[key] = ids
+    if len(operations["add"]) + len(operations["remove"]) > MAX_BATCH_SIZE:
+        return jsonify(error=f"At most {MAX_BATCH_SIZE} operations per batch"), 400
+
+    try:
+        result = current_app.db.update_cart(current_user.id, **operations)
+    except Exception:
+        return jsonify(error="Could not update the cart"), 500
+
+    return jsonify(result)
@@ -1,5 +1,10 @@
 from flask import Blueprint, render_template, current_app
 from app.utils.helpers import render_error_page
+from app.utils.conditional import (
+    conditional_render,
+    data_version,
+    page_etag,
+)
 
 
 general_bp = Blueprint("general", __name__)
@@ -8,12 +13,17 @@ general_bp = Blueprint("general", __name__)
 @general_bp.route("/")
 def home():
     """
-    Home route, fetches and displays products for the homepage.
+    Home route, displays the newest products.
+    Answers 304 when the featured products have not changed.
     """
     try:
         db = current_app.db
-        products = db.get_all_products(page=1, per_page=4)["products"]
-        return render_template("index.html", products=products)
+        products = db.get_all_products(page=1, per_page=4, sort="newest")["products"]
+        return conditional_render(
+            page_etag("home", [data_version(product) for product in products]),
+            None,  # Listings change on deletes too; validated by ETag only
+            lambda: render_template("index.html", products=products),
+        )
     except Exception as e:
         return render_error_page(e)
 
@@ -0,0 +1,25 @@
+import os
+from flask import Blueprint, abort, current_app, send_from_directory
+from app.utils.helpers import upload_folder
+
+media_bp = Blueprint("media", __name__)
+
+
+@media_bp.route("/<path:filename>")
+def serve(filename):
+    """
+    Serves uploaded images. Files are named after the hash of their content
+    and never change, so clients and proxies may cache them for good.
+    """
+    if filename.startswith("."):
+        abort(404)  # Uploads still being written
+    stem, _ = os.path.splitext(filename)
+    response = send_from_directory(
+        upload_folder(),
+        filename,
+        max_age=current_app.config["MEDIA_MAX_AGE"],
+        etag=stem,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
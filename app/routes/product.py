@@ -1,26 +1,54 @@
+import csv
 from flask import (
     Blueprint,
+    Response,
     render_template,
     request,
     current_app,
+    jsonify,
     url_for,
     redirect,
     flash,
+    stream_with_context,
 )
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.utils import (
     render_error_page,
     save_image,
+    queue_image_variants,
     load_next_page,
 )
+from app.utils.catalog import (
+    CATALOG_FIELDS,
+    CATALOG_FORMATS,
+    catalog_format,
+    export_catalog,
+    import_catalog,
+)
+from app.utils.conditional import (
+    conditional_render,
+    data_version,
+    last_updated,
+    page_etag,
+)
+from app.database.manager import SORT_ORDERS
+from app.database.suggest import DEFAULT_LIMIT as DEFAULT_SUGGEST_LIMIT
+from app.utils.helpers import price_range
+from app.utils.images import ImageTooLarge
 from flask_login import login_required, current_user
 
 product_bp = Blueprint("product", __name__)
 
+# Longest ?q= looked up by /suggest, and how long browsers may reuse an answer
+MAX_SUGGEST_QUERY_LENGTH = 100
+SUGGEST_MAX_AGE = 60
+
 
 @product_bp.route("/<int:product_id>")
 def view_product(product_id):
     """
-    Displays product details and recommended products from the same category.
+    Displays product details and the most similar products from the same category.
+    Answers 304 when neither they nor the user's cart state have changed.
     """
     try:
         db = current_app.db
@@ -33,16 +61,22 @@ def view_product(product_id):
         else:
             added_to_cart = False
 
-        recommended_products = [
-            p
-            for p in db.get_products_by_category(product.category_id)
-            if p.id != product_id
-        ]
-        return render_template(
-            "view_product.html",
-            product=product,
-            recommended_products=recommended_products,
-            added_to_cart=added_to_cart,
+        recommended_products = db.get_recommended_products(product_id)
+        return conditional_render(
+            page_etag(
+                "product",
+                data_version(product),
+                data_version(product.category),
+                added_to_cart,
+                [data_version(item) for item in recommended_products],
+            ),
+            last_updated([product, *recommended_products]),
+            lambda: render_template(
+                "view_product.html",
+                product=product,
+                recommended_products=recommended_products,
+                added_to_cart=added_to_cart,
+            ),
         )
     except Exception as e:
         return render_error_page(e)
@@ -74,8 +108,11 @@ def add_product():
                 seller_id=current_user.id,
                 image_url=image_url,
             )
+            queue_image_variants(image_url)
             flash("Product added successfully!", "success")
             return redirect(url_for("product.view_product", product_id=product.id))
+        except (ImageTooLarge, RequestEntityTooLarge):
+            return render_error_page("The uploaded image is too large.", 413)
         except Exception as e:
             return render_error_page(e)
     try:
@@ -120,8 +157,12 @@ def update_product(product_id):
                 category_id=category_id,
                 image_url=image_url,
             )
+            if image:
+                queue_image_variants(image_url)
             flash("Product updated successfully!", "success")
             return redirect(url_for("product.view_product", product_id=product.id))
+        except (ImageTooLarge, RequestEntityTooLarge):
+            return render_error_page("The uploaded image is too large.", 413)
         except Exception as e:
             return render_error_page(e)
 
@@ -158,40 +199,158 @@ def delete_product(product_id):
 @product_bp.route("/search_results")
 def search_results():
     """
-    Displays search results for products based on search text and selected categories.
+    Displays search results for products based on search text, selected
+    categories and price range, with match counts for each filter.
+    Answers 304 when the results and the filters have not changed.
     """
     try:
         db = current_app.db
         search_text = request.args.get("q", "").strip()
         selected_categories = request.args.getlist("category[]")
         selected_categories = [int(cat) for cat in selected_categories if cat.isdigit()]
+        min_price, max_price = price_range(request.args)
+        sort = request.args.get("sort", "relevance")
+        if sort not in SORT_ORDERS:
+            sort = "relevance"
         page = int(request.args.get("page", 1))
+        cursor = request.args.get("cursor")
 
-        result = db.search_products(search_text, selected_categories, page, per_page=9)
-        categories = db.get_all_categories()
+        try:
+            result = db.search_products(
+                search_text,
+                selected_categories,
+                page,
+                per_page=9,
+                cursor=cursor,
+                min_price=min_price,
+                max_price=max_price,
+                with_facets=True,
+                sort=sort,
+            )
+        except ValueError:
+            return render_error_page("Invalid page", 400)
 
-        return render_template(
-            "search_results.html",
-            products=result["products"],
-            pagination=result["pagination"],
-            categories=categories,
-            search_text=search_text,
-            selected_categories=selected_categories,
+        products = result["products"]
+        return conditional_render(
+            page_etag(
+                "search",
+                sort,
+                [data_version(product) for product in products],
+                result["pagination"],
+                result["facets"],
+                [data_version(category) for category in db.get_all_categories()],
+            ),
+            None,  # Listings change on deletes too; validated by ETag only
+            lambda: render_template(
+                "search_results.html",
+                products=products,
+                pagination=result["pagination"],
+                facets=result["facets"],
+                search_text=search_text,
+                selected_categories=selected_categories,
+                min_price=min_price,
+                max_price=max_price,
+                sort=sort,
+            ),
         )
     except Exception as e:
         return render_error_page(e)
 
 
+@product_bp.route("/suggest")
+def suggest():
+    """
+    Typeahead suggestions for ?q= as JSON: matching categories, then
+    completions of the last word from the in-memory SuggestIndex. Up to
+    ?limit= (at most 10) suggestions, each with the search page URL it opens.
+    """
+    query = request.args.get("q", "")[:MAX_SUGGEST_QUERY_LENGTH]
+    limit = request.args.get("limit", DEFAULT_SUGGEST_LIMIT, type=int)
+    suggestions = current_app.db.suggestions.suggest(query, limit)
+    for suggestion in suggestions:
+        if suggestion["type"] == "category":
+            suggestion["url"] = url_for(
+                "product.search_results", **{"category[]": suggestion["category_id"]}
+            )
+        else:
+            suggestion["url"] = url_for("product.search_results", q=suggestion["text"])
+    response = jsonify(query=query, suggestions=suggestions)
+    response.cache_control.public = True
+    response.cache_control.max_age = SUGGEST_MAX_AGE
+    return response
+
+
 @product_bp.route("/my-products", methods=["GET"])
 @login_required
 def my_products():
     """
-    List all products created by the logged-in user.
+    List the products created by the logged-in user, 50 per page.
     """
     try:
         db = current_app.db
-        products = db.get_products_by_seller_id(current_user.id)
-        return render_template("users_products.html", products=products)
+        result = db.get_seller_products_page(
+            current_user.id, per_page=50, cursor=request.args.get("cursor")
+        )
+        return render_template(
+            "users_products.html",
+            products=result["products"],
+            pagination=result["pagination"],
+        )
     except Exception as e:
         flash(f"Error loading products", "danger")
         return redirect(url_for("general.home"))
+
+
+@product_bp.route("/import", methods=["GET", "POST"])
+@login_required
+def import_products():
+    """
+    Bulk-add products from an uploaded CSV or NDJSON file, reporting the
+    rows that could not be imported.
+    """
+    report = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            return render_error_page("Choose a file to import.", 400)
+        try:
+            format = catalog_format(upload.filename, request.form.get("format"))
+        except ValueError as e:
+            return render_error_page(str(e), 400)
+        config = current_app.config
+        try:
+            report = import_catalog(
+                current_app.db,
+                current_user.id,
+                upload.stream,
+                format,
+                default_image_url=config["DEFAULT_IMAGE_URL"],
+                batch_size=config["IMPORT_BATCH_SIZE"],
+                max_errors=config["IMPORT_MAX_REPORTED_ERRORS"],
+            )
+        except UnicodeDecodeError:
+            return render_error_page("The file must be UTF-8 encoded.", 400)
+        except csv.Error as e:
+            return render_error_page(f"The CSV file could not be read: {e}", 400)
+    return render_template("import_products.html", fields=CATALOG_FIELDS, report=report)
+
+
+@product_bp.route("/my-products/export")
+@login_required
+def export_products():
+    """
+    Download the logged-in user's products as CSV or NDJSON (?format=),
+    streamed as they are read from the database.
+    """
+    format = request.args.get("format", "csv")
+    if format not in CATALOG_FORMATS:
+        return render_error_page("Unknown export format", 400)
+    rows = current_app.db.iter_seller_products(current_user.id)
+    response = Response(
+        stream_with_context(export_catalog(rows, format)),
+        mimetype="text/csv" if format == "csv" else "application/x-ndjson",
+    )
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=loopify-products.{format}"
+    )
+    return response
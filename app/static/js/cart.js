@@ -16,5 +16,69 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     }
 
+    // Send a batch of cart changes ({add: [...], remove: [...]}) to the JSON endpoint
+    function updateCart(endpoint, operations) {
+        return fetch(endpoint, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            credentials: "same-origin",
+            body: JSON.stringify(operations),
+        }).then(function (response) {
+            if (!response.ok) {
+                throw new Error(`Cart update failed with status ${response.status}`);
+            }
+            return response.json();
+        });
+    }
+
+    function updateCartBadge(count) {
+        document.querySelectorAll(".cart-badge").forEach(function (badge) {
+            badge.textContent = count;
+        });
+    }
+
+    // Switch a product page button between "Add to Cart" and "Remove from Cart"
+    function toggleCartForm(form) {
+        const button = form.querySelector("button");
+        if (form.dataset.cartAction === "add") {
+            form.dataset.cartAction = "remove";
+            form.action = form.dataset.removeUrl;
+            button.textContent = "Remove from Cart";
+            button.classList.replace("btn-success", "btn-danger");
+            button.style.backgroundColor = "";
+        } else {
+            form.dataset.cartAction = "add";
+            form.action = form.dataset.addUrl;
+            button.textContent = "Add to Cart";
+            button.classList.replace("btn-danger", "btn-success");
+            button.style.backgroundColor = "#28a745";
+        }
+    }
+
+    document.querySelectorAll("form[data-cart-action]").forEach(function (form) {
+        form.addEventListener("submit", function (event) {
+            event.preventDefault();
+            const productId = parseInt(form.dataset.productId, 10);
+            const operations = { [form.dataset.cartAction]: [productId] };
+
+            updateCart(form.dataset.cartEndpoint, operations)
+                .then(function (result) {
+                    updateCartBadge(result.total_cart_items);
+                    if (form.hasAttribute("data-cart-row")) {
+                        form.closest("tr").remove();
+                        if (!document.querySelector("form[data-cart-row]")) {
+                            window.location.reload(); // Show the empty cart message
+                        }
+                        calculateTotalPrice();
+                    } else {
+                        toggleCartForm(form);
+                    }
+                })
+                .catch(function () {
+                    form.submit(); // Fall back to the regular page flow
+                });
+        });
+    });
+
     calculateTotalPrice();
-});
\ No newline at end of file
+});
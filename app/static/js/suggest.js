@@ -0,0 +1,55 @@
+// Typeahead for search boxes marked with data-suggest: fills a <datalist>
+// from /product/suggest as the user types. Picking a category opens it.
+document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("input[data-suggest]").forEach(function (input, n) {
+        const list = document.createElement("datalist");
+        list.id = "suggestions-" + n;
+        input.setAttribute("list", list.id);
+        input.setAttribute("autocomplete", "off");
+        input.after(list);
+
+        let suggestions = [];
+        let timer = null;
+        let controller = null;
+
+        function fetchSuggestions() {
+            const query = input.value.trim();
+            if (!query) {
+                list.replaceChildren();
+                return;
+            }
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            fetch(input.dataset.suggest + "?q=" + encodeURIComponent(query), { signal: controller.signal })
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    suggestions = data.suggestions;
+                    list.replaceChildren(...suggestions.map(function (suggestion) {
+                        const option = document.createElement("option");
+                        option.value = suggestion.text;
+                        if (suggestion.type === "category") {
+                            option.label = "Category";
+                        }
+                        return option;
+                    }));
+                })
+                .catch(function () {});
+        }
+
+        input.addEventListener("input", function () {
+            clearTimeout(timer);
+            timer = setTimeout(fetchSuggestions, 100);
+        });
+
+        input.addEventListener("change", function () {
+            const picked = suggestions.find(function (suggestion) {
+                return suggestion.type === "category" && suggestion.text === input.value;
+            });
+            if (picked) {
+                window.location = picked.url;
+            }
+        });
+    });
+});
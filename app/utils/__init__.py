@@ -1,5 +1,6 @@
 from .helpers import (
     render_error_page,
     save_image,
+    queue_image_variants,
     load_next_page,
 )
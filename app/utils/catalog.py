@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import math
+from sqlalchemy.exc import SQLAlchemyError
+
+# Columns of a catalog file, in export order. Imports need title, price and
+# category (a category id or name); the others are optional.
+CATALOG_FIELDS = ("title", "price", "currency", "description", "category", "image_url")
+CATALOG_FORMATS = ("csv", "ndjson")
+
+TITLE_MAX_LENGTH = 200
+DESCRIPTION_MAX_LENGTH = 500
+IMAGE_URL_MAX_LENGTH = 200
+
+
+class ImportReport:
+    """Outcome of a catalog import: the ids added and the rows rejected."""
+
+    def __init__(self, max_errors=100):
+        self.max_errors = max_errors
+        self.product_ids = []
+        self.errors = []  # (line, message), at most max_errors of them
+        self.failed = 0
+
+    @property
+    def imported(self):
+        return len(self.product_ids)
+
+    def reject(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+
+def catalog_format(filename, requested=None):
+    """The format named by requested, or else by the file extension."""
+    if requested in CATALOG_FORMATS:
+        return requested
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    raise ValueError("Upload a .csv or .ndjson file.")
+
+
+def read_records(stream, format):
+    """
+    Yield (line number, record dict or None, error message or None) for
+    every row of a binary catalog stream, reading it incrementally.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def validate_record(record, categories, seller_id, default_image_url):
+    """
+    Turn a catalog record into a products row. `categories` maps category
+    ids and lower-cased names to ids. Raises ValueError describing the
+    first problem found.
+    """
+    title = _text(record, "title")
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"title is longer than {TITLE_MAX_LENGTH} characters")
+
+    try:
+        price = float(_text(record, "price"))
+    except ValueError:
+        raise ValueError("price must be a number") from None
+    if not math.isfinite(price) or price < 0:
+        raise ValueError("price must be zero or more")
+
+    currency = _text(record, "currency").upper() or "EUR"
+    if len(currency) != 3 or not currency.isalpha():
+        raise ValueError("currency must be a three-letter code")
+
+    description = _text(record, "description")
+    if len(description) > DESCRIPTION_MAX_LENGTH:
+        raise ValueError(
+            f"description is longer than {DESCRIPTION_MAX_LENGTH} characters"
+        )
+
+    category = _text(record, "category")
+    category_id = categories.get(
+        int(category) if category.isdigit() else category.lower()
+    )
+    if category_id is None:
+        raise ValueError(f"unknown category {category!r}")
+
+    image_url = _text(record, "image_url") or default_image_url
+    if len(image_url) > IMAGE_URL_MAX_LENGTH or not image_url.startswith(
+        ("/", "https://", "http://")
+    ):
+        raise ValueError("image_url must be a path or an http(s) URL")
+
+    return {
+        "title": title,
+        "price": round(price, 2),
+        "currency": currency,
+        "description": description or None,
+        "category_id": category_id,
+        "seller_id": seller_id,
+        "image_url": image_url,
+    }
+
+
+def import_catalog(
+    db,
+    seller_id,
+    stream,
+    format,
+    default_image_url,
+    batch_size=500,
+    max_errors=100,
+):
+    """
+    Validate the rows of a catalog file and add the valid ones for
+    seller_id, batch_size rows per transaction. Invalid rows are skipped and
+    reported with their line numbers. When the database rejects a batch,
+    its rows are retried one by one and only the failing ones are reported.
+    """
+    report = ImportReport(max_errors)
+    categories = {}
+    for category in db.get_all_categories():
+        categories[category.id] = category.id
+        categories[category.name.lower()] = category.id
+
+    batch = []
+
+    def flush():
+        try:
+            report.product_ids.extend(db.add_products([row for _, row in batch]))
+        except SQLAlchemyError:
+            # Retry the rows one at a time, so only those at fault are rejected
+            for line, row in batch:
+                try:
+                    report.product_ids.extend(db.add_products([row]))
+                except SQLAlchemyError:
+                    report.reject(line, "could not be saved")
+        batch.clear()
+
+    for line, record, error in read_records(stream, format):
+        if error is None:
+            try:
+                row = validate_record(record, categories, seller_id, default_image_url)
+            except ValueError as e:
+                error = str(e)
+            else:
+                batch.append((line, row))
+        if error is not None:
+            report.reject(line, error)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
+
+
+def export_catalog(rows, format):
+    """
+    Encode catalog rows (mappings with CATALOG_FIELDS) as CSV or NDJSON,
+    yielding one chunk per row so the export can be streamed.
+    """
+    if format == "ndjson":
+        for row in rows:
+            yield json.dumps({field: row[field] for field in CATALOG_FIELDS}) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CATALOG_FIELDS)
+    for row in rows:
+        writer.writerow([row[field] for field in CATALOG_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
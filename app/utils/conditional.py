@@ -0,0 +1,106 @@
+import hashlib
+import os
+from datetime import timezone
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+
+def _templates_digest(app):
+    """Digest of every template, so a deploy that changes markup changes ETags."""
+    digest = hashlib.blake2b(digest_size=8)
+    folder = os.path.join(app.root_path, app.template_folder)
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, folder).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def data_version(item):
+    """(id, version) of a product or category, as an ORM object or a dict."""
+    if isinstance(item, dict):
+        return item["id"], item.get("version")
+    return item.id, item.version
+
+
+def last_updated(items):
+    """Latest updated_at among items, or None when none is known."""
+    timestamps = [
+        item.get("updated_at") if isinstance(item, dict) else item.updated_at
+        for item in items
+    ]
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    if not timestamps:
+        return None
+    return max(timestamps).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def page_etag(*parts):
+    """
+    Strong ETag for a page built from parts (data versions and page state),
+    the deployed templates and what the header shows the current user.
+    """
+    if current_user.is_authenticated:
+        viewer = (
+            current_user.id,
+            current_user.username,
+            current_app.db.get_total_cart_items(current_user.id),
+        )
+    else:
+        viewer = None
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (current_app.extensions["templates_digest"], viewer, *parts):
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def _set_cache_headers(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if current_user.is_authenticated:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        # Browsers revalidate every time; a shared cache in front of the app
+        # may answer repeat requests itself for PUBLIC_PAGE_MAX_AGE seconds
+        response.cache_control.public = True
+        response.cache_control.max_age = 0
+        response.cache_control.s_maxage = current_app.config.get(
+            "PUBLIC_PAGE_MAX_AGE", 0
+        )
+    response.vary.add("Cookie")
+    return response
+
+
+def conditional_render(etag, last_modified, render):
+    """
+    Answer a GET whose If-None-Match (or If-Modified-Since, when there is a
+    last_modified) still matches with 304 Not Modified without calling
+    render(). Otherwise render the page and attach the validators and cache
+    headers. Listings pass no last_modified: a delete or a product leaving
+    the page does not raise the updated_at of the rows shown.
+    """
+    if "_flashes" in session:
+        # Rendering consumes pending flash messages, so always render
+        return make_response(render())
+    if _not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+    return _set_cache_headers(response, etag, last_modified)
+
+
+def init_conditional_responses(app):
+    app.extensions["templates_digest"] = _templates_digest(app)
@@ -0,0 +1,50 @@
+from flask import current_app
+from markupsafe import Markup
+
+
+def _macros():
+    # Template.module is built once per template and reused
+    return current_app.jinja_env.get_template("macros.html").module
+
+
+def _product_id(product):
+    return product["id"] if isinstance(product, dict) else product.id
+
+
+def cached_product_card(product):
+    """
+    Template global: the product_card macro's HTML, cached with the
+    product's other reads (namespace "product:<id>"), so every product
+    write also drops its card. Cards contain nothing user-specific.
+    """
+    html = current_app.db.cache.get_or_load(
+        f"product:{_product_id(product)}",
+        "card",
+        lambda: str(_macros().product_card(product)),
+    )
+    return Markup(html)
+
+
+def cached_category_filter(selected_categories=(), counts=None):
+    """
+    Template global: the category checkbox list, with match counts when
+    given, cached per set of checked categories and counts. Categories are
+    only queried when the fragment is rendered.
+    """
+    selected = tuple(sorted(selected_categories))
+    key = tuple(sorted(counts.items())) if counts is not None else None
+    html = current_app.db.cache.get_or_load(
+        "categories",
+        ("filter", selected, key),
+        lambda: str(
+            _macros().category_filter(
+                current_app.db.get_all_categories(), selected, counts
+            )
+        ),
+    )
+    return Markup(html)
+
+
+def init_fragment_cache(app):
+    app.add_template_global(cached_product_card)
+    app.add_template_global(cached_category_filter)
@@ -1,6 +1,7 @@
 import os
-import secrets
 from flask import render_template, current_app, redirect, url_for
+from werkzeug.utils import secure_filename
+from app.utils.images import store_upload
 
 
 def render_error_page(error_message, errorcode=500):
@@ -23,21 +24,75 @@ def load_next_page(request):
         return redirect(url_for("general.home"))
 
 
+def price_range(args):
+    """
+    (min_price, max_price) from the min_price/max_price query arguments;
+    a missing, invalid or negative bound is None.
+    """
+    bounds = []
+    for name in ("min_price", "max_price"):
+        try:
+            value = float(args.get(name, ""))
+        except ValueError:
+            value = None
+        bounds.append(
+            value if value is not None and 0 <= value < float("inf") else None
+        )
+    return tuple(bounds)
+
+
+def upload_folder():
+    """Absolute path of the folder holding uploaded images."""
+    return os.path.join(
+        os.getcwd(),
+        current_app.config["ROOT_DIR"],
+        current_app.config["IMAGE_UPLOAD_FOLDER"],
+    )
+
+
+def image_path(image_url):
+    """Local file behind an image URL saved by save_image."""
+    media_url = current_app.config.get("MEDIA_URL", "/media")
+    if image_url.startswith(f"{media_url}/"):
+        return os.path.join(upload_folder(), os.path.basename(image_url))
+    # Uploads saved before content addressing live under the static folder
+    return os.path.join(
+        os.getcwd(), current_app.config["ROOT_DIR"], image_url.lstrip("/")
+    )
+
+
 def save_image(image):
-    image_upload_folder = current_app.config["IMAGE_UPLOAD_FOLDER"]
     default_image_url = current_app.config["DEFAULT_IMAGE_URL"]
-    root_dir = current_app.config["ROOT_DIR"]
+    media_url = current_app.config.get("MEDIA_URL", "/media")
+    max_bytes = current_app.config.get("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
 
-    image_folder_path = os.path.join(os.getcwd(), root_dir, image_upload_folder)
+    image_folder_path = upload_folder()
     if not os.path.exists(image_folder_path):
         os.makedirs(image_folder_path)
 
     if image:
-        image_filename = f"{secrets.token_hex(8)}_{image.filename}"
-        image_path = os.path.join(image_folder_path, image_filename)
-        image.save(image_path)
-        image_url = f"/{image_upload_folder}/{image_filename}"
+        # Stored under the hash of its bytes, so re-uploads share one file
+        image_filename = store_upload(
+            image.stream,
+            image_folder_path,
+            secure_filename(image.filename or ""),
+            max_bytes,
+        )
+        image_url = f"{media_url}/{image_filename}"
     else:
         image_url = default_image_url  # Set to default image if no image is uploaded
 
     return image_url
+
+
+def queue_image_variants(image_url):
+    """
+    Hand a saved upload to the background pipeline, which records the
+    resized variants on its product once they are written. Call after the
+    product has been committed. No-op for the default image or when the
+    pipeline is disabled.
+    """
+    pipeline = current_app.extensions.get("image_pipeline")
+    if pipeline is None or image_url == current_app.config["DEFAULT_IMAGE_URL"]:
+        return None
+    return pipeline.submit(image_path(image_url), image_url)
@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it originals are served as-is
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels
+VARIANT_SIZES = {"thumb": 320, "medium": 800, "full": 1600}
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXTENSION = "webp"
+VARIANT_QUALITY = 80
+
+# Uploads are written under this prefix before being renamed to their hash
+UPLOAD_TEMP_PREFIX = ".upload-"
+
+
+class ImageTooLarge(ValueError):
+    """Raised when an upload exceeds IMAGE_MAX_BYTES."""
+
+
+def stream_to_file(stream, path, max_bytes, chunk_size=64 * 1024, digest=None):
+    """
+    Copy an upload stream to path chunk by chunk, so the file never sits in
+    memory as a whole, feeding each chunk to digest if one is given. Removes
+    the partial file and raises ImageTooLarge once more than max_bytes have
+    been read.
+    """
+    written = 0
+    try:
+        with open(path, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ImageTooLarge(
+                        f"Image is larger than {max_bytes // (1024 * 1024)} MB"
+                    )
+                if digest is not None:
+                    digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+def store_upload(stream, folder, filename, max_bytes):
+    """
+    Save an upload under the SHA-256 of its bytes (keeping the extension of
+    filename) and return the stored file name. Identical uploads share one
+    file, so a stored file never changes and can be cached forever.
+    """
+    _, extension = os.path.splitext(filename)
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=UPLOAD_TEMP_PREFIX)
+    os.close(fd)
+    stream_to_file(stream, temp_path, max_bytes, digest=digest)
+
+    stored_name = f"{digest.hexdigest()}{extension.lower()}"
+    stored_path = os.path.join(folder, stored_name)
+    if os.path.exists(stored_path):
+        os.remove(temp_path)  # Same bytes are already stored
+    else:
+        os.replace(temp_path, stored_path)
+    return stored_name
+
+
+def collect_garbage(folder, referenced, grace_seconds=3600, dry_run=False):
+    """
+    Remove files in folder whose names are not in referenced and return
+    their names. Files younger than grace_seconds are kept, so uploads whose
+    product has not been committed yet are not lost.
+    """
+    if not os.path.isdir(folder):
+        return []
+    cutoff = time.time() - grace_seconds
+    removed = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name in referenced:
+                continue
+            if entry.stat().st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.remove(entry.path)
+            removed.append(entry.name)
+    return sorted(removed)
+
+
+def variant_path(path, name):
+    stem, _ = os.path.splitext(path)
+    return f"{stem}_{name}.{VARIANT_EXTENSION}"
+
+
+def create_variants(source_path, source_url, max_pixels=None):
+    """
+    Write a resized copy of the image for every VARIANT_SIZES entry next to
+    the original and return {variant name: url}. Sizes larger than the
+    original are not upscaled.
+    """
+    if max_pixels is not None:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+
+    variants = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        # Largest first, so each smaller size is resampled from fewer pixels
+        for name, size in sorted(
+            VARIANT_SIZES.items(), key=lambda item: item[1], reverse=True
+        ):
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            image.save(
+                variant_path(source_path, name),
+                VARIANT_FORMAT,
+                quality=VARIANT_QUALITY,
+                method=4,
+            )
+            variants[name] = variant_path(source_url, name)
+    return variants
+
+
+def existing_variants(source_path, source_url):
+    """
+    Variants already on disk for a stored upload, or None if any is
+    missing. Content-addressed uploads reuse the variants of earlier
+    identical uploads instead of resizing again.
+    """
+    if not all(os.path.exists(variant_path(source_path, n)) for n in VARIANT_SIZES):
+        return None
+    return {name: variant_path(source_url, name) for name in VARIANT_SIZES}
+
+
+class ImagePipeline:
+    """
+    Background pool that turns uploaded originals into resized variants and
+    records their URLs on the products that use them. Resizing and encoding
+    release the GIL inside Pillow, so a thread pool is enough. With
+    workers=0 the variants are built inline, which keeps tests deterministic.
+    """
+
+    def __init__(self, app, workers=2):
+        self.app = app
+        self.max_pixels = app.config.get("IMAGE_MAX_PIXELS")
+        self.executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images")
+            if workers
+            else None
+        )
+
+    @staticmethod
+    def available():
+        return Image is not None
+
+    def submit(self, source_path, source_url):
+        if self.executor is None:
+            return self._process(source_path, source_url)
+        return self.executor.submit(self._process, source_path, source_url)
+
+    def _process(self, source_path, source_url):
+        try:
+            variants = existing_variants(source_path, source_url)
+            if variants is None:
+                variants = create_variants(source_path, source_url, self.max_pixels)
+        except Exception:
+            logger.exception("Could not create variants for %s", source_url)
+            return None
+        with self.app.app_context():
+            self.app.db.record_image_variants(source_url, variants)
+        return variants
+
+    def shutdown(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+
+
+def init_image_pipeline(app):
+    """Start the variant pool when Pillow is installed and it is enabled."""
+    workers = app.config.get("IMAGE_PIPELINE_WORKERS", 2)
+    if workers is None or workers < 0 or not ImagePipeline.available():
+        return None
+    pipeline = ImagePipeline(app, workers)
+    app.extensions["image_pipeline"] = pipeline
+    return pipeline
+
+
+def image_src(product, size="medium"):
+    """
+    Jinja filter: URL of the requested variant of a product image (an ORM
+    object or a product dict), falling back to the original upload.
+    """
+    if isinstance(product, dict):
+        variants = product.get("image_variants")
+        image_url = product.get("image_url")
+    else:
+        variants = getattr(product, "image_variants", None)
+        image_url = getattr(product, "image_url", None)
+    return (variants or {}).get(size) or image_url
@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+DEFAULT_METHOD = "scrypt"
+
+
+class HashingBusy(RuntimeError):
+    """Raised when every hashing slot stays taken for the whole queue timeout."""
+
+
+def canonical_method(method):
+    """
+    A werkzeug hash method with its default parameters filled in, as it
+    appears in front of the "$" of the hashes it produces
+    (e.g. "scrypt" -> "scrypt:32768:8:1").
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        defaults = ["32768", "8", "1"]
+    elif name == "pbkdf2":
+        defaults = ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        raise ValueError(f"Unsupported password hash method {method!r}")
+    return ":".join([name, *args, *defaults[len(args) :]])
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords with the configured werkzeug method.
+
+    With workers > 0 the work runs in a pool of that many processes, so a
+    burst of logins uses at most that many cores and the request threads
+    only wait. At most max_pending hashes are queued or running at once; a
+    request that cannot get a slot within queue_timeout seconds gets
+    HashingBusy instead of piling up. With workers=0 hashing is inline.
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, workers=0, max_pending=None, timeout=5):
+        self.method = method
+        self.prefix = canonical_method(method)
+        self.timeout = timeout
+        self.executor = None
+        self.slots = None
+        if workers:
+            self.executor = ProcessPoolExecutor(workers, mp_context=_mp_context())
+            self.slots = threading.BoundedSemaphore(max_pending or workers * 4)
+
+    def _run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        if not self.slots.acquire(timeout=self.timeout):
+            raise HashingBusy("Too many password checks in progress")
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Whether a stored hash was made with other parameters than ours."""
+        return pwhash.split("$", 1)[0] != self.prefix
+
+    def shutdown(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+
+
+def _mp_context():
+    # Forking a process that runs request threads can copy held locks, so
+    # workers come from a fork server that only preloads the hash functions
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["werkzeug.security"])
+    return context
+
+
+_default_hasher = None
+
+
+def password_hasher():
+    """The current app's PasswordHasher, or an inline one with the default method."""
+    global _default_hasher
+    if has_app_context() and "password_hasher" in current_app.extensions:
+        return current_app.extensions["password_hasher"]
+    if _default_hasher is None:
+        _default_hasher = PasswordHasher()
+    return _default_hasher
+
+
+def init_password_hasher(app):
+    hasher = PasswordHasher(
+        method=app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 0),
+        max_pending=app.config.get("PASSWORD_HASH_MAX_PENDING"),
+        timeout=app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5),
+    )
+    app.extensions["password_hasher"] = hasher
+    return hasher
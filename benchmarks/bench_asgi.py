@@ -0,0 +1,184 @@
+"""
+Latency and throughput of the product, landing and search pages under many
+concurrent clients, served by the threaded WSGI server versus the ASGI entry
+point (asgi.py) on uvicorn. Each server runs in its own process against the
+same throw-away database; the clients are asyncio connections from this one.
+
+    python -m benchmarks.bench_asgi --clients 500 --seconds 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from app.config.testing import TestingConfig
+
+HOST = "127.0.0.1"
+SEARCH_TERMS = ("laptop", "vintage", "leather", "lamp", "wireless", "book")
+
+
+def configure(db_path):
+    """Point create_app() at the benchmark database."""
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    TestingConfig.SERVER_TIMING_ENABLED = False
+    os.environ["FLASK_ENV"] = "testing"
+
+
+def prepare(products):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="loopify-bench-"), "bench.db")
+    configure(db_path)
+    from app import create_app
+    from app.database.seed import rebuild_derived, seed_synthetic
+
+    app = create_app()
+    with app.app_context():
+        seed_synthetic(users=50, products=products)
+        rebuild_derived(app.db)
+    return db_path
+
+
+def serve(mode, db_path, port):
+    configure(db_path)
+    if mode == "wsgi":
+        from werkzeug.serving import run_simple
+        from app import create_app
+
+        run_simple(HOST, port, create_app(), threaded=True)
+    else:
+        import uvicorn
+        from app.asgi import create_asgi_app
+
+        uvicorn.run(create_asgi_app(), host=HOST, port=port, log_level="warning")
+
+
+async def fetch(port, path):
+    """GET path on a new connection; returns the status code."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        while await reader.read(64 * 1024):
+            pass
+        return status
+    finally:
+        writer.close()
+
+
+def random_path(rng, product_ids):
+    choice = rng.random()
+    if choice < 0.6:
+        return f"/product/{rng.choice(product_ids)}"
+    if choice < 0.8:
+        return f"/product/search_results?q={rng.choice(SEARCH_TERMS)}"
+    return "/"
+
+
+async def load(port, clients, seconds, product_ids):
+    """Run clients concurrent request loops; returns latencies (ms) and errors."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, random_path(rng, product_ids))
+            except (OSError, ValueError, IndexError):
+                status = None
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, errors
+
+
+def wait_for(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            asyncio.run(fetch(port, "/"))
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def run(mode, db_path, port, clients, seconds, product_ids):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_asgi", "--serve", mode]
+        + ["--db", db_path, "--port", str(port)],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port, process)
+        latencies, errors = asyncio.run(load(port, clients, seconds, product_ids))
+    finally:
+        process.terminate()
+        process.wait()
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[int(len(latencies) * p) - 1] if latencies else float("nan")
+
+    print(
+        f"{mode:<6}{len(latencies) / seconds:>10.0f}{percentile(0.5):>10.1f}"
+        f"{percentile(0.95):>10.1f}{percentile(0.99):>10.1f}{errors:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", choices=("wsgi", "asgi"), help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.db, args.port)
+
+    modes = ["wsgi"]
+    try:
+        import aiosqlite, asgiref, uvicorn  # noqa: F401
+    except ImportError as e:
+        print(f"Skipping ASGI: {e.name} is not installed")
+    else:
+        modes.append("asgi")
+
+    db_path = prepare(args.products)
+    from app.database.seed import SYNTHETIC_ID_BASE
+
+    product_ids = list(range(SYNTHETIC_ID_BASE, SYNTHETIC_ID_BASE + args.products))
+    print(f"{args.clients} clients for {args.seconds:.0f}s on {args.products} products")
+    print(
+        f"{'server':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+    for offset, mode in enumerate(modes):
+        run(
+            mode,
+            db_path,
+            args.port + offset,
+            args.clients,
+            args.seconds,
+            product_ids,
+        )
+
+
+if __name__ == "__main__":
+    main()
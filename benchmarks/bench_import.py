@@ -0,0 +1,99 @@
+"""
+Catalog import throughput: a generated CSV file imported with
+import_catalog at several batch sizes, against adding the same rows one at
+a time through DatabaseManager.add_product.
+
+    python -m benchmarks.bench_import --products 20000 --rows 2000
+"""
+
+import argparse
+import csv
+import io
+import time
+from benchmarks.common import make_app, populate
+from app.database.db import db
+from app.database.synthetic import batch_rng, product_rows
+from app.utils.catalog import CATALOG_FIELDS, import_catalog
+
+
+def catalog_csv(rows, categories):
+    """A catalog file with `rows` synthetic products, as bytes."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CATALOG_FIELDS)
+    writer.writeheader()
+    for row in product_rows(
+        batch_rng(0, 0), rows, 1, categories, [1], "/static/images/no_image.jpg"
+    ):
+        writer.writerow(
+            {
+                "title": row["title"],
+                "price": row["price"],
+                "currency": row["currency"],
+                "description": row["description"],
+                "category": categories[row["category_id"]],
+                "image_url": row["image_url"],
+            }
+        )
+    return buffer.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--single-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    populate(app, args.products)
+    with app.app_context():
+        from app.models import Category
+
+        manager = app.db
+        manager.search_index.setup()
+        manager.recommendations.setup()
+        categories = dict(
+            db.session.execute(db.select(Category.id, Category.name)).all()
+        )
+        content = catalog_csv(args.rows, categories)
+        sample = catalog_csv(args.single_rows, categories)
+
+        print(f"{args.products} existing products, {args.rows} rows per import")
+        print(f"{'mode':<18}{'seconds':>10}{'rows/s':>10}")
+        for batch_size in (1, 100, 500, 2000):
+            # Single-row transactions are slow; time them on the smaller sample
+            data = sample if batch_size == 1 else content
+            start = time.perf_counter()
+            report = import_catalog(
+                manager,
+                1,
+                io.BytesIO(data),
+                "csv",
+                "/static/images/no_image.jpg",
+                batch_size=batch_size,
+            )
+            elapsed = time.perf_counter() - start
+            assert report.failed == 0, report.errors
+            print(
+                f"{f'batch of {batch_size}':<18}{elapsed:>10.2f}"
+                f"{report.imported / elapsed:>10.0f}"
+            )
+
+        reader = csv.DictReader(io.StringIO(sample.decode()))
+        names = {name: category_id for category_id, name in categories.items()}
+        start = time.perf_counter()
+        for record in reader:
+            manager.add_product(
+                title=record["title"],
+                price=float(record["price"]),
+                description=record["description"],
+                category_id=names[record["category"]],
+                seller_id=1,
+                image_url=record["image_url"],
+            )
+        elapsed = time.perf_counter() - start
+        print(f"{'add_product':<18}{elapsed:>10.2f}{args.single_rows / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Login throughput under concurrent load with scrypt hashing on the request
+threads versus in the password hashing process pool, and the latency of
+the landing page served alongside the login burst.
+
+    python -m benchmarks.bench_login --threads 32 --seconds 10
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from app.config.testing import TestingConfig
+
+USERS = 50
+PASSWORD = "correct horse battery staple"
+
+
+def make_app(db_path, workers):
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    TestingConfig.PASSWORD_HASH_METHOD = "scrypt"
+    TestingConfig.PASSWORD_HASH_WORKERS = workers
+    TestingConfig.PASSWORD_HASH_MAX_PENDING = 1000  # Measure, never refuse
+    os.environ["FLASK_ENV"] = "testing"
+    from app import create_app
+
+    return create_app()
+
+
+def run(app, threads, seconds):
+    logins = []
+    page_latencies = []
+    deadline = time.perf_counter() + seconds
+
+    def login_loop(n):
+        with app.test_client() as client:
+            while time.perf_counter() < deadline:
+                response = client.post(
+                    "/auth/login",
+                    data={"username": f"bench_login_{n % USERS}", "password": PASSWORD},
+                )
+                assert response.status_code == 302, response.status_code
+                logins.append(1)
+                client.get("/auth/logout")
+
+    def page_loop():
+        with app.test_client() as client:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                client.get("/")
+                page_latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=login_loop, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=page_loop))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    page_latencies.sort()
+    p95 = page_latencies[int(len(page_latencies) * 0.95) - 1]
+    return len(logins) / seconds, len(page_latencies) / seconds, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="loopify-bench-"), "bench.db")
+    print(f"{args.threads} threads logging in for {args.seconds:.0f}s (scrypt)")
+    print(f"{'hashing':<16}{'logins/s':>10}{'pages/s':>10}{'page p95':>12}")
+    for label, workers in (("request thread", 0), ("process pool", args.workers)):
+        app = make_app(db_path, workers)
+        with app.app_context():
+            for n in range(USERS):
+                if app.db.get_user_by_username(f"bench_login_{n}") is None:
+                    app.db.create_user(f"bench_login_{n}", PASSWORD)
+        logins, pages, p95 = run(app, args.threads, args.seconds)
+        print(f"{label:<16}{logins:>10.1f}{pages:>10.1f}{p95:>10.1f}ms")
+        app.extensions["password_hasher"].shutdown()
+
+
+if __name__ == "__main__":
+    main()
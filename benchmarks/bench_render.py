@@ -0,0 +1,70 @@
+"""
+Template render time of the landing page and a search results page with
+the product card and category filter fragments cached versus rendered on
+every request. The product lists are loaded once, so only rendering is
+timed.
+
+    python -m benchmarks.bench_render --per-page 24 --repeat 200
+"""
+
+import argparse
+import os
+import tempfile
+from flask import render_template
+from benchmarks.common import timeit
+from app.config.testing import TestingConfig
+from app.database.cache import Cache, MemoryBackend
+
+
+def make_full_app():
+    """create_app() with all routes and templates, on a throw-away database."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="loopify-bench-"), "bench.db")
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    os.environ["FLASK_ENV"] = "testing"
+    from app import create_app
+
+    return create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=2_000)
+    parser.add_argument("--per-page", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_full_app()
+    with app.app_context():
+        from app.database.seed import seed_synthetic
+
+        seed_synthetic(users=50, products=args.products)
+        manager = app.db
+        result = manager.search_products("", [], 1, args.per_page)
+        products = result["products"]
+
+        def render_pages():
+            with app.test_request_context("/"):
+                render_template("index.html", products=products[:4])
+            with app.test_request_context("/product/search_results?category[]=1"):
+                render_template(
+                    "search_results.html",
+                    products=products,
+                    pagination=result["pagination"],
+                    search_text="",
+                    selected_categories=[1],
+                )
+
+        print(f"{len(products)} search results, {args.repeat} renders of both pages")
+        print(f"{'fragments':<12}{'mean':>12}{'p95':>12}")
+        for label, cache in (
+            ("rendered", Cache()),
+            ("cached", Cache(MemoryBackend())),
+        ):
+            manager.cache = cache
+            render_pages()  # Warm the template and fragment caches
+            mean, p95 = timeit(render_pages, args.repeat)
+            print(f"{label:<12}{mean:>10.2f}ms{p95:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare FTS5 and LIKE search over a synthetic catalog, time the facet
+counts (category and price bucket GROUP BY) of the same queries, and time
+the first and a deep cursor page of each sort order.
+
+    python -m benchmarks.bench_search --products 100000
+"""
+
+import argparse
+from app.database.manager import SORT_ORDERS
+from benchmarks.common import VOCABULARY, make_app, populate, timeit
+
+# From very common to rare terms (the vocabulary is Zipf-distributed), a
+# two-term query, a prefix and a query without hits.
+QUERIES = [
+    "laptop",
+    VOCABULARY[300],
+    VOCABULARY[3000],
+    f"{VOCABULARY[200]} {VOCABULARY[900]}",
+    VOCABULARY[1500][:4],
+    "nomatch",
+]
+
+DEEP_PAGE = 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    populate(app, args.products)
+
+    with app.app_context():
+        manager = app.db
+        manager.search_index.setup()
+
+        print(f"{args.products} products, {args.repeat} runs per query")
+        print(
+            f"{'query':<20}{'fts mean':>12}{'fts p95':>12}{'like mean':>12}{'like p95':>12}"
+        )
+        for query in QUERIES:
+            manager.search_index._available = True
+            fts = timeit(lambda: manager.search_products(query, [], 3, 9), args.repeat)
+            manager.search_index._available = False
+            like = timeit(lambda: manager.search_products(query, [], 3, 9), args.repeat)
+            print(
+                f"{query:<20}{fts[0]:>10.2f}ms{fts[1]:>10.2f}ms"
+                f"{like[0]:>10.2f}ms{like[1]:>10.2f}ms"
+            )
+
+        manager.search_index._available = True
+        print(f"\n{'facets of':<20}{'mean':>12}{'p95':>12}")
+        for query in ["", *QUERIES]:
+            mean, p95 = timeit(
+                lambda: manager.get_search_facets(query, [], 25, 100), args.repeat
+            )
+            print(f"{query or '(everything)':<20}{mean:>10.2f}ms{p95:>10.2f}ms")
+
+        print(
+            f"\n{'sort':<20}{'page 1':>12}{'page ' + str(DEEP_PAGE):>12}{'category':>12}"
+        )
+        for sort in SORT_ORDERS[1:]:
+            first = timed_page(manager, args.repeat, sort=sort)
+            deep = timed_page(
+                manager, args.repeat, sort=sort, cursor=deep_cursor(manager, sort)
+            )
+            category = timed_page(manager, args.repeat, sort=sort, categories=[1])
+            print(f"{sort:<20}{first:>10.2f}ms{deep:>10.2f}ms{category:>10.2f}ms")
+
+
+def deep_cursor(manager, sort):
+    """The cursor of page DEEP_PAGE, reached by following next cursors."""
+    cursor = None
+    for _ in range(DEEP_PAGE - 1):
+        result = manager.get_all_products(
+            per_page=9, cursor=cursor, with_total=False, sort=sort
+        )
+        cursor = result["pagination"]["next_cursor"]
+    return cursor
+
+
+def timed_page(manager, repeat, sort, cursor=None, categories=None):
+    """Mean ms of an uncached listing page in the given sort order."""
+
+    def page():
+        manager.cache.clear()
+        if categories:
+            manager.search_products(
+                "", categories, per_page=9, with_total=False, sort=sort
+            )
+        else:
+            manager.get_all_products(
+                per_page=9, cursor=cursor, with_total=False, sort=sort
+            )
+
+    return timeit(page, repeat)[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Listing queries answered by SQLite versus the in-memory catalog snapshot
+(with numpy, and with the pure-Python fallback): the first page with its
+total, a deep cursor page, a category and price range filter with its
+total, and the search facets. Also reports the snapshot's memory per
+100,000 products.
+
+    python -m benchmarks.bench_snapshot --products 1000000
+"""
+
+import argparse
+import time
+from app.database import snapshot as snapshot_module
+from app.database.snapshot import CatalogSnapshot
+from benchmarks.common import make_app, populate, timeit
+
+DEEP_PAGE = 200
+
+
+def deep_cursor(manager, sort):
+    cursor = None
+    for _ in range(DEEP_PAGE - 1):
+        result = manager.get_all_products(
+            per_page=9, cursor=cursor, with_total=False, sort=sort
+        )
+        cursor = result["pagination"]["next_cursor"]
+    return cursor
+
+
+def workloads(manager, cursor):
+    return [
+        ("first page + total", lambda: manager.get_all_products(per_page=9)),
+        (
+            f"newest, page {DEEP_PAGE}",
+            lambda: manager.get_all_products(
+                per_page=9, cursor=cursor, with_total=False, sort="newest"
+            ),
+        ),
+        (
+            "category + price",
+            lambda: manager.search_products(
+                "", [1], per_page=9, min_price=25, max_price=100, sort="price_asc"
+            ),
+        ),
+        ("facets", lambda: manager.get_search_facets("", [1], 25, 100)),
+    ]
+
+
+def uncached(manager, fn):
+    def run():
+        manager.cache.clear()
+        manager.count_cache.clear()
+        fn()
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    populate(app, args.products)
+
+    with app.app_context():
+        manager = app.db
+        snapshot = CatalogSnapshot()
+        start = time.perf_counter()
+        snapshot.build()
+        build = time.perf_counter() - start
+        stats = snapshot.stats()
+        print(
+            f"{args.products} products: snapshot loaded in {build:.1f}s, "
+            f"{stats['bytes'] / 2**20:.1f} MB "
+            f"({stats['bytes'] / stats['products'] * 100_000 / 2**20:.2f} MB "
+            "per 100,000 products)"
+        )
+
+        numpy = snapshot_module.numpy
+        modes = [("sqlite", None, numpy)]
+        if numpy is not None:
+            modes.append(("numpy", snapshot, numpy))
+        else:
+            print("Skipping numpy: it is not installed")
+        modes.append(("python", snapshot, None))
+
+        # Cursors are the same either way, so one walk serves every mode
+        cursor = deep_cursor(manager, "newest")
+        timings = {}
+        for mode, manager.snapshot, snapshot_module.numpy in modes:
+            for name, fn in workloads(manager, cursor):
+                run = uncached(manager, fn)
+                run()  # Warm up: sorts the snapshot's order for this sort once
+                timings[name, mode] = timeit(run, args.repeat)[0]
+
+        if numpy is not None:
+            snapshot_module.numpy = numpy
+            snapshot.page(sort="price_asc")
+            snapshot.page(sort="newest")
+            orders = snapshot.stats()["bytes"] - stats["bytes"]
+            print(
+                f"sort orders: {orders / stats['products'] * 100_000 / 2**20:.2f} MB "
+                "per 100,000 products"
+            )
+            mean, _ = timeit(
+                lambda: (
+                    snapshot.changed([args.products // 2]),
+                    snapshot.page(sort="price_asc", with_total=False),
+                ),
+                args.repeat,
+            )
+            print(f"price page after a change (sort order kept up): {mean:.2f}ms")
+
+        names = [mode for mode, _, _ in modes]
+        print(f"{'query':<22}" + "".join(f"{name + ' ms':>12}" for name in names))
+        for name in dict.fromkeys(name for name, _ in timings):
+            print(
+                f"{name:<22}"
+                + "".join(f"{timings[name, mode]:>12.2f}" for mode in names)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Mixed read / cart-write throughput of several worker processes sharing one
+SQLite file, with SQLAlchemy defaults versus the production engine profile.
+
+    python -m benchmarks.bench_sqlite_concurrency --workers 8 --seconds 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from app.config.production import ProductionConfig
+from benchmarks.common import make_app, populate
+
+PROFILES = {
+    "default": {},
+    "production": {
+        "SQLITE_PRAGMAS": ProductionConfig.SQLITE_PRAGMAS,
+        "SQLALCHEMY_ENGINE_OPTIONS": ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS,
+    },
+}
+
+USERS = 200
+PRODUCTS = 20_000
+
+
+def worker(db_path, profile, seconds, write_ratio, seed, results):
+    from sqlalchemy.exc import IntegrityError, OperationalError
+    from app.database.db import db
+
+    app = make_app(db_path, **PROFILES[profile])
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    with app.app_context():
+        manager = app.db
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, USERS)
+            product_id = rng.randint(1, PRODUCTS)
+            try:
+                if rng.random() < write_ratio:
+                    if manager.cart_item_exists(user_id, product_id):
+                        manager.remove_from_cart(user_id, product_id)
+                    else:
+                        manager.add_to_cart(user_id, product_id)
+                    writes += 1
+                else:
+                    manager.get_product_by_id(product_id)
+                    manager.get_cart_items(user_id)
+                    reads += 1
+            except (IntegrityError, OperationalError):
+                db.session.rollback()
+                errors += 1
+            finally:
+                db.session.remove()
+    results.put((reads, writes, errors))
+
+
+def run(profile, workers, seconds, write_ratio):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="loopify-bench-"), "bench.db")
+    populate(make_app(db_path, **PROFILES[profile]), PRODUCTS, users=USERS)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(db_path, profile, seconds, write_ratio, i, results)
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = [0, 0, 0]
+    for _ in processes:
+        for i, value in enumerate(results.get()):
+            totals[i] += value
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(
+        f"{args.workers} workers, {args.seconds}s, {args.write_ratio:.0%} cart writes"
+    )
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'errors':>8}")
+    for profile in PROFILES:
+        reads, writes, errors = run(
+            profile, args.workers, args.seconds, args.write_ratio
+        )
+        print(
+            f"{profile:<12}{reads / args.seconds:>10.0f}"
+            f"{writes / args.seconds:>10.0f}{errors:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
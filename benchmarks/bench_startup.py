@@ -0,0 +1,71 @@
+"""
+Cold start of create_app() in fresh interpreter processes, bootstrapping
+in-process (AUTO_BOOTSTRAP, the old behaviour) versus the worker fast path
+that only checks the schema version.
+
+    python -m benchmarks.bench_startup --products 20000 --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from benchmarks.common import make_app, populate
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app.config.testing import TestingConfig
+TestingConfig.SQLALCHEMY_DATABASE_URI = sys.argv[1]
+TestingConfig.AUTO_BOOTSTRAP = sys.argv[2] == "1"
+TestingConfig.SUGGEST_BUILD_IN_BACKGROUND = True  # As deployed workers do
+from app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": done - imported}))
+"""
+
+
+def measure(uri, auto_bootstrap, runs):
+    samples = []
+    env = dict(os.environ, FLASK_ENV="testing")
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, uri, "1" if auto_bootstrap else "0"],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: sorted(sample[key] * 1000 for sample in samples)[runs // 2]
+        for key in ("import", "create_app")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    populate(app, args.products)
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    with app.app_context():
+        from app.database.bootstrap import bootstrap
+
+        bootstrap(app.db, seed_samples=False)
+
+    print(f"{args.products} products, median of {args.runs} fresh processes")
+    print(f"{'startup':<18}{'import ms':>12}{'create_app ms':>16}")
+    for label, auto_bootstrap in (("auto bootstrap", True), ("worker path", False)):
+        result = measure(uri, auto_bootstrap, args.runs)
+        print(f"{label:<18}{result['import']:>12.1f}{result['create_app']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Typeahead latency of the in-memory SuggestIndex over a synthetic catalog:
+build time and size, suggest() percentiles for one- to four-letter prefixes
+and two-word queries, the cost of an incremental update, and the memory of
+an index filled to its term budget.
+
+    python -m benchmarks.bench_suggest --products 1000000
+"""
+
+import argparse
+import random
+import string
+import time
+from app.database.suggest import SuggestIndex
+from benchmarks.common import make_app, populate, random_text
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return [samples[int(len(samples) * p) - 1] for p in (0.5, 0.95, 0.99)]
+
+
+def queries(rng, count):
+    """Prefixes of Zipf-distributed words, as typed letter by letter."""
+    typed = []
+    while len(typed) < count:
+        word = random_text(rng, 1)
+        head = random_text(rng, 1) + " " if rng.random() < 0.2 else ""
+        for length in range(1, min(len(word), 4) + 1):
+            typed.append(head + word[:length])
+    return typed[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--max-terms", type=int, default=300_000)
+    args = parser.parse_args()
+
+    app = make_app()
+    populate(app, args.products)
+    rng = random.Random(3)
+
+    with app.app_context():
+        index = SuggestIndex(max_terms=args.max_terms)
+        start = time.perf_counter()
+        index.build()
+        build = time.perf_counter() - start
+    stats = index.stats()
+    print(
+        f"{args.products} products: built in {build:.1f}s, {stats['terms']} terms, "
+        f"{stats['bytes'] / 2**20:.1f} MB"
+    )
+
+    samples = []
+    for query in queries(rng, args.queries):
+        start = time.perf_counter()
+        index.suggest(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = percentiles(samples)
+    print(f"suggest: p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+
+    titles = [random_text(rng, 5).title() for _ in range(2000)]
+    start = time.perf_counter()
+    for title in titles:
+        index.add_product(title)
+    for old, new in zip(titles, reversed(titles)):
+        index.update_product(old, new)
+    per_write = (time.perf_counter() - start) * 1000 / (2 * len(titles))
+    print(f"add/update: {per_write:.3f}ms per product")
+
+    full = SuggestIndex(max_terms=args.max_terms)
+    full.add_products(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(args.max_terms)
+    )
+    stats = full.stats()
+    samples = []
+    for length in range(1, 5):
+        for _ in range(args.queries // 4):
+            query = "".join(rng.choices(string.ascii_lowercase, k=length))
+            start = time.perf_counter()
+            full.suggest(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = percentiles(samples)
+    print(
+        f"full index: {stats['terms']} terms, {stats['bytes'] / 2**20:.1f} MB "
+        f"({stats['bytes'] / stats['terms']:.0f} bytes per term), "
+        f"suggest p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
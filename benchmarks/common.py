@@ -0,0 +1,100 @@
+"""Shared helpers for the benchmark scripts in this folder."""
+
+import os
+import random
+import tempfile
+import time
+from flask import Flask
+from app.config.testing import TestingConfig
+from app.database.db import db, init_db
+from app.database.manager import DatabaseManager
+
+WORDS = (
+    "vintage classic used refurbished wireless leather cotton ceramic steel "
+    "portable compact premium durable stylish laptop phone headphones watch "
+    "jacket dress shirt blender kettle mug pan book guide novel lamp chair "
+    "table bike helmet camera lens speaker keyboard monitor"
+).split()
+
+_SYLLABLES = "ba be bi bo bu ka ke ki ko ku la le li lo lu ma me mi mo mu ra re ri ro ru ta te ti to tu".split()
+
+
+def _vocabulary(size, seed=7):
+    """Real words first, then made-up ones, so term frequencies follow Zipf's law."""
+    rng = random.Random(seed)
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+VOCABULARY = _vocabulary(20_000)
+_CUM_WEIGHTS = []
+_total = 0.0
+for _rank in range(len(VOCABULARY)):
+    _total += 1.0 / (_rank + 1)
+    _CUM_WEIGHTS.append(_total)
+
+
+def make_app(db_path=None, **config):
+    """Create a bare app bound to a throw-away SQLite file."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="loopify-bench-"), "bench.db")
+    app = Flask("loopify-bench")
+    app.config.from_object(TestingConfig)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    app.config.update(config)
+    init_db(app)
+    with app.app_context():
+        app.db = DatabaseManager()
+        db.create_all()
+    return app
+
+
+def random_text(rng, words):
+    return " ".join(rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=words))
+
+
+def populate(app, products, categories=8, users=10, seed=42):
+    """Insert synthetic users, categories and products with Core executemany."""
+    from app.models import Category, Product, User
+
+    rng = random.Random(seed)
+    with app.app_context():
+        db.session.execute(
+            User.__table__.insert(),
+            [{"username": f"bench{i}", "password": "x"} for i in range(users)],
+        )
+        db.session.execute(
+            Category.__table__.insert(),
+            [{"name": f"Category {i}"} for i in range(categories)],
+        )
+        rows = [
+            {
+                "title": random_text(rng, 5).title(),
+                "price": round(rng.uniform(1, 1000), 2),
+                "currency": "EUR",
+                "description": random_text(rng, 60)[:500],
+                "image_url": "/static/images/no_image.jpg",
+                "category_id": rng.randint(1, categories),
+                "seller_id": rng.randint(1, users),
+            }
+            for _ in range(products)
+        ]
+        db.session.execute(Product.__table__.insert(), rows)
+        db.session.commit()
+
+
+def timeit(fn, repeat):
+    """Run fn repeat times and return (mean_ms, p95_ms)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.95) - 1]
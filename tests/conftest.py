@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import db as _db
+
+
+@pytest.fixture
+def client(app):
+    """
+    Test client logged in as testuser1. Needs the module's app fixture (with
+    SESSION_COOKIE_SECURE off, so the session cookie is sent back).
+    """
+    with app.test_client() as client:
+        client.post(
+            "/auth/login", data={"username": "testuser1", "password": "password1"}
+        )
+        yield client
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Context manager that records the SQL statements run inside it:
+
+        with count_queries() as statements:
+            ...
+        assert len(statements) == 1
+
+    Needs an application context (e.g. the module's app fixture).
+    """
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counter
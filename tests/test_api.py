@@ -0,0 +1,87 @@
+import json
+import os
+import pytest
+from app import create_app, db as _db
+from app.models import Product
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_products_follow_cursors(app):
+    ids = []
+    url = "/api/v1/products?limit=5&fields=id,title"
+    with app.test_client() as client:
+        while True:
+            body = client.get(url).get_json()
+            assert all(set(item) == {"id", "title"} for item in body["data"])
+            ids.extend(item["id"] for item in body["data"])
+            if not body["next_cursor"]:
+                break
+            url = (
+                f"/api/v1/products?limit=5&fields=id,title&cursor={body['next_cursor']}"
+            )
+    assert ids == sorted(p.id for p in Product.query.all())
+
+
+def test_search_filters_by_text_and_category(app):
+    with app.test_client() as client:
+        body = client.get("/api/v1/search?q=laptop&category=1").get_json()
+    assert body["data"]
+    assert all(item["category_id"] == 1 for item in body["data"])
+    assert all("laptop" in json.dumps(item).lower() for item in body["data"])
+
+
+def test_product_and_recommendations(app):
+    with app.test_client() as client:
+        product = client.get("/api/v1/products/1").get_json()
+        recommended = client.get(
+            "/api/v1/products/1/recommendations?fields=id"
+        ).get_json()
+        missing = client.get("/api/v1/products/9999")
+    assert product["description"] == _db.session.get(Product, 1).description
+    assert product["updated_at"].endswith("Z")
+    assert recommended["data"] and all(list(i) == ["id"] for i in recommended["data"])
+    assert missing.status_code == 404
+
+
+def test_categories(app):
+    with app.test_client() as client:
+        body = client.get("/api/v1/categories").get_json()
+    assert {"id": 1, "name": "Electronics"} in body["data"]
+
+
+def test_ndjson_export_streams_every_product(app):
+    with app.test_client() as client:
+        response = client.get("/api/v1/products?format=ndjson&fields=id,price")
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["id"] for row in rows] == sorted(p.id for p in Product.query.all())
+    assert all(set(row) == {"id", "price"} for row in rows)
+    assert response.mimetype == "application/x-ndjson"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "fields=id,secret",
+        "limit=0",
+        "limit=abc",
+        "cursor=nope",
+        "cursor=eyJ2IjpbWzEsMl1dLCJwIjoyLCJkIjoibmV4dCJ9",
+        "category=x",
+    ],
+)
+def test_invalid_parameters(app, query):
+    with app.test_client() as client:
+        response = client.get(f"/api/v1/products?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
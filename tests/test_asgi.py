@@ -0,0 +1,86 @@
+import asyncio
+import os
+import pytest
+from app import db as _db
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asgiref")
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def asgi_app():
+    asgi_app = create_asgi_app()
+    yield asgi_app
+    asyncio.run(asgi_app.flask_app.async_db.dispose())
+    with asgi_app.flask_app.app_context():
+        _db.drop_all()
+
+
+def request(asgi_app, path, query_string=b"", method="GET", headers=()):
+    """Send one request through the ASGI app; returns (status, headers, body)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost")] + list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+@pytest.mark.parametrize(
+    "path, query_string",
+    [("/", b""), ("/product/1", b""), ("/product/search_results", b"q=laptop")],
+)
+def test_async_views_match_wsgi_views(asgi_app, path, query_string):
+    status, headers, body = request(asgi_app, path, query_string)
+    with asgi_app.flask_app.test_client() as client:
+        expected = client.get(f"{path}?{query_string.decode()}")
+
+    assert status == 200
+    assert headers[b"etag"].decode() == expected.headers["ETag"]
+    assert body == expected.data
+
+
+def test_async_views_answer_304(asgi_app):
+    _, headers, _ = request(asgi_app, "/product/1")
+    status, _, body = request(
+        asgi_app, "/product/1", headers=[(b"if-none-match", headers[b"etag"])]
+    )
+    assert status == 304
+    assert body == b""
+
+
+def test_missing_product_and_anonymous_cart(asgi_app):
+    assert request(asgi_app, "/product/9999")[0] == 404
+    status, headers, _ = request(asgi_app, "/cart/")
+    assert status == 302
+    assert headers[b"location"].startswith(b"/auth/login")
+
+
+def test_other_routes_go_through_wsgi(asgi_app):
+    status, _, body = request(asgi_app, "/api/v1/categories")
+    assert status == 200
+    assert b"Electronics" in body
@@ -1,6 +1,10 @@
 import pytest
+import threading
+from sqlalchemy import select
+from werkzeug.security import generate_password_hash
 from app import create_app, db as _db
 from app.models import User
+from app.utils.passwords import PasswordHasher, canonical_method
 import os
 
 os.environ["FLASK_ENV"] = "testing"
@@ -54,3 +58,74 @@ def test_register(app):
         new_user = User.query.filter_by(username="newuser").first()
         assert new_user is not None
         assert new_user.username == "newuser"
+
+
+def test_user_loader_uses_cached_principal(app):
+    user = User.query.filter_by(username="testuser").first()
+    load_user = app.login_manager._user_callback
+
+    assert load_user(str(user.id)).username == "testuser"
+    assert load_user(str(user.id)).username == "testuser"
+    assert app.db.principal_cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "namespaces": {"user": {"hits": 1, "misses": 1}},
+    }
+
+
+def test_load_principal_is_slim(app):
+    user = User.query.filter_by(username="testuser").first()
+    principal = app.db.load_principal(user.id)
+
+    assert principal.username == "testuser"
+    assert principal.get_id() == str(user.id)
+    assert not hasattr(principal, "password")
+    assert app.db.load_principal(10_000) is None
+
+
+def test_login_rehashes_outdated_password(app):
+    user = User.query.filter_by(username="testuser").first()
+    user.password = generate_password_hash("testpassword", "pbkdf2:sha256:500")
+    _db.session.commit()
+
+    with app.test_client() as client:
+        client.post(
+            "/auth/login", data={"username": "testuser", "password": "testpassword"}
+        )
+
+    _db.session.expire_all()
+    stored = _db.session.scalar(select(User.password).filter_by(username="testuser"))
+    assert stored.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert app.db.get_user("testuser", "testpassword") is not None
+
+
+def test_login_is_refused_when_hashing_is_saturated(app):
+    hasher = app.extensions["password_hasher"]
+    hasher.slots = threading.BoundedSemaphore(1)
+    hasher.slots.acquire()
+    hasher.executor = object()  # Never reached: no slot is free
+    hasher.timeout = 0.01
+
+    with app.test_client() as client:
+        response = client.post(
+            "/auth/login", data={"username": "testuser", "password": "testpassword"}
+        )
+    assert response.status_code == 503
+
+
+def test_process_pool_hashes_match_inline_hashes():
+    hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1)
+    try:
+        pwhash = hasher.hash("secret")
+        assert hasher.verify(pwhash, "secret")
+        assert not hasher.verify(pwhash, "wrong")
+        assert not hasher.needs_rehash(pwhash)
+        assert PasswordHasher("scrypt").needs_rehash(pwhash)
+    finally:
+        hasher.shutdown()
+
+
+def test_canonical_method_fills_in_defaults():
+    assert canonical_method("scrypt") == "scrypt:32768:8:1"
+    assert canonical_method("scrypt:65536") == "scrypt:65536:8:1"
+    assert canonical_method("pbkdf2:sha256:1000") == "pbkdf2:sha256:1000"
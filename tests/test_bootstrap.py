@@ -0,0 +1,54 @@
+import os
+import pytest
+from sqlalchemy import inspect
+from app import create_app, db as _db
+from app.config.testing import TestingConfig
+from app.database.bootstrap import SCHEMA_VERSION, schema_version
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+@pytest.fixture
+def worker_app(tmp_path, monkeypatch):
+    """An app as a deployed worker starts it: no bootstrap inside create_app."""
+    monkeypatch.setattr(TestingConfig, "AUTO_BOOTSTRAP", False)
+    monkeypatch.setattr(
+        TestingConfig,
+        "SQLALCHEMY_DATABASE_URI",
+        f"sqlite:///{tmp_path / 'worker.db'}",
+    )
+    app = create_app()
+    yield app
+    with app.app_context():
+        _db.drop_all()
+
+
+def test_auto_bootstrap_records_schema_version(app):
+    assert schema_version() == SCHEMA_VERSION
+
+
+def test_worker_startup_does_no_schema_work(worker_app):
+    with worker_app.app_context():
+        assert inspect(_db.engine).get_table_names() == []
+
+
+def test_worker_serves_requests_once_bootstrapped(worker_app):
+    with worker_app.test_client() as client:
+        response = client.get("/")
+        assert response.status_code == 503
+        assert b"flask bootstrap" in response.data
+
+        result = worker_app.test_cli_runner().invoke(args=["bootstrap"])
+        assert result.exit_code == 0, result.output
+        assert f"schema version 0 -> {SCHEMA_VERSION}" in result.output
+
+        assert client.get("/").status_code == 200
+        assert client.get("/product/1").status_code == 200
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import re
+import time
+import pytest
+from app import create_app, db as _db
+from app.database.cache import Cache, MemoryBackend, SQLiteBackend
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    cache = Cache(MemoryBackend(max_entries=2))
+    cache.get_or_load("ns", "a", lambda: 1)
+    cache.get_or_load("ns", "b", lambda: 2)
+    cache.get_or_load("ns", "a", lambda: 0)  # touch "a"
+    cache.get_or_load("ns", "c", lambda: 3)  # evicts "b"
+
+    assert cache.get_or_load("ns", "a", lambda: 0) == 1
+    assert cache.get_or_load("ns", "b", lambda: 0) == 0
+
+
+def test_entries_expire_after_ttl():
+    cache = Cache(MemoryBackend(), ttl=0.01)
+    cache.get_or_load("ns", "a", lambda: 1)
+    time.sleep(0.02)
+    assert cache.get_or_load("ns", "a", lambda: 2) == 2
+
+
+def test_invalidate_only_touches_its_namespace():
+    cache = Cache(MemoryBackend())
+    cache.get_or_load("product:1", "row", lambda: "one")
+    cache.get_or_load("product:2", "row", lambda: "two")
+    cache.invalidate("product:1")
+
+    assert cache.get_or_load("product:1", "row", lambda: "new") == "new"
+    assert cache.get_or_load("product:2", "row", lambda: "new") == "two"
+    assert cache.stats()["namespaces"]["product"] == {"hits": 1, "misses": 3}
+
+
+def test_async_loads_share_entries_with_sync_loads():
+    cache = Cache(MemoryBackend())
+
+    async def load():
+        return "async"
+
+    assert asyncio.run(cache.get_or_load_async("product:1", "row", load)) == "async"
+    assert cache.get_or_load("product:1", "row", lambda: "sync") == "async"
+    cache.invalidate("product:1")
+    assert cache.get_or_load("product:1", "row", lambda: "sync") == "sync"
+    assert asyncio.run(cache.get_or_load_async("product:1", "row", load)) == "sync"
+
+
+def test_sqlite_backend_shares_invalidations(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    worker_a = Cache(SQLiteBackend(path))
+    worker_b = Cache(SQLiteBackend(path))
+
+    worker_a.get_or_load("listings", 1, lambda: ["a"])
+    assert worker_b.get_or_load("listings", 1, lambda: ["b"]) == ["a"]
+
+    worker_b.invalidate("listings")
+    assert worker_a.get_or_load("listings", 1, lambda: ["c"]) == ["c"]
+
+
+def test_product_reads_are_cached_and_invalidated(app):
+    db = app.db
+    db.cache.clear()
+
+    assert db.get_product_by_id(1).title.startswith("Dell")
+    product = db.get_product_by_id(1)
+    assert product.category.name == "Electronics"
+    assert db.cache.stats()["namespaces"]["product"] == {"hits": 1, "misses": 1}
+
+    db.update_product(1, title="Lenovo ThinkPad")
+    assert db.get_product_by_id(1).title == "Lenovo ThinkPad"
+    assert db.search_products("thinkpad", [])["products"][0]["id"] == 1
+
+
+def test_batch_inserts_drop_cached_misses(app):
+    from app.models import Product
+
+    db = app.db
+    next_id = _db.session.query(_db.func.max(Product.id)).scalar() + 1
+    assert db.get_product_by_id(next_id) is None  # Cached as a miss
+
+    [product_id] = db.add_products(
+        [
+            {
+                "title": "Walnut desk",
+                "price": 120.0,
+                "description": "Solid walnut",
+                "category_id": 1,
+                "seller_id": 1,
+            }
+        ]
+    )
+    assert product_id == next_id
+    assert db.get_product_by_id(next_id).title == "Walnut desk"
+
+
+def test_cart_reads_are_invalidated_by_writes(app):
+    db = app.db
+    assert db.get_total_cart_items(1) == 0
+    assert not db.cart_item_exists(1, 2)
+
+    db.add_to_cart(1, 2)
+    assert db.get_total_cart_items(1) == 1
+    assert db.cart_item_exists(1, 2)
+
+    db.update_product(2, price=1.5)
+    assert db.get_cart_items(1)[0]["price"] == 1.5
+
+    db.delete_product(2)
+    assert db.get_total_cart_items(1) == 0
+    assert db.get_cart_items(1) == []
+
+
+def test_product_cards_are_cached_until_the_product_changes(app):
+    db = app.db
+    db.cache.clear()
+    with app.test_client() as client:
+        assert b">Dell Inspiron 15" in client.get("/product/search_results").data
+        misses = db.cache.stats()["namespaces"]["product"]["misses"]
+        client.get("/product/search_results")
+        assert db.cache.stats()["namespaces"]["product"]["misses"] == misses
+
+        db.update_product(1, title="Lenovo ThinkPad")
+        page = client.get("/product/search_results").data
+    assert b">Lenovo ThinkPad<" in page and b">Dell Inspiron 15" not in page
+
+
+def test_category_filter_fragment_keeps_selection(app, count_queries):
+    with app.test_client() as client:
+        client.get("/product/search_results?category[]=2")
+        with count_queries() as statements:
+            page = client.get("/product/search_results?category[]=2").data
+    assert not any("FROM categories" in statement for statement in statements)
+    assert page.count(b"checked") == 1
+    assert re.search(rb'value="2"\s+checked', page)
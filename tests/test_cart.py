@@ -0,0 +1,102 @@
+import os
+import pytest
+from app import create_app, db as _db
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["SESSION_COOKIE_SECURE"] = False
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_update_cart_applies_batch(app):
+    db = app.db
+    # Product 1 is sold by user 2, product 2 by user 3, 999 does not exist
+    result = db.update_cart(2, add=[1, 2, 999])
+    assert result == {"added": [2], "removed": [], "total_cart_items": 1}
+
+    result = db.update_cart(2, add=[2, 4], remove=[2, 6])
+    assert result == {"added": [2, 4], "removed": [2], "total_cart_items": 2}
+    assert db.cart_item_exists(2, 4)
+
+
+def test_batch_endpoint_requires_login(app):
+    with app.test_client() as client:
+        response = client.post("/cart/api/batch", json={"add": [1]})
+    assert response.status_code == 401
+
+
+def test_batch_endpoint_validates_payload(client):
+    assert client.post("/cart/api/batch", json={"add": ["1"]}).status_code == 400
+    assert client.post("/cart/api/batch", json=[1]).status_code == 400
+    too_many = {"add": list(range(1, 102))}
+    assert client.post("/cart/api/batch", json=too_many).status_code == 400
+
+
+def test_batch_endpoint_returns_new_count(client):
+    response = client.post("/cart/api/batch", json={"add": [1, 2, 3]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "added": [1, 2, 3],
+        "removed": [],
+        "total_cart_items": 3,
+    }
+
+    response = client.post("/cart/api/batch", json={"remove": [2]})
+    assert response.get_json()["total_cart_items"] == 2
+
+
+def test_add_and_remove_routes(client):
+    response = client.get("/cart/add/1")
+    assert response.status_code == 302
+    assert client.get("/cart/add/999").status_code == 404
+
+    assert client.get("/cart/remove/1").status_code == 302
+    assert client.get("/cart/remove/1").status_code == 404
+
+
+def test_counter_tracks_cart_writes(app):
+    from app.models import CartCounter
+
+    db = app.db
+    db.update_cart(1, add=[1, 2, 3])
+    db.remove_from_cart(1, 2)
+    assert _db.session.get(CartCounter, 1).item_count == 2
+    assert db.get_total_cart_items(1) == 2
+
+
+def test_delete_product_updates_every_counter(app):
+    db = app.db
+    db.update_cart(1, add=[2, 4])
+    db.update_cart(2, add=[2])
+    assert db.get_total_cart_items(2) == 1
+
+    db.delete_product(2)
+    assert db.get_total_cart_items(1) == 1
+    assert db.get_total_cart_items(2) == 0
+
+
+def test_reconcile_repairs_drift(app):
+    from app.models import Cart, CartCounter
+
+    db = app.db
+    db.update_cart(1, add=[1, 2])
+    # Simulate drift: a cart row written behind the manager's back
+    _db.session.add(Cart(user_id=1, product_id=3))
+    _db.session.add(CartCounter(user_id=3, item_count=5))
+    _db.session.commit()
+
+    assert db.reconcile_cart_counters() == {1: 3, 3: 0}
+    assert db.get_total_cart_items(1) == 3
+    assert db.reconcile_cart_counters() == {}
+
+
+def test_reconcile_command(app):
+    result = app.test_cli_runner().invoke(args=["reconcile-cart-counters"])
+    assert result.exit_code == 0
+    assert "0 cart counter(s) repaired" in result.output
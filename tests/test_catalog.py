@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app, db as _db
+from app.models import Product
+
+os.environ["FLASK_ENV"] = "testing"
+
+CSV_FILE = """title,price,currency,description,category,image_url
+Trek Mountain Bike,350,EUR,Aluminium frame,Sports,
+Espresso Cups,12.5,,Set of four,home & kitchen,
+,10,EUR,No title,1,
+Broken Price,abc,EUR,,1,
+Unknown Category,5,EUR,,Gardening,
+"""
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["SESSION_COOKIE_SECURE"] = False
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def upload(client, content, filename):
+    return client.post(
+        "/product/import",
+        data={"file": (io.BytesIO(content.encode()), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_import_adds_valid_rows_and_reports_the_rest(app, client):
+    app.config["IMPORT_BATCH_SIZE"] = 1
+    page = upload(client, CSV_FILE, "catalog.csv").get_data(as_text=True)
+
+    assert "Imported 2 products, 3 rows rejected" in page
+    assert "title is required" in page
+    assert "price must be a number" in page
+    assert "unknown category &#39;Gardening&#39;" in page
+    bike = Product.query.filter_by(title="Trek Mountain Bike").one()
+    assert bike.seller_id == 1 and bike.category.name == "Sports"
+    assert bike.image_url == app.config["DEFAULT_IMAGE_URL"]
+    cups = Product.query.filter_by(title="Espresso Cups").one()
+    assert cups.currency == "EUR"
+    # Imported products are searchable and recommended right away
+    results = app.db.search_products("mountain bike", [])["products"]
+    assert bike.id in [product["id"] for product in results]
+    assert app.db.recommendations.recommended_ids(cups.id)
+
+
+def test_rows_the_database_rejects_do_not_sink_their_batch(app, client):
+    _db.session.execute(
+        text(
+            "CREATE TRIGGER reject_espresso BEFORE INSERT ON products "
+            "WHEN NEW.title = 'Espresso Cups' BEGIN SELECT RAISE(ABORT, 'no'); END"
+        )
+    )
+    _db.session.commit()
+    page = upload(client, CSV_FILE, "catalog.csv").get_data(as_text=True)
+
+    assert "Imported 1 products, 4 rows rejected" in page
+    assert "could not be saved" in page
+    assert Product.query.filter_by(title="Trek Mountain Bike").count() == 1
+    assert Product.query.filter_by(title="Espresso Cups").count() == 0
+
+
+def test_ndjson_import_reports_bad_lines(app, client):
+    lines = [
+        json.dumps({"title": "LEGO Castle", "price": 80, "category": "Toys"}),
+        "{not json",
+        json.dumps(["a", "list"]),
+    ]
+    page = upload(client, "\n".join(lines), "catalog.ndjson").get_data(as_text=True)
+
+    assert "Imported 1 products, 2 rows rejected" in page
+    assert "Invalid JSON" in page and "Expected a JSON object" in page
+
+
+def test_export_round_trips_through_import(app, client):
+    upload(client, CSV_FILE, "catalog.csv")
+    response = client.get("/product/my-products/export?format=csv")
+    assert response.is_streamed
+    assert "attachment" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["title"] for row in rows] == [
+        product.title
+        for product in Product.query.filter_by(seller_id=1).order_by(Product.id)
+    ]
+
+    ndjson = client.get("/product/my-products/export?format=ndjson")
+    records = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert [record["title"] for record in records] == [row["title"] for row in rows]
+
+
+def test_import_rejects_unknown_file_types(client):
+    response = upload(client, "title\n", "catalog.xlsx")
+    assert response.status_code == 400
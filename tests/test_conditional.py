@@ -0,0 +1,110 @@
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app, db as _db
+from app.database.migrations import upgrade_schema
+from app.models import Product
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["SESSION_COOKIE_SECURE"] = False
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def revalidate(client, url):
+    """First response for url and the answer to revalidating it."""
+    first = client.get(url)
+    again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    return first, again
+
+
+@pytest.mark.parametrize(
+    "url", ["/", "/product/1", "/product/search_results?q=laptop&category[]=1"]
+)
+def test_unchanged_pages_are_not_rendered_again(app, url):
+    with app.test_client() as client:
+        first, again = revalidate(client, url)
+
+    assert first.status_code == 200
+    assert "public" in first.headers["Cache-Control"]
+    assert "s-maxage=" in first.headers["Cache-Control"]
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert "tpl;dur=0.00" in again.headers["Server-Timing"]
+
+
+def test_only_product_pages_send_last_modified(app):
+    with app.test_client() as client:
+        product = client.get("/product/1")
+        home = client.get("/")
+        since = product.headers["Last-Modified"]
+        again = client.get("/", headers={"If-Modified-Since": since})
+    assert product.headers["Last-Modified"]
+    assert "Last-Modified" not in home.headers
+    assert again.status_code == 200
+
+
+def test_product_writes_bump_version_and_etag(app):
+    product = app.db.get_product_by_id(1)
+    version, updated_at = product.version, product.updated_at
+    with app.test_client() as client:
+        first = client.get("/product/1")
+        app.db.update_product(1, price=123.0)
+        product = _db.session.get(Product, 1)
+        assert product.version == version + 1
+        assert product.updated_at >= updated_at
+
+        again = client.get(
+            "/product/1", headers={"If-None-Match": first.headers["ETag"]}
+        )
+    assert again.status_code == 200
+    assert again.headers["ETag"] != first.headers["ETag"]
+    assert b"123.0" in again.data
+
+
+def test_core_updates_bump_version(app):
+    _db.session.execute(
+        text("UPDATE products SET image_url = '/media/a.png' WHERE id = 2")
+    )
+    _db.session.commit()
+    app.db.record_image_variants("/media/a.png", {"thumb": "/media/a_thumb.webp"})
+    assert _db.session.get(Product, 2).version == 2
+
+
+def test_etag_follows_the_users_cart(app):
+    with app.test_client() as client:
+        client.post(
+            "/auth/login", data={"username": "testuser1", "password": "password1"}
+        )
+        client.get("/")  # Shows and clears the login message
+        first, again = revalidate(client, "/product/1")
+        assert again.status_code == 304
+        assert "private" in first.headers["Cache-Control"]
+
+        app.db.add_to_cart(1, 1)
+        after = client.get(
+            "/product/1", headers={"If-None-Match": first.headers["ETag"]}
+        )
+    assert after.status_code == 200
+    assert b"Remove from Cart" in after.data
+
+
+def test_upgrade_adds_version_columns(app):
+    _db.engine.dispose()  # Drop pooled connections holding the old schema
+    with _db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE products DROP COLUMN updated_at"))
+        conn.execute(text("ALTER TABLE products DROP COLUMN version"))
+
+    upgrade_schema()
+
+    row = _db.session.execute(
+        text("SELECT updated_at, version FROM products WHERE id = 1")
+    ).one()
+    assert row.updated_at is not None and row.version == 1
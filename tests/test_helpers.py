@@ -1,9 +1,13 @@
+import hashlib
+import io
 import os
 import pytest
 from unittest.mock import patch, MagicMock
+from werkzeug.datastructures import FileStorage
 from app.utils.helpers import save_image
+from app.utils.images import ImageTooLarge, image_src
 from app.models.user import User
-from app import create_app
+from app import create_app, db as _db
 import shutil
 from flask import session
 from flask_login import login_user, logout_user
@@ -27,6 +31,7 @@ def app():
         if os.path.exists(upload_dir):
             shutil.rmtree(upload_dir)
         yield app
+        _db.drop_all()
 
     # cleanup after test
     if os.path.exists(upload_dir):
@@ -41,13 +46,110 @@ def test_save_image_without_image(app):
 
 
 def test_save_image_with_image(app):
-    mock_image = MagicMock()
-    mock_image.filename = "test_image.jpg"
+    image = FileStorage(
+        stream=io.BytesIO(b"fake image bytes"), filename="test image.jpg"
+    )
     with app.app_context():
         with patch("flask.current_app.config", app_config):
-            result = save_image(mock_image)
-            assert result.startswith(f"/{app_config['IMAGE_UPLOAD_FOLDER']}/")
+            result = save_image(image)
+            digest = hashlib.sha256(b"fake image bytes").hexdigest()
+            assert result == f"/media/{digest}.jpg"
             image_path = os.path.join(
-                app_config["ROOT_DIR"], app_config["IMAGE_UPLOAD_FOLDER"]
+                app_config["ROOT_DIR"],
+                app_config["IMAGE_UPLOAD_FOLDER"],
+                f"{digest}.jpg",
             )
-            assert os.path.exists(image_path)
+            with open(image_path, "rb") as saved:
+                assert saved.read() == b"fake image bytes"
+
+
+def test_identical_uploads_share_one_file(app):
+    with app.app_context():
+        with patch("flask.current_app.config", app_config):
+            first = save_image(FileStorage(io.BytesIO(b"same"), filename="a.png"))
+            second = save_image(FileStorage(io.BytesIO(b"same"), filename="b.PNG"))
+            third = save_image(FileStorage(io.BytesIO(b"other"), filename="c.png"))
+    assert first == second != third
+    folder = os.path.join(app_config["ROOT_DIR"], app_config["IMAGE_UPLOAD_FOLDER"])
+    assert len(os.listdir(folder)) == 2
+
+
+def test_save_image_rejects_oversized_upload(app):
+    image = FileStorage(stream=io.BytesIO(b"x" * 2048), filename="big.jpg")
+    config = dict(app_config, IMAGE_MAX_BYTES=1024)
+    with app.app_context():
+        with patch("flask.current_app.config", config):
+            with pytest.raises(ImageTooLarge):
+                save_image(image)
+    folder = os.path.join(app_config["ROOT_DIR"], app_config["IMAGE_UPLOAD_FOLDER"])
+    assert os.listdir(folder) == []  # partial file removed
+
+
+def test_image_src_prefers_variant():
+    product = {"image_url": "/a.jpg", "image_variants": {"thumb": "/a_thumb.webp"}}
+    assert image_src(product, "thumb") == "/a_thumb.webp"
+    assert image_src(product, "full") == "/a.jpg"
+    assert image_src({"image_url": "/a.jpg", "image_variants": None}) == "/a.jpg"
+
+
+def test_variants_are_recorded_on_product(app):
+    Image = pytest.importorskip("PIL.Image")
+    from app.utils.images import create_variants
+
+    folder = os.path.join(app_config["ROOT_DIR"], "static")
+    os.makedirs(folder)
+    source = os.path.join(folder, "photo.jpg")
+    Image.new("RGB", (2000, 1000), "red").save(source)
+
+    variants = create_variants(source, "/static/photo.jpg")
+    assert variants["thumb"] == "/static/photo_thumb.webp"
+    with Image.open(os.path.join(folder, "photo_thumb.webp")) as thumb:
+        assert thumb.size == (320, 160)
+
+    db = app.db
+    db.update_product(1, image_url="/static/photo.jpg")
+    assert db.record_image_variants("/static/photo.jpg", variants) == [1]
+    assert db.get_product_by_id(1).image_variants == variants
+
+
+def _use_test_upload_folder(app):
+    app.config.update(
+        ROOT_DIR=app_config["ROOT_DIR"],
+        IMAGE_UPLOAD_FOLDER=app_config["IMAGE_UPLOAD_FOLDER"],
+    )
+
+
+def test_media_is_served_with_immutable_caching(app):
+    _use_test_upload_folder(app)
+    with app.test_request_context():
+        image_url = save_image(FileStorage(io.BytesIO(b"pixels"), filename="a.jpg"))
+    digest = hashlib.sha256(b"pixels").hexdigest()
+
+    with app.test_client() as client:
+        response = client.get(image_url)
+        assert response.status_code == 200
+        assert response.data == b"pixels"
+        assert response.headers["ETag"] == f'"{digest}"'
+        cache_control = response.headers["Cache-Control"]
+        assert "immutable" in cache_control and "max-age=31536000" in cache_control
+        response.close()
+
+        revalidated = client.get(image_url, headers={"If-None-Match": f'"{digest}"'})
+        assert revalidated.status_code == 304
+
+
+def test_gc_images_removes_unreferenced_files(app):
+    _use_test_upload_folder(app)
+    with app.test_request_context():
+        kept = save_image(FileStorage(io.BytesIO(b"kept"), filename="a.jpg"))
+        orphan = save_image(FileStorage(io.BytesIO(b"orphan"), filename="b.jpg"))
+    app.db.update_product(1, image_url=kept)
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["gc-images", "--grace", "0", "--dry-run"])
+    assert "1 image(s) would be removed" in result.output
+
+    result = runner.invoke(args=["gc-images", "--grace", "0"])
+    assert os.path.basename(orphan) in result.output
+    folder = os.path.join(app_config["ROOT_DIR"], app_config["IMAGE_UPLOAD_FOLDER"])
+    assert os.listdir(folder) == [os.path.basename(kept)]
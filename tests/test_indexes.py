@@ -0,0 +1,147 @@
+import os
+import re
+import pytest
+from sqlalchemy import event, inspect, text
+from app import create_app, db as _db
+from app.database.migrations import upgrade_schema
+
+os.environ["FLASK_ENV"] = "testing"
+
+# A plan line reading every row of one of these tables
+FULL_SCAN = re.compile(r"^SCAN (products|carts|product_recommendations)\b")
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        app.db.cache.clear()
+        yield app
+        _db.drop_all()
+
+
+@pytest.fixture
+def query_plans():
+    """Run a callable and return the EXPLAIN QUERY PLAN of every statement it ran."""
+
+    def explain(fn):
+        captured = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and not statement.lstrip().upper().startswith(
+                ("INSERT", "PRAGMA", "EXPLAIN")
+            ):
+                captured.append((statement, parameters))
+
+        engine = _db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        plans = []
+        connection = _db.session.connection()
+        for statement, parameters in captured:
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+            plans.append((statement, [row[-1] for row in rows]))
+        return plans
+
+    return explain
+
+
+def assert_no_full_scans(plans):
+    for statement, details in plans:
+        scans = [line for line in details if FULL_SCAN.match(line)]
+        assert not scans, f"{scans} in plan of:\n{statement}"
+
+
+def test_seller_products_use_index(app, query_plans):
+    plans = query_plans(lambda: app.db.get_products_by_seller_id(2))
+    assert_no_full_scans(plans)
+    assert any("ix_products_seller_id_id" in line for line in plans[0][1])
+    assert not any("TEMP B-TREE" in line for line in plans[0][1])
+
+
+def test_category_products_use_index(app, query_plans):
+    plans = query_plans(lambda: app.db.get_products_by_category(1))
+    assert_no_full_scans(plans)
+    assert not any("TEMP B-TREE" in line for line in plans[0][1])
+
+
+def test_price_sorted_category_browsing_uses_index(app):
+    from app.models import Product
+    from sqlalchemy import select
+
+    statement = (
+        select(Product.id)
+        .where(Product.category_id == 1)
+        .order_by(Product.price, Product.id)
+        .limit(10)
+    )
+    compiled = statement.compile(_db.engine, compile_kwargs={"literal_binds": True})
+    details = [
+        row[-1] for row in _db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+    assert any("ix_products_category_id_price_id" in line for line in details)
+    assert not any("TEMP B-TREE" in line for line in details)
+
+
+@pytest.mark.parametrize("sort", ["newest", "price_asc", "price_desc"])
+def test_sorted_listings_use_index(app, query_plans, sort):
+    db = app.db
+
+    def walk():
+        first = db.get_all_products(per_page=4, with_total=False, sort=sort)
+        db.get_all_products(
+            per_page=4,
+            cursor=first["pagination"]["next_cursor"],
+            with_total=False,
+            sort=sort,
+        )
+        db.search_products("", [1], per_page=4, with_total=False, sort=sort)
+
+    plans = query_plans(walk)
+    assert len(plans) == 3
+    for statement, details in plans:
+        assert not any("TEMP B-TREE" in line for line in details), statement
+    # Pages after the first seek into the index instead of walking it
+    assert_no_full_scans(plans[1:])
+
+
+def test_delete_product_cascade_uses_indexes(app, query_plans):
+    db = app.db
+    db.update_cart(1, add=[2])
+    assert_no_full_scans(query_plans(lambda: db.delete_product(2)))
+
+
+def test_cart_and_recommendation_reads_use_indexes(app, query_plans):
+    db = app.db
+    db.update_cart(1, add=[2, 4])
+    plans = query_plans(
+        lambda: (
+            db.get_cart_items(1),
+            db.get_recommended_products(1),
+            db.update_product(3, price=99.0),
+        )
+    )
+    assert_no_full_scans(plans)
+
+
+def test_upgrade_replaces_single_column_indexes(app):
+    with _db.engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_carts_product_id_user_id"))
+        conn.execute(text("DROP INDEX ix_products_seller_id_id"))
+        conn.execute(text("CREATE INDEX ix_carts_user_id ON carts (user_id)"))
+    # Pooled connections keep the CREATE INDEX statements that create_all
+    # ran prepared, and SQLite rejects re-running them after the DROP
+    _db.engine.dispose()
+    upgrade_schema()
+
+    inspector = inspect(_db.engine)
+    cart_indexes = {index["name"] for index in inspector.get_indexes("carts")}
+    product_indexes = {index["name"] for index in inspector.get_indexes("products")}
+    assert cart_indexes == {"ix_carts_product_id_user_id"}
+    assert "ix_products_seller_id_id" in product_indexes
@@ -0,0 +1,67 @@
+import logging
+import os
+import pytest
+from app import create_app, db as _db
+from app.instrumentation import normalize_sql
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_normalize_sql_groups_statements_by_shape():
+    assert (
+        normalize_sql(
+            "SELECT *\n  FROM products WHERE id IN (1, 2, 3) AND title = 'It''s'"
+        )
+        == "SELECT * FROM products WHERE id IN (?...) AND title = ?"
+    )
+
+
+def test_server_timing_header(app):
+    app.db.cache.clear()
+    with app.test_client() as client:
+        response = client.get("/product/1")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'queries"' in timing and "tpl;dur=" in timing and "app;dur=" in timing
+
+
+def test_metrics_endpoint(app):
+    with app.test_client() as client:
+        client.get("/product/1")
+        client.get("/product/1")
+        body = client.get("/metrics").get_data(as_text=True)
+
+    assert (
+        'loopify_http_requests_total{endpoint="product.view_product",'
+        'method="GET",status="200"} 2'
+    ) in body
+    assert (
+        'loopify_http_request_duration_seconds_count{endpoint="product.view_product"} 2'
+        in body
+    )
+    assert 'loopify_db_queries_total{endpoint="product.view_product"}' in body
+    # The product row and the cached cards of its recommendations
+    hits = app.db.cache.stats()["namespaces"]["product"]["hits"]
+    assert hits >= 1
+    assert (
+        f'loopify_cache_requests_total{{namespace="product",result="hit"}} {hits}'
+        in body
+    )
+
+
+def test_slow_queries_are_logged_with_call_site(app, caplog):
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = 0
+    with caplog.at_level(logging.WARNING, "loopify.sql.slow"):
+        app.db.get_products_by_seller_id(2)
+    assert app.extensions["metrics"].slow_queries >= 1
+    message = caplog.records[-1].getMessage()
+    assert "manager.py:" in message and "in get_products_by_seller_id" in message
+    assert "WHERE products.seller_id = ?" in message
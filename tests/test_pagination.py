@@ -0,0 +1,127 @@
+import base64
+import os
+import pytest
+from datetime import datetime
+from app import create_app, db as _db
+from app.database.pagination import decode_cursor, encode_cursor
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def ids(result):
+    return [p["id"] for p in result["products"]]
+
+
+def test_cursor_round_trip():
+    token = encode_cursor([-1.5, 7], 3, "next")
+    assert decode_cursor(token) == ([-1.5, 7], 3, "next")
+    moment = datetime(2025, 3, 1, 12, 30, 5, 250)
+    assert decode_cursor(encode_cursor([moment, 7], 2, "prev"))[0] == [moment, 7]
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    nested = base64.urlsafe_b64encode(b'{"v":[[1,2]],"p":2,"d":"next"}').decode()
+    with pytest.raises(ValueError):
+        decode_cursor(nested)
+
+
+def test_cursor_walk_matches_page_numbers(app):
+    db = app.db
+    by_page = [ids(db.get_all_products(page=n, per_page=4)) for n in range(1, 5)]
+
+    result = db.get_all_products(page=1, per_page=4)
+    walked = [ids(result)]
+    while result["pagination"]["next_cursor"]:
+        result = db.get_all_products(
+            per_page=4, cursor=result["pagination"]["next_cursor"]
+        )
+        walked.append(ids(result))
+
+    assert walked == [page for page in by_page if page]
+    assert result["pagination"]["current_page"] == len(walked)
+
+    back = db.get_all_products(per_page=4, cursor=result["pagination"]["prev_cursor"])
+    assert ids(back) == walked[-2]
+    assert back["pagination"]["current_page"] == len(walked) - 1
+
+
+def test_total_is_optional(app):
+    result = app.db.get_all_products(page=1, per_page=4, with_total=False)
+    assert result["pagination"]["total_products"] is None
+    assert result["pagination"]["next_cursor"]
+
+
+def test_search_cursor_follows_relevance_order(app):
+    db = app.db
+    first = db.search_products("used", [], page=1, per_page=3)
+    second = db.search_products(
+        "used", [], per_page=3, cursor=first["pagination"]["next_cursor"]
+    )
+    both = db.search_products("used", [], page=1, per_page=6)
+    assert ids(first) + ids(second) == ids(both)
+
+
+@pytest.mark.parametrize(
+    "sort, key",
+    [
+        ("newest", lambda p: (p.created_at, p.id)),
+        ("price_asc", lambda p: (-p.price, -p.id)),
+        ("price_desc", lambda p: (p.price, p.id)),
+    ],
+)
+def test_cursor_walk_follows_sort_order(app, sort, key):
+    from app.models import Product
+
+    db = app.db
+    db.update_product(3, price=1.0)
+    expected = [p.id for p in sorted(Product.query.all(), key=key, reverse=True)]
+
+    result = db.get_all_products(page=1, per_page=4, sort=sort)
+    walked = ids(result)
+    while result["pagination"]["next_cursor"]:
+        result = db.get_all_products(
+            per_page=4, cursor=result["pagination"]["next_cursor"], sort=sort
+        )
+        walked += ids(result)
+    assert walked == expected
+
+    back = db.get_all_products(
+        per_page=4, cursor=result["pagination"]["prev_cursor"], sort=sort
+    )
+    assert ids(back) == expected[-len(ids(result)) - 4 : -len(ids(result))]
+
+
+def test_unknown_sort_order_is_rejected(app):
+    with pytest.raises(ValueError):
+        app.db.get_all_products(sort="cheapest")
+    with app.test_client() as client:
+        page = client.get("/product/search_results?sort=cheapest")
+    assert page.status_code == 200
+    assert b'value="relevance" selected' in page.data
+
+
+def test_home_shows_newest_products(app):
+    app.db.add_product("Brand New Kettle", 30.0, "Never used", 1, 1)
+    with app.test_client() as client:
+        page = client.get("/").data
+    assert b">Brand New Kettle<" in page
+
+
+def test_search_results_rejects_bad_cursor(app):
+    with app.test_client() as client:
+        response = client.get("/product/search_results?cursor=garbage")
+    assert response.status_code == 400
+
+
+def test_search_results_renders_cursor_links(app):
+    with app.test_client() as client:
+        response = client.get("/product/search_results")
+    assert response.status_code == 200
+    assert b"cursor=" in response.data
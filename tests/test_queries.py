@@ -0,0 +1,53 @@
+import os
+import pytest
+from app import create_app, db as _db
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        app.db.cache.clear()
+        yield app
+        _db.drop_all()
+
+
+def test_search_page_is_a_single_query(app, count_queries):
+    with count_queries() as statements:
+        result = app.db.search_products("", [], per_page=9, with_total=False)
+    assert len(statements) == 1
+    assert len(result["products"]) == 9
+    assert {product["category"] for product in result["products"]} >= {"Electronics"}
+
+
+def test_fts_search_with_categories_is_a_single_query(app, count_queries):
+    with count_queries() as statements:
+        result = app.db.search_products("dell", [1], with_total=False)
+    assert len(statements) == 1
+    assert result["products"][0]["category"] == "Electronics"
+
+
+def test_listing_with_total_runs_one_count(app, count_queries):
+    with count_queries() as statements:
+        app.db.get_all_products(page=1, per_page=4)
+    assert len(statements) == 2
+
+
+def test_seller_and_category_lists_return_plain_rows(app, count_queries):
+    with count_queries() as statements:
+        products = app.db.get_products_by_seller_id(2)
+        by_category = app.db.get_products_by_category(1)
+    assert len(statements) == 2
+    assert [product.id for product in products] == [1, 3, 5, 7, 9]
+    assert not hasattr(products[0], "_sa_instance_state")
+    assert all(product.category == "Electronics" for product in by_category)
+
+
+def test_list_descriptions_are_truncated(app):
+    from app.database.manager import LIST_DESCRIPTION_LENGTH
+
+    app.db.update_product(1, description="x" * 500)
+    product = app.db.get_all_products(page=1, per_page=1)["products"][0]
+    assert product["description"] == "x" * LIST_DESCRIPTION_LENGTH
@@ -0,0 +1,108 @@
+import os
+import pytest
+from app import create_app, db as _db
+from app.database.recommendations import ProductFeatures
+from app.models import Product, Recommendation
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        app.config["RECOMMENDATIONS_PER_PRODUCT"] = 2
+        app.db.recommendations.rebuild()
+        _db.session.commit()
+        yield app
+        _db.drop_all()
+
+
+def stored_lists():
+    lists = {}
+    for row in Recommendation.query.all():
+        lists.setdefault(row.product_id, set()).add(row.recommended_id)
+    return lists
+
+
+def brute_force_lists(limit):
+    """Top-K lists computed by scoring every pair in every category."""
+    products = Product.query.all()
+    features = {
+        p.id: ProductFeatures(p.id, p.title, p.description, p.price) for p in products
+    }
+    lists = {}
+    for product in products:
+        scored = sorted(
+            (
+                (-features[product.id].similarity(features[other.id]), -other.id)
+                for other in products
+                if other.category_id == product.category_id and other.id != product.id
+            )
+        )[:limit]
+        if scored:
+            lists[product.id] = {-negated_id for _, negated_id in scored}
+    return lists
+
+
+def test_rebuild_matches_brute_force(app):
+    assert stored_lists() == brute_force_lists(2)
+
+
+def test_incremental_writes_match_brute_force(app):
+    db = app.db
+    added = db.add_product(
+        title="Dell Latitude Laptop - Used",
+        price=430.0,
+        description="A used Dell laptop in great condition",
+        category_id=1,
+        seller_id=2,
+    )
+    assert stored_lists() == brute_force_lists(2)
+
+    db.update_product(added.id, title="Garden Hose", category_id=4, price=15.0)
+    assert stored_lists() == brute_force_lists(2)
+
+    db.delete_product(1)
+    assert stored_lists() == brute_force_lists(2)
+
+
+def test_batch_inserts_match_brute_force(app):
+    app.db.add_products(
+        [
+            {
+                "title": title,
+                "price": price,
+                "description": description,
+                "category_id": category_id,
+                "seller_id": 2,
+            }
+            for title, price, description, category_id in [
+                ("Dell Latitude Laptop - Used", 430.0, "A used Dell laptop", 1),
+                ("Lenovo Yoga Laptop", 520.0, "Touchscreen laptop, like new", 1),
+                ("Wool Winter Coat", 60.0, "Warm wool coat, size M", 3),
+            ]
+        ]
+    )
+    assert stored_lists() == brute_force_lists(2)
+
+
+def test_get_recommended_products(app):
+    laptop = app.db.add_product(
+        title="Dell Inspiron 15 Laptop",
+        price=440.0,
+        description="Pre-owned Dell Inspiron laptop",
+        category_id=1,
+        seller_id=3,
+    )
+    recommended = app.db.get_recommended_products(laptop.id)
+    assert len(recommended) == 2
+    assert recommended[0].id == 1
+    assert all(p.category_id == 1 for p in recommended)
+
+
+def test_view_product_shows_recommendations(app):
+    with app.test_client() as client:
+        response = client.get("/product/1")
+    assert response.status_code == 200
+    assert b"Our recommendations for you" in response.data
@@ -0,0 +1,123 @@
+import os
+import re
+import pytest
+from app import create_app, db as _db
+from app.models import Product
+from app.database.search import build_match_expression
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_build_match_expression():
+    assert build_match_expression("Dell lap") == '"dell"* "lap"*'
+    assert build_match_expression('title:"x" OR') == '"title"* "x"* "or"*'
+    assert build_match_expression("  ") == ""
+
+
+def test_search_uses_full_text_index(app):
+    assert app.db.search_index.available
+
+    result = app.db.search_products("lapt", [])
+    titles = [p["title"] for p in result["products"]]
+    assert titles[0].startswith("Dell Inspiron 15")
+    assert result["pagination"]["total_products"] == len(titles)
+
+
+def test_search_ranks_title_hits_first(app):
+    result = app.db.search_products("coffee", [])
+    titles = [p["title"] for p in result["products"]]
+    assert len(titles) == 2
+    assert all("Coffee" in title for title in titles)
+
+
+def test_search_without_words_matches_nothing(app):
+    result = app.db.search_products("!!!", [], with_facets=True)
+    assert result["products"] == []
+    assert result["pagination"]["total_products"] == 0
+    assert result["facets"]["categories"] == {}
+
+
+def test_search_keeps_category_filter_and_pagination(app):
+    all_books = app.db.search_products("book", [5], page=1, per_page=1)
+    assert all_books["pagination"]["total_products"] == 2
+    assert all_books["pagination"]["total_pages"] == 2
+    assert all(p["category_id"] == 5 for p in all_books["products"])
+
+    assert app.db.search_products("book", [1])["products"] == []
+
+
+def test_search_index_follows_product_writes(app):
+    db = app.db
+    product = db.add_product(
+        title="Vintage Gramophone",
+        price=80.0,
+        description="Plays records",
+        category_id=1,
+        seller_id=2,
+    )
+    assert [p["id"] for p in db.search_products("gramophone", [])["products"]] == [
+        product.id
+    ]
+
+    db.update_product(product.id, title="Antique Turntable")
+    assert db.search_products("gramophone", [])["products"] == []
+    assert db.search_products("turntable", [])["products"][0]["id"] == product.id
+
+    db.delete_product(product.id)
+    assert db.search_products("turntable", [])["products"] == []
+
+
+def test_search_falls_back_to_like(app):
+    app.db.search_index._available = False
+
+    result = app.db.search_products("Inspiron", [])
+    assert [p["title"][:16] for p in result["products"]] == ["Dell Inspiron 15"]
+
+
+def test_facets_match_filtered_counts(app):
+    db = app.db
+    products = Product.query.all()
+    facets = db.get_search_facets("", [2, 3], 25, 100)
+
+    for category_id in {p.category_id for p in products}:
+        expected = sum(
+            p.category_id == category_id and 25 <= p.price < 100 for p in products
+        )
+        assert facets["categories"].get(category_id, 0) == expected
+    for bucket in facets["price_buckets"]:
+        expected = sum(
+            p.category_id in (2, 3)
+            and bucket["min"] <= p.price
+            and (bucket["max"] is None or p.price < bucket["max"])
+            for p in products
+        )
+        assert bucket["count"] == expected
+
+
+def test_price_range_filters_search_results(app):
+    result = app.db.search_products(
+        "", [], per_page=50, min_price=25, max_price=50, with_facets=True
+    )
+    prices = [p["price"] for p in result["products"]]
+    assert prices and all(25 <= price < 50 for price in prices)
+    assert result["pagination"]["total_products"] == len(prices)
+    assert sum(result["facets"]["categories"].values()) == len(prices)
+
+
+def test_search_page_shows_facet_counts(app, count_queries):
+    with app.test_client() as client:
+        client.get("/product/search_results?q=book")
+        with count_queries() as statements:
+            page = client.get("/product/search_results?q=book&page=1").data
+    assert b"Books <span" in page and b"(2)</span>" in page
+    assert re.search(rb'value="1"\s+disabled', page)
+    assert b"Under \xe2\x82\xac25" in page
+    assert not any("GROUP BY" in statement for statement in statements)
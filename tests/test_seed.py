@@ -0,0 +1,67 @@
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app, db as _db
+from app.database.seed import SYNTHETIC_ID_BASE, insert_db_samples, seed_synthetic
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def test_samples_can_be_inserted_again(app):
+    from app.models import Category, Product, User
+
+    insert_db_samples()
+    assert User.query.count() == 3
+    assert Category.query.count() == 8
+    assert Product.query.count() == 13
+
+
+def test_seed_is_deterministic_and_idempotent(app):
+    from app.models import Product
+
+    assert seed_synthetic(users=5, products=25, batch_size=10) == {
+        "users": 5,
+        "products": 25,
+    }
+    first = _db.session.get(Product, SYNTHETIC_ID_BASE + 17)
+    snapshot = (first.title, first.price, first.seller_id)
+    assert SYNTHETIC_ID_BASE <= first.seller_id < SYNTHETIC_ID_BASE + 5
+
+    assert seed_synthetic(users=5, products=30, batch_size=10) == {
+        "users": 0,
+        "products": 5,
+    }
+    _db.session.expire_all()
+    again = _db.session.get(Product, SYNTHETIC_ID_BASE + 17)
+    assert (again.title, again.price, again.seller_id) == snapshot
+
+
+def test_seed_command(app):
+    result = app.test_cli_runner().invoke(
+        args=["seed", "--users", "3", "--products", "40", "--password", "secret"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "3 user(s) and 40 product(s) inserted" in result.output
+
+    db = app.db
+    assert db.get_user("seed_user_2", "secret") is not None
+    title = db.get_product_by_id(SYNTHETIC_ID_BASE).title
+    found = db.search_products(title.split()[0], [], per_page=50)["products"]
+    assert SYNTHETIC_ID_BASE in {product["id"] for product in found}
+    assert db.get_recommended_products(SYNTHETIC_ID_BASE)
+
+
+def test_seed_needs_sellers(app):
+    _db.session.execute(text("DELETE FROM users"))
+    _db.session.commit()
+    result = app.test_cli_runner().invoke(args=["seed", "--products", "5"])
+    assert result.exit_code == 2
+    assert "No sellers: pass --users" in result.output
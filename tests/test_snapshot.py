@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import pytest
+from app import create_app, db as _db
+from app.database import snapshot as snapshot_module
+from app.database.snapshot import CatalogSnapshot
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture(params=["numpy", "python"])
+def app(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(snapshot_module, "numpy", None)
+    app = create_app()
+    with app.app_context():
+        app.db.snapshot = CatalogSnapshot()
+        app.db.snapshot.build()
+        yield app
+        _db.drop_all()
+
+
+def walk(db, **kwargs):
+    """Ids of every page reached by following next cursors, then one page back."""
+    db.cache.clear()
+    result = db.search_products("", per_page=3, **kwargs)
+    pages = [[p["id"] for p in result["products"]]]
+    while result["pagination"]["next_cursor"]:
+        result = db.search_products(
+            "", per_page=3, cursor=result["pagination"]["next_cursor"], **kwargs
+        )
+        pages.append([p["id"] for p in result["products"]])
+    back = None
+    if result["pagination"]["prev_cursor"]:
+        back = db.search_products(
+            "", per_page=3, cursor=result["pagination"]["prev_cursor"], **kwargs
+        )
+        back = [p["id"] for p in back["products"]]
+    second = db.search_products("", page=2, per_page=3, **kwargs)
+    return pages, back, second["pagination"]["total_products"], second["products"]
+
+
+def using_sql(db, fn):
+    snapshot, db.snapshot = db.snapshot, None
+    try:
+        db.cache.clear()
+        return fn()
+    finally:
+        db.snapshot = snapshot
+        db.cache.clear()
+
+
+@pytest.mark.parametrize("sort", ["relevance", "newest", "price_asc", "price_desc"])
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"selected_categories": []},
+        {"selected_categories": [1, 2]},
+        {"selected_categories": [1], "min_price": 20, "max_price": 500},
+    ],
+)
+@pytest.mark.parametrize("selective", [False, True])
+def test_listings_match_sql(app, monkeypatch, sort, filters, selective):
+    # Filtered pages either walk a sort order or rank the matches directly
+    monkeypatch.setattr(snapshot_module, "SELECTIVE_RATIO", 0 if selective else 10**9)
+    db = app.db
+    db.update_product(3, price=db.get_product_by_id(4).price)  # A tie on price
+    expected = using_sql(db, lambda: walk(db, sort=sort, **filters))
+    assert walk(db, sort=sort, **filters) == expected
+
+
+def test_cursors_carry_over_from_sql(app):
+    db = app.db
+    first = using_sql(
+        db, lambda: db.get_all_products(page=1, per_page=4, sort="newest")
+    )
+    cursor = first["pagination"]["next_cursor"]
+    expected = using_sql(
+        db, lambda: db.get_all_products(per_page=4, cursor=cursor, sort="newest")
+    )
+    assert db.get_all_products(per_page=4, cursor=cursor, sort="newest") == expected
+
+
+def test_facets_match_sql(app):
+    db = app.db
+    expected = using_sql(db, lambda: db.get_search_facets("", [1], 25, 250))
+    assert db.get_search_facets("", [1], 25, 250) == expected
+    assert db.get_search_facets("", []) == using_sql(
+        db, lambda: db.get_search_facets("", [])
+    )
+
+
+def test_writes_reach_the_snapshot(app):
+    db = app.db
+    walk(db, selected_categories=[], sort="price_asc")
+    walk(db, selected_categories=[], sort="newest")
+    product = db.add_product("Gold Watch", 99999.0, "Shiny", 2, 1)
+    [batch_id] = db.add_products(
+        [
+            dict(
+                title="Pebble",
+                price=0.5,
+                description="Round",
+                category_id=2,
+                seller_id=1,
+            )
+        ]
+    )
+
+    def first(sort):
+        return db.search_products("", [2], per_page=1, sort=sort)["products"][0]
+
+    assert first("price_desc")["id"] == product.id
+    assert first("price_asc")["id"] == batch_id
+    assert first("newest")["id"] == batch_id
+
+    db.update_product(product.id, price=0.1)
+    assert first("price_asc")["id"] == product.id
+    db.delete_product(product.id)
+    assert first("price_asc")["id"] == batch_id
+    assert db.snapshot.stats()["pending"] == 0
+    for sort in ("price_asc", "newest"):
+        expected = using_sql(db, lambda: walk(db, selected_categories=[], sort=sort))
+        assert walk(db, selected_categories=[], sort=sort) == expected
+    assert db.snapshot.stats()["products"] == using_sql(
+        db, lambda: db.get_all_products()["pagination"]["total_products"]
+    )
+
+
+def test_app_import_does_not_load_numpy():
+    # The snapshot (and numpy with it) is only imported when it is enabled
+    code = "import sys, app; assert 'numpy' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
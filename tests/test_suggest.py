@@ -0,0 +1,99 @@
+import os
+import pytest
+from app import create_app, db as _db
+from app.database import suggest
+from app.database.suggest import SuggestIndex
+
+os.environ["FLASK_ENV"] = "testing"
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+        _db.drop_all()
+
+
+def texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+def test_suggest_endpoint_completes_the_last_word(app):
+    with app.test_client() as client:
+        response = client.get("/product/suggest?q=Dell+Lap")
+    assert response.status_code == 200
+    assert "public" in response.headers["Cache-Control"]
+    first = response.json["suggestions"][0]
+    assert first["text"] == "dell laptop"
+    assert first["url"] == "/product/search_results?q=dell+laptop"
+
+
+def test_categories_come_first(app):
+    suggestions = app.db.suggestions.suggest("ele")
+    assert suggestions[0] == {
+        "type": "category",
+        "text": "Electronics",
+        "category_id": 1,
+    }
+    assert app.db.suggestions.suggest("") == []
+
+
+def test_writes_update_the_index(app):
+    db = app.db
+    product = db.add_product("Zanzibar Zither", 80.0, "Hand made", 1, 1)
+    db.add_products(
+        [
+            dict(
+                title="Zanzibar Map",
+                price=5.0,
+                description="Old",
+                category_id=1,
+                seller_id=1,
+            )
+        ]
+    )
+    assert texts(db.suggestions.suggest("zan")) == ["zanzibar"]
+    assert db.suggestions.suggest("zan")[0]["count"] == 2
+    assert texts(db.suggestions.suggest("zit")) == ["zither"]
+
+    db.update_product(product.id, title="Zanzibar Zebra Print")
+    assert texts(db.suggestions.suggest("zit")) == []
+    assert texts(db.suggestions.suggest("ze")) == ["zebra"]
+
+    db.delete_product(product.id)
+    assert texts(db.suggestions.suggest("ze")) == []
+    assert db.suggestions.suggest("zan")[0]["count"] == 1
+
+
+def test_accents_and_ranking():
+    index = SuggestIndex()
+    index.add_products(["Café chair", "Cafe table", "Camera bag", "Camera lens"])
+    assert texts(index.suggest("CAF")) == ["cafe"]
+    assert texts(index.suggest("ca")) == ["cafe", "camera"]
+
+
+def test_wide_prefixes_keep_their_top_terms(monkeypatch):
+    monkeypatch.setattr(suggest, "SCAN_LIMIT", 2)
+    index = SuggestIndex()
+    index.add_products(["aa ab ac", "ab ac", "ac"])
+    assert texts(index.suggest("a", limit=3)) == ["ac", "ab", "aa"]
+
+    index.add_products(["aa", "aa", "ad"])
+    assert texts(index.suggest("a", limit=3)) == ["aa", "ac", "ab"]
+    index.remove_product("aa")
+    index.remove_product("aa")
+    index.remove_product("aa ab ac")
+    assert texts(index.suggest("a", limit=4)) == ["ac", "ab", "ad"]
+
+
+def test_index_keeps_to_its_term_budget(app):
+    index = SuggestIndex(max_terms=5)
+    index.add_products(["one two three four five six"])
+    assert index.stats()["terms"] == 5
+    assert index.dropped == 1
+
+    index.build()
+    assert index.stats()["terms"] == 5
+    assert index.dropped > 0
+    assert index.ready